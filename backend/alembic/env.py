@@ -18,6 +18,7 @@ from app.models import (  # noqa: F401
     AppointmentType,
     Upload,
     Appointment,
+    DailyPointsRollup,
 )
 
 # this is the Alembic Config object
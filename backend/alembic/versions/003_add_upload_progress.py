@@ -0,0 +1,31 @@
+"""Add progress_percent column to uploads
+
+Revision ID: 003_add_upload_progress
+Revises: 002_add_check_in_staff
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_add_upload_progress"
+down_revision: Union[str, None] = "002_add_check_in_staff"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "uploads",
+        sa.Column("progress_percent", sa.Integer, server_default=sa.text("0"), nullable=False),
+    )
+    # Uploads that finished before progress tracking existed
+    op.execute("UPDATE uploads SET progress_percent = 100 WHERE status = 'completed'")
+
+
+def downgrade() -> None:
+    op.drop_column("uploads", "progress_percent")
@@ -0,0 +1,28 @@
+"""Add file_reader and read_duration_ms columns to uploads
+
+Revision ID: 004_add_upload_reader_timing
+Revises: 003_add_upload_progress
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_add_upload_reader_timing"
+down_revision: Union[str, None] = "003_add_upload_progress"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("uploads", sa.Column("file_reader", sa.String(50), nullable=True))
+    op.add_column("uploads", sa.Column("read_duration_ms", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("uploads", "read_duration_ms")
+    op.drop_column("uploads", "file_reader")
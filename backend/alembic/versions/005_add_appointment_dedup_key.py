@@ -0,0 +1,54 @@
+"""Add dedup_key column and index to appointments for cross-upload duplicate detection
+
+Revision ID: 005_add_appointment_dedup_key
+Revises: 004_add_upload_reader_timing
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_add_appointment_dedup_key"
+down_revision: Union[str, None] = "004_add_upload_reader_timing"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("appointments", sa.Column("dedup_key", sa.BigInteger, nullable=True))
+
+    # Same key as app.services.upload_service.appointment_dedup_key: the first
+    # 64 bits of the MD5 of the lower-cased key fields joined by chr(31).
+    # concat_ws skips NULLs, so text fields are coalesced to '' as in Python;
+    # only the prospective rooming_tech is left out, as it is there
+    op.execute(
+        """
+        UPDATE appointments SET dedup_key = (
+            'x' || substr(md5(concat_ws(
+                chr(31),
+                coalesce(lower(provider), ''),
+                coalesce(lower(location_name), ''),
+                to_char(appointment_date, 'YYYY-MM-DD'),
+                to_char(appointment_time, 'HH24:MI:SS'),
+                coalesce(lower(visit_type), ''),
+                CASE WHEN data_type = 'retrospective' THEN coalesce(lower(rooming_tech), '') END
+            )), 1, 16)
+        )::bit(64)::bigint
+        """
+    )
+
+    op.create_index(
+        "idx_appointments_dedup",
+        "appointments",
+        ["organization_id", "data_type", "dedup_key"],
+        postgresql_where=sa.text("NOT is_excluded_from_reporting AND NOT is_draft"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_appointments_dedup", table_name="appointments")
+    op.drop_column("appointments", "dedup_key")
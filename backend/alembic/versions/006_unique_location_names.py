@@ -0,0 +1,60 @@
+"""Make location names unique per organization, ignoring case
+
+Revision ID: 006_unique_location_names
+Revises: 005_add_appointment_dedup_key
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_unique_location_names"
+down_revision: Union[str, None] = "005_add_appointment_dedup_key"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge locations whose names differ only by case into the oldest one
+    op.execute(
+        """
+        CREATE TEMP TABLE location_merge AS
+        SELECT id AS old_id,
+               first_value(id) OVER (
+                   PARTITION BY organization_id, lower(name) ORDER BY created_at, id
+               ) AS keep_id
+        FROM locations
+        """
+    )
+    op.execute("DELETE FROM location_merge WHERE old_id = keep_id")
+    op.execute(
+        """
+        UPDATE appointments SET location_id = m.keep_id
+        FROM location_merge m WHERE appointments.location_id = m.old_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_locations (user_id, location_id)
+        SELECT ul.user_id, m.keep_id
+        FROM user_locations ul JOIN location_merge m ON ul.location_id = m.old_id
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute("DELETE FROM locations USING location_merge m WHERE locations.id = m.old_id")
+    op.execute("DROP TABLE location_merge")
+
+    op.create_index(
+        "uq_locations_org_name",
+        "locations",
+        ["organization_id", sa.text("lower(name)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_locations_org_name", table_name="locations")
@@ -0,0 +1,87 @@
+"""Add daily_points_rollup table for reports and the dashboard
+
+Revision ID: 007_add_daily_points_rollup
+Revises: 006_unique_location_names
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_add_daily_points_rollup"
+down_revision: Union[str, None] = "006_unique_location_names"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_points_rollup",
+        sa.Column("id", sa.dialects.postgresql.UUID(as_uuid=True), primary_key=True,
+                  server_default=sa.text("gen_random_uuid()")),
+        sa.Column("organization_id", sa.dialects.postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("data_type", sa.String(20), nullable=False),
+        sa.Column("appointment_date", sa.Date, nullable=False),
+        sa.Column("location_id", sa.dialects.postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("locations.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("location_name", sa.String(255), nullable=False),
+        sa.Column("rooming_tech", sa.String(255)),
+        sa.Column("provider", sa.String(255), nullable=False),
+        sa.Column("specialty", sa.String(255)),
+        sa.Column("session", sa.String(5)),
+        sa.Column("total_points", sa.Numeric(14, 2), server_default=sa.text("0"), nullable=False),
+        sa.Column("appointment_count", sa.Integer, server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True),
+                  server_default=sa.text("NOW()"), nullable=False),
+    )
+
+    op.create_index(
+        "uq_daily_points_rollup_key",
+        "daily_points_rollup",
+        [
+            "organization_id",
+            "data_type",
+            "appointment_date",
+            "location_name",
+            "location_id",
+            "rooming_tech",
+            "provider",
+            "specialty",
+            "session",
+        ],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        "idx_daily_points_rollup_location",
+        "daily_points_rollup",
+        ["organization_id", "data_type", sa.text("lower(location_name)"), "appointment_date"],
+    )
+
+    # Backfill from the appointments that currently count toward reports
+    op.execute(
+        """
+        INSERT INTO daily_points_rollup (
+            organization_id, data_type, appointment_date, location_id, location_name,
+            rooming_tech, provider, specialty, session, total_points, appointment_count
+        )
+        SELECT organization_id, data_type, appointment_date, location_id, location_name,
+               rooming_tech, provider, specialty, session,
+               coalesce(sum(visit_points), 0), count(*)
+        FROM appointments
+        WHERE NOT is_excluded_from_reporting
+        GROUP BY organization_id, data_type, appointment_date, location_id, location_name,
+                 rooming_tech, provider, specialty, session
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_daily_points_rollup_location", table_name="daily_points_rollup")
+    op.drop_index("uq_daily_points_rollup_key", table_name="daily_points_rollup")
+    op.drop_table("daily_points_rollup")
@@ -0,0 +1,29 @@
+"""Add data_version to organizations for report cache invalidation
+
+Revision ID: 008_add_organization_data_version
+Revises: 007_add_daily_points_rollup
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008_add_organization_data_version"
+down_revision: Union[str, None] = "007_add_daily_points_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "organizations",
+        sa.Column("data_version", sa.BigInteger, server_default=sa.text("0"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("organizations", "data_version")
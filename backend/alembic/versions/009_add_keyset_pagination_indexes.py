@@ -0,0 +1,43 @@
+"""Add indexes matching the keyset orderings of appointment, draft and upload lists
+
+Revision ID: 009_add_keyset_pagination_indexes
+Revises: 008_add_organization_data_version
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_add_keyset_pagination_indexes"
+down_revision: Union[str, None] = "008_add_organization_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_appointments_org_listing",
+        "appointments",
+        ["organization_id", sa.text("appointment_date DESC"), "appointment_time", "id"],
+    )
+    op.create_index(
+        "idx_appointments_org_drafts",
+        "appointments",
+        ["organization_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("is_draft"),
+    )
+    op.create_index(
+        "idx_uploads_org_uploaded",
+        "uploads",
+        ["organization_id", sa.text("uploaded_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_uploads_org_uploaded", table_name="uploads")
+    op.drop_index("idx_appointments_org_drafts", table_name="appointments")
+    op.drop_index("idx_appointments_org_listing", table_name="appointments")
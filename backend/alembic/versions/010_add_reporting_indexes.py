@@ -0,0 +1,108 @@
+"""Add expression and covering indexes for location filters and report queries
+
+Revision ID: 010_add_reporting_indexes
+Revises: 009_add_keyset_pagination_indexes
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010_add_reporting_indexes"
+down_revision: Union[str, None] = "009_add_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_KEY_COLUMNS = [
+    "organization_id",
+    "data_type",
+    "appointment_date",
+    "location_name",
+    "location_id",
+    "rooming_tech",
+    "provider",
+    "specialty",
+    "session",
+]
+ROLLUP_LOCATION_COLUMNS = [
+    "organization_id",
+    "data_type",
+    sa.text("lower(location_name)"),
+    "appointment_date",
+]
+
+
+def upgrade() -> None:
+    # Appointment lists filter on lower(location_name), which the plain
+    # (organization_id, location_name) index cannot serve
+    op.create_index(
+        "idx_appointments_org_location_lower",
+        "appointments",
+        ["organization_id", sa.text("lower(location_name)"), "appointment_date"],
+    )
+
+    # Everything the rollup aggregate reads from reportable appointments,
+    # so rebuilding an organization's date range is an index-only scan
+    op.create_index(
+        "idx_appointments_reportable",
+        "appointments",
+        ["organization_id", "data_type", "appointment_date"],
+        postgresql_include=[
+            "visit_points",
+            "session",
+            "rooming_tech",
+            "provider",
+            "specialty",
+            "location_name",
+            "location_id",
+        ],
+        postgresql_where=sa.text("NOT is_excluded_from_reporting"),
+    )
+
+    # Reports read the rollup by date range, or by location and date range;
+    # include the grouped and summed columns so they no longer visit the heap.
+    # ON CONFLICT still infers the unique index from its key columns.
+    op.drop_index("uq_daily_points_rollup_key", table_name="daily_points_rollup")
+    op.create_index(
+        "uq_daily_points_rollup_key",
+        "daily_points_rollup",
+        ROLLUP_KEY_COLUMNS,
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+        postgresql_include=["total_points", "appointment_count"],
+    )
+    op.drop_index("idx_daily_points_rollup_location", table_name="daily_points_rollup")
+    op.create_index(
+        "idx_daily_points_rollup_location",
+        "daily_points_rollup",
+        ROLLUP_LOCATION_COLUMNS,
+        postgresql_include=[
+            "rooming_tech",
+            "provider",
+            "specialty",
+            "session",
+            "total_points",
+            "appointment_count",
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_daily_points_rollup_location", table_name="daily_points_rollup")
+    op.create_index(
+        "idx_daily_points_rollup_location", "daily_points_rollup", ROLLUP_LOCATION_COLUMNS
+    )
+    op.drop_index("uq_daily_points_rollup_key", table_name="daily_points_rollup")
+    op.create_index(
+        "uq_daily_points_rollup_key",
+        "daily_points_rollup",
+        ROLLUP_KEY_COLUMNS,
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.drop_index("idx_appointments_reportable", table_name="appointments")
+    op.drop_index("idx_appointments_org_location_lower", table_name="appointments")
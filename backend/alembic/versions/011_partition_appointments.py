@@ -0,0 +1,83 @@
+"""Partition appointments by list on organization_id
+
+Revision ID: 011_partition_appointments
+Revises: 010_add_reporting_indexes
+Create Date: 2026-10-16
+
+"""
+
+import uuid
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011_partition_appointments"
+down_revision: Union[str, None] = "010_add_reporting_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = [
+    ("appointments_organization_id_fkey", "organizations", "organization_id", "CASCADE"),
+    ("appointments_upload_id_fkey", "uploads", "upload_id", "CASCADE"),
+    ("appointments_location_id_fkey", "locations", "location_id", "SET NULL"),
+    ("appointments_appointment_type_id_fkey", "appointment_types", "appointment_type_id",
+     "SET NULL"),
+]
+
+
+def upgrade() -> None:
+    # One partition per organization; app.services.partitions creates the
+    # partitions of organizations added later
+    _rebuild_appointments(
+        "PARTITION BY LIST (organization_id)", primary_key=["id", "organization_id"]
+    )
+
+
+def downgrade() -> None:
+    _rebuild_appointments("", primary_key=["id"])
+
+
+def _rebuild_appointments(partition_by: str, primary_key: List[str]) -> None:
+    """Recreate appointments with the same columns, constraints and indexes, and copy its rows.
+
+    Indexes are recreated from their current definitions, so the table keeps
+    every index added by earlier migrations.
+    """
+    conn = op.get_bind()
+    index_definitions = conn.execute(
+        sa.text(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = 'appointments' "
+            "AND indexname <> 'appointments_pkey'"
+        )
+    ).scalars().all()
+
+    op.rename_table("appointments", "appointments_old")
+    op.execute("ALTER INDEX appointments_pkey RENAME TO appointments_old_pkey")
+    op.execute(
+        "CREATE TABLE appointments "
+        "(LIKE appointments_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) " + partition_by
+    )
+    op.create_primary_key("appointments_pkey", "appointments", primary_key)
+    for name, referred_table, column, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(
+            name, "appointments", referred_table, [column], ["id"], ondelete=ondelete
+        )
+
+    if partition_by:
+        for (value,) in conn.execute(sa.text("SELECT id FROM organizations")):
+            org_id = uuid.UUID(str(value))
+            op.execute(
+                f"CREATE TABLE appointments_org_{org_id.hex} "
+                f"PARTITION OF appointments FOR VALUES IN ('{org_id}')"
+            )
+
+    op.execute("INSERT INTO appointments SELECT * FROM appointments_old")
+    op.drop_table("appointments_old")
+
+    for definition in index_definitions:
+        # Definitions on a partitioned table are reported as ON ONLY
+        op.execute(definition.replace(" ON ONLY ", " ON "))
+    op.execute("ANALYZE appointments")
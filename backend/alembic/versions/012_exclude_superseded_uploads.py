@@ -0,0 +1,86 @@
+"""Exclude appointments of superseded uploads from reporting
+
+Revision ID: 012_exclude_superseded_uploads
+Revises: 011_partition_appointments
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012_exclude_superseded_uploads"
+down_revision: Union[str, None] = "011_partition_appointments"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows of uploads replaced by a newer version no longer count
+    op.execute(
+        """
+        UPDATE appointments
+        SET is_excluded_from_reporting = TRUE, exclusion_reason = 'SUPERSEDED_UPLOAD'
+        WHERE NOT is_excluded_from_reporting
+          AND upload_id IN (SELECT id FROM uploads WHERE status = 'completed' AND NOT is_active)
+        """
+    )
+
+    # Rows of active uploads that were only duplicates of now superseded rows count again
+    op.execute(
+        """
+        UPDATE appointments AS a
+        SET is_duplicate = FALSE, is_excluded_from_reporting = FALSE, exclusion_reason = NULL
+        WHERE a.exclusion_reason = 'CROSS_UPLOAD_DUPLICATE'
+          AND a.dedup_key IS NOT NULL
+          AND a.upload_id IN (SELECT id FROM uploads WHERE is_active)
+          AND NOT EXISTS (
+              SELECT 1 FROM appointments AS e
+              WHERE e.organization_id = a.organization_id
+                AND e.data_type = a.data_type
+                AND e.dedup_key = a.dedup_key
+                AND NOT e.is_excluded_from_reporting
+                AND NOT e.is_draft
+                AND (e.upload_id IS NULL OR e.upload_id <> a.upload_id)
+                AND e.appointment_date = a.appointment_date
+                AND e.appointment_time = a.appointment_time
+          )
+        """
+    )
+
+    _rebuild_rollup()
+
+
+def downgrade() -> None:
+    # Duplicates un-flagged by the upgrade stay un-flagged
+    op.execute(
+        """
+        UPDATE appointments
+        SET is_excluded_from_reporting = FALSE, exclusion_reason = NULL
+        WHERE exclusion_reason = 'SUPERSEDED_UPLOAD'
+        """
+    )
+    _rebuild_rollup()
+
+
+def _rebuild_rollup() -> None:
+    """Recompute daily_points_rollup and invalidate every cached report."""
+    op.execute("DELETE FROM daily_points_rollup")
+    op.execute(
+        """
+        INSERT INTO daily_points_rollup (
+            organization_id, data_type, appointment_date, location_id, location_name,
+            rooming_tech, provider, specialty, session, total_points, appointment_count
+        )
+        SELECT organization_id, data_type, appointment_date, location_id, location_name,
+               rooming_tech, provider, specialty, session,
+               coalesce(sum(visit_points), 0), count(*)
+        FROM appointments
+        WHERE NOT is_excluded_from_reporting
+        GROUP BY organization_id, data_type, appointment_date, location_id, location_name,
+                 rooming_tech, provider, specialty, session
+        """
+    )
+    op.execute("UPDATE organizations SET data_version = data_version + 1")
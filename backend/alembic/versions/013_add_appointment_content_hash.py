@@ -0,0 +1,43 @@
+"""Add content_hash to appointments and delta counts to uploads
+
+Revision ID: 013_add_appointment_content_hash
+Revises: 012_exclude_superseded_uploads
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "013_add_appointment_content_hash"
+down_revision: Union[str, None] = "012_exclude_superseded_uploads"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left empty for existing rows: they never match a re-uploaded row, so
+    # the next upload of each type replaces its dataset in full, as before
+    op.add_column("appointments", sa.Column("content_hash", sa.BigInteger, nullable=True))
+    op.create_index(
+        "idx_appointments_content",
+        "appointments",
+        ["organization_id", "data_type", "content_hash"],
+        postgresql_where=sa.text("NOT is_excluded_from_reporting AND NOT is_draft"),
+    )
+
+    for column in ("unchanged_row_count", "removed_row_count"):
+        op.add_column(
+            "uploads",
+            sa.Column(column, sa.Integer, server_default=sa.text("0"), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("uploads", "removed_row_count")
+    op.drop_column("uploads", "unchanged_row_count")
+    op.drop_index("idx_appointments_content", table_name="appointments")
+    op.drop_column("appointments", "content_hash")
@@ -5,12 +5,14 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
 
 from app.api.deps import AdminUser, CurrentUser, DbSession, OrgId
+from app.api.responses import model_response
 from app.models.appointment_type import AppointmentType
 from app.schemas.appointment_type import (
     AppointmentTypeCreate,
     AppointmentTypeUpdate,
     AppointmentTypeResponse,
 )
+from app.services.point_recalculation import point_recalculation
 
 router = APIRouter(prefix="/appointment-types", tags=["Appointment Types"])
 
@@ -31,7 +33,7 @@ async def list_appointment_types(
         .order_by(AppointmentType.name)
     )
     types = result.scalars().all()
-    return [AppointmentTypeResponse.model_validate(at) for at in types]
+    return model_response([AppointmentTypeResponse.model_validate(at) for at in types])
 
 
 @router.post("/", response_model=AppointmentTypeResponse, status_code=status.HTTP_201_CREATED)
@@ -41,7 +43,9 @@ async def create_appointment_type(
     db: DbSession,
     org_id: OrgId,
 ):
-    """Create a new appointment type (admin only)."""
+    """Create a new appointment type (admin only).
+    Existing appointments of this visit type are given its points in the background.
+    """
     # Check for duplicate name
     existing = await db.execute(
         select(AppointmentType).where(
@@ -64,7 +68,13 @@ async def create_appointment_type(
     await db.flush()
     await db.refresh(new_type)
 
-    return AppointmentTypeResponse.model_validate(new_type)
+    # Appointments imported with this visit type before it existed get its points
+    await db.commit()
+    point_recalculation.submit(org_id)
+
+    return model_response(
+        AppointmentTypeResponse.model_validate(new_type), status.HTTP_201_CREATED
+    )
 
 
 @router.put("/{type_id}", response_model=AppointmentTypeResponse)
@@ -75,7 +85,9 @@ async def update_appointment_type(
     db: DbSession,
     org_id: OrgId,
 ):
-    """Update an appointment type (admin only)."""
+    """Update an appointment type (admin only).
+    New point values, names and activations are applied to existing appointments in the background.
+    """
     result = await db.execute(
         select(AppointmentType).where(
             AppointmentType.id == type_id,
@@ -96,4 +108,10 @@ async def update_appointment_type(
     await db.flush()
     await db.refresh(appt_type)
 
-    return AppointmentTypeResponse.model_validate(appt_type)
+    # Changes to what a visit type matches or scores are applied to existing
+    # appointments in the background, once committed
+    if update_fields.keys() & {"name", "point_value", "is_active"}:
+        await db.commit()
+        point_recalculation.submit(org_id)
+
+    return model_response(AppointmentTypeResponse.model_validate(appt_type))
@@ -4,9 +4,10 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import select, func
+from sqlalchemy import func, insert, select
 
 from app.api.deps import CurrentUser, DbSession, OrgId
+from app.api.responses import FastJSONResponse, model_response
 from app.models.appointment import Appointment
 from app.models.appointment_type import AppointmentType
 from app.models.location import Location
@@ -17,66 +18,192 @@ from app.schemas.appointment import (
     AppointmentResponse,
     AppointmentListResponse,
 )
-from app.services.upload_service import determine_session
+from app.services.export_service import (
+    ExportFormat,
+    export_columns,
+    export_response,
+    stream_query,
+)
+from app.services.pagination import CountMode, InvalidCursor, SortKey, count_rows, fetch_page
+from app.services.partitions import ensure_appointment_partition
+from app.services.rollup_service import RollupDelta, count_reportable_appointments
+from app.services.upload_service import appointment_dedup_key, determine_session
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
+# Keyset orderings, each matched by an index on (organization_id, *columns)
+APPOINTMENT_LIST_ORDER = [
+    SortKey(Appointment.appointment_date, descending=True),
+    SortKey(Appointment.appointment_time),
+    SortKey(Appointment.id),
+]
+DRAFT_LIST_ORDER = [
+    SortKey(Appointment.created_at, descending=True),
+    SortKey(Appointment.id, descending=True),
+]
+
+# Columns of a listed appointment, read as rows ready for FastJSONResponse (UUIDs as text)
+APPOINTMENT_LIST_COLUMNS = export_columns(
+    Appointment.__table__, list(AppointmentResponse.model_fields)
+)
 
-async def resolve_appointment_fields(
-    db, org_id: UUID, data: AppointmentCreate
-) -> dict:
-    """Resolve location_id, appointment_type_id, visit_points, and session for an appointment."""
-    # Resolve location_id
-    location_id = None
-    if data.location_name:
+# Columns of an appointment export: the fields of AppointmentResponse
+APPOINTMENT_EXPORT_COLUMNS = [
+    name for name in AppointmentResponse.model_fields if name != "organization_id"
+]
+
+
+# AppointmentCreate fields stored as given by manual entry and by drafts
+MANUAL_ENTRY_FIELDS = [
+    "data_type",
+    "department",
+    "location_name",
+    "provider",
+    "specialty",
+    "patient_encounter_number",
+    "appointment_date",
+    "appointment_time",
+    "visit_type",
+    "appt_comments",
+    "rooming_tech",
+    "check_in_time",
+    "check_in_comment",
+    "check_out_time",
+    "check_out_comment",
+    "visit_duration_min",
+    "total_wait_duration",
+    "tech_level",
+    "rooming_time",
+    "rooming_comment",
+    "tech_in",
+    "tech_out",
+    "tech_duration",
+    "tech_comment",
+    "check_in_to_tech",
+    "appt_time_to_tech",
+    "pt_check_time",
+    "primary_diagnosis",
+    "is_draft",
+]
+DRAFT_FIELDS = [
+    "data_type",
+    "department",
+    "location_name",
+    "provider",
+    "specialty",
+    "patient_encounter_number",
+    "appointment_date",
+    "appointment_time",
+    "visit_type",
+    "appt_comments",
+    "rooming_tech",
+    "is_draft",
+]
+
+
+async def resolve_appointment_batch(
+    db, org_id: UUID, appointments: List[AppointmentCreate]
+) -> List[dict]:
+    """Resolve location_id, appointment_type_id, visit_points, and session for appointments.
+
+    Locations and appointment types are looked up for the whole batch at
+    once, one query each, by their distinct lower-cased names.
+    """
+    location_names = {a.location_name.strip().lower() for a in appointments if a.location_name}
+    visit_types = {a.visit_type.strip().lower() for a in appointments if a.visit_type}
+
+    location_ids = {}
+    if location_names:
         loc_result = await db.execute(
-            select(Location).where(
+            select(Location.id, Location.name).where(
                 Location.organization_id == org_id,
-                func.lower(Location.name) == data.location_name.strip().lower(),
+                func.lower(Location.name).in_(location_names),
             )
         )
-        location = loc_result.scalar_one_or_none()
-        if location:
-            location_id = location.id
+        location_ids = {name.lower(): location_id for location_id, name in loc_result.all()}
 
-    # Resolve appointment type and points
-    appointment_type_id = None
-    visit_points = data.visit_points
-
-    if data.visit_type:
+    appt_types = {}
+    if visit_types:
         at_result = await db.execute(
             select(AppointmentType).where(
                 AppointmentType.organization_id == org_id,
-                func.lower(AppointmentType.name) == data.visit_type.strip().lower(),
+                func.lower(AppointmentType.name).in_(visit_types),
                 AppointmentType.is_active == True,  # noqa: E712
             )
         )
-        appt_type = at_result.scalar_one_or_none()
+        appt_types = {at.name.strip().lower(): at for at in at_result.scalars().all()}
+
+    resolved = []
+    for data in appointments:
+        location_id = (
+            location_ids.get(data.location_name.strip().lower()) if data.location_name else None
+        )
+
+        # Resolve appointment type and points
+        appointment_type_id = None
+        visit_points = data.visit_points
+        appt_type = appt_types.get(data.visit_type.strip().lower()) if data.visit_type else None
         if appt_type:
             appointment_type_id = appt_type.id
             if visit_points is None:
                 visit_points = appt_type.point_value
 
-    if visit_points is None:
-        visit_points = Decimal("0")
-
-    # Determine session
-    session = determine_session(data.appointment_time, data.session)
-
-    # Day of week and week of month
-    day_of_week = data.appointment_date.strftime("%A") if data.appointment_date else None
-    week_of_month = (
-        (data.appointment_date.day - 1) // 7 + 1 if data.appointment_date else None
-    )
-
-    return {
-        "location_id": location_id,
-        "appointment_type_id": appointment_type_id,
-        "visit_points": visit_points,
-        "session": session,
-        "day_of_week": day_of_week,
-        "week_of_month": week_of_month,
-    }
+        if visit_points is None:
+            visit_points = Decimal("0")
+
+        resolved.append({
+            "location_id": location_id,
+            "appointment_type_id": appointment_type_id,
+            "visit_points": visit_points,
+            "session": determine_session(data.appointment_time, data.session),
+            "day_of_week": data.appointment_date.strftime("%A") if data.appointment_date else None,
+            "week_of_month": (
+                (data.appointment_date.day - 1) // 7 + 1 if data.appointment_date else None
+            ),
+            "dedup_key": appointment_dedup_key(
+                data.data_type,
+                data.provider,
+                data.location_name,
+                data.appointment_date,
+                data.appointment_time,
+                data.visit_type,
+                data.rooming_tech,
+            ),
+        })
+
+    return resolved
+
+
+async def insert_manual_appointments(
+    db, org_id: UUID, appointments: List[AppointmentCreate], fields: List[str]
+) -> List[Appointment]:
+    """Insert manually entered appointments and add them to the report rollup.
+
+    All rows go out as one multi-row INSERT ... RETURNING, so the returned
+    objects already hold the stored values and need no refresh.
+    """
+    if not appointments:
+        return []
+
+    await ensure_appointment_partition(db, org_id)
+    resolved = await resolve_appointment_batch(db, org_id, appointments)
+    rows = [
+        {
+            "organization_id": org_id,
+            **{field: getattr(data, field) for field in fields},
+            **fields_resolved,
+            "source": "manual",
+        }
+        for data, fields_resolved in zip(appointments, resolved)
+    ]
+    result = await db.scalars(insert(Appointment).returning(Appointment), rows)
+    created = list(result.all())
+
+    rollup = RollupDelta(org_id)
+    for appt in created:
+        rollup.add(appt)
+    await rollup.apply(db)
+    return created
 
 
 @router.post("/", response_model=List[AppointmentResponse], status_code=status.HTTP_201_CREATED)
@@ -87,57 +214,57 @@ async def create_appointments(
     org_id: OrgId,
 ):
     """Create one or more appointments (manual entry)."""
-    created = []
-    for appt_data in data.appointments:
-        resolved = await resolve_appointment_fields(db, org_id, appt_data)
-
-        appt = Appointment(
-            organization_id=org_id,
-            data_type=appt_data.data_type,
-            department=appt_data.department,
-            location_id=resolved["location_id"],
-            location_name=appt_data.location_name,
-            provider=appt_data.provider,
-            specialty=appt_data.specialty,
-            patient_encounter_number=appt_data.patient_encounter_number,
-            appointment_date=appt_data.appointment_date,
-            day_of_week=resolved["day_of_week"],
-            week_of_month=resolved["week_of_month"],
-            appointment_time=appt_data.appointment_time,
-            session=resolved["session"],
-            visit_type=appt_data.visit_type,
-            visit_points=resolved["visit_points"],
-            appointment_type_id=resolved["appointment_type_id"],
-            appt_comments=appt_data.appt_comments,
-            rooming_tech=appt_data.rooming_tech,
-            check_in_time=appt_data.check_in_time,
-            check_in_comment=appt_data.check_in_comment,
-            check_out_time=appt_data.check_out_time,
-            check_out_comment=appt_data.check_out_comment,
-            visit_duration_min=appt_data.visit_duration_min,
-            total_wait_duration=appt_data.total_wait_duration,
-            tech_level=appt_data.tech_level,
-            rooming_time=appt_data.rooming_time,
-            rooming_comment=appt_data.rooming_comment,
-            tech_in=appt_data.tech_in,
-            tech_out=appt_data.tech_out,
-            tech_duration=appt_data.tech_duration,
-            tech_comment=appt_data.tech_comment,
-            check_in_to_tech=appt_data.check_in_to_tech,
-            appt_time_to_tech=appt_data.appt_time_to_tech,
-            pt_check_time=appt_data.pt_check_time,
-            primary_diagnosis=appt_data.primary_diagnosis,
-            source="manual",
-            is_draft=appt_data.is_draft,
-        )
-        db.add(appt)
-        created.append(appt)
+    created = await insert_manual_appointments(
+        db, org_id, data.appointments, MANUAL_ENTRY_FIELDS
+    )
+    return model_response(
+        [AppointmentResponse.model_validate(a) for a in created], status.HTTP_201_CREATED
+    )
 
-    await db.flush()
-    for appt in created:
-        await db.refresh(appt)
 
-    return [AppointmentResponse.model_validate(a) for a in created]
+def appointment_list_filters(
+    org_id: UUID,
+    location_name: Optional[str],
+    data_type: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    provider: Optional[str],
+    upload_id: Optional[UUID],
+    include_excluded: bool,
+) -> list:
+    """WHERE criteria of the appointment list and its export."""
+    criteria = [
+        Appointment.organization_id == org_id,
+        Appointment.is_draft == False,  # noqa: E712
+    ]
+    if not include_excluded:
+        criteria.append(Appointment.is_excluded_from_reporting == False)  # noqa: E712
+
+    if location_name:
+        criteria.append(func.lower(Appointment.location_name) == location_name.strip().lower())
+    if data_type:
+        criteria.append(Appointment.data_type == data_type)
+    if date_from:
+        criteria.append(Appointment.appointment_date >= date_from)
+    if date_to:
+        criteria.append(Appointment.appointment_date <= date_to)
+    if provider:
+        criteria.append(func.lower(Appointment.provider).contains(provider.strip().lower()))
+    if upload_id:
+        criteria.append(Appointment.upload_id == upload_id)
+    return criteria
+
+
+def appointment_list_response(
+    rows: list, total: Optional[int], total_is_estimate: bool, next_cursor: Optional[str]
+) -> FastJSONResponse:
+    """An AppointmentListResponse of APPOINTMENT_LIST_COLUMNS rows, without validating them."""
+    return FastJSONResponse({
+        "appointments": [row._asdict() for row in rows],
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/", response_model=AppointmentListResponse)
@@ -152,52 +279,74 @@ async def list_appointments(
     provider: Optional[str] = None,
     upload_id: Optional[UUID] = None,
     include_excluded: bool = False,
-    limit: int = Query(default=100, le=1000),
+    limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    count: CountMode = Query(
+        default="exact",
+        description="exact: COUNT the matches; estimated: rollup or planner estimate; none: skip",
+    ),
 ):
-    """List appointments with filters."""
-    query = select(Appointment).where(
-        Appointment.organization_id == org_id,
-        Appointment.is_draft == False,  # noqa: E712
+    """List appointments with filters.
+
+    Page with cursor (preferred; constant cost at any depth) or offset.
+    """
+    query = select(*APPOINTMENT_LIST_COLUMNS).where(
+        *appointment_list_filters(
+            org_id, location_name, data_type, date_from, date_to, provider, upload_id,
+            include_excluded,
+        )
     )
 
-    if not include_excluded:
-        query = query.where(Appointment.is_excluded_from_reporting == False)  # noqa: E712
-
-    if location_name:
-        query = query.where(
-            func.lower(Appointment.location_name) == location_name.strip().lower()
+    try:
+        appointments, next_cursor = await fetch_page(
+            db, query, APPOINTMENT_LIST_ORDER, cursor, limit, offset, entities=False
         )
-    if data_type:
-        query = query.where(Appointment.data_type == data_type)
-    if date_from:
-        query = query.where(Appointment.appointment_date >= date_from)
-    if date_to:
-        query = query.where(Appointment.appointment_date <= date_to)
-    if provider:
-        query = query.where(
-            func.lower(Appointment.provider).contains(provider.strip().lower())
-        )
-    if upload_id:
-        query = query.where(Appointment.upload_id == upload_id)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
+    if count == "estimated" and not include_excluded and not upload_id:
+        # Every remaining filter is a rollup dimension
+        total = await count_reportable_appointments(
+            db, org_id, location_name, data_type, date_from, date_to, provider
+        )
+        total_is_estimate = True
+    else:
+        total, total_is_estimate = await count_rows(db, query, count)
 
-    # Apply pagination
-    query = query.order_by(
-        Appointment.appointment_date.desc(),
-        Appointment.appointment_time,
-    ).limit(limit).offset(offset)
+    return appointment_list_response(appointments, total, total_is_estimate, next_cursor)
 
-    result = await db.execute(query)
-    appointments = result.scalars().all()
 
-    return AppointmentListResponse(
-        appointments=[AppointmentResponse.model_validate(a) for a in appointments],
-        total=total,
+@router.get("/export")
+async def export_appointments(
+    current_user: CurrentUser,
+    org_id: OrgId,
+    location_name: Optional[str] = None,
+    data_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    provider: Optional[str] = None,
+    upload_id: Optional[UUID] = None,
+    include_excluded: bool = False,
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export every appointment matching the list filters as CSV or XLSX.
+
+    Rows are read through a server-side cursor and written as they arrive, in
+    the list's order, so memory use does not grow with the number of rows.
+    """
+    query = (
+        select(*export_columns(Appointment.__table__, APPOINTMENT_EXPORT_COLUMNS))
+        .where(
+            *appointment_list_filters(
+                org_id, location_name, data_type, date_from, date_to, provider, upload_id,
+                include_excluded,
+            )
+        )
+        .order_by(*[key.order_by() for key in APPOINTMENT_LIST_ORDER])
+    )
+    return export_response(
+        "appointments", format, APPOINTMENT_EXPORT_COLUMNS, stream_query(query)
     )
 
 
@@ -224,6 +373,8 @@ async def update_appointment(
         )
 
     update_fields = data.model_dump(exclude_unset=True)
+    rollup = RollupDelta(org_id)
+    rollup.remove(appt)
 
     # If visit_type changed, recalculate points
     if "visit_type" in update_fields and update_fields["visit_type"]:
@@ -268,10 +419,22 @@ async def update_appointment(
         appt.day_of_week = appt.appointment_date.strftime("%A")
         appt.week_of_month = (appt.appointment_date.day - 1) // 7 + 1
 
+    appt.dedup_key = appointment_dedup_key(
+        appt.data_type,
+        appt.provider,
+        appt.location_name,
+        appt.appointment_date,
+        appt.appointment_time,
+        appt.visit_type,
+        appt.rooming_tech,
+    )
+
     await db.flush()
     await db.refresh(appt)
+    rollup.add(appt)
+    await rollup.apply(db)
 
-    return AppointmentResponse.model_validate(appt)
+    return model_response(AppointmentResponse.model_validate(appt))
 
 
 @router.delete("/{appointment_id}", status_code=status.HTTP_200_OK)
@@ -295,8 +458,11 @@ async def delete_appointment(
             detail="Appointment not found",
         )
 
+    rollup = RollupDelta(org_id)
+    rollup.remove(appt)
     await db.delete(appt)
     await db.flush()
+    await rollup.apply(db)
 
     return {"message": "Appointment deleted successfully"}
 
@@ -313,40 +479,10 @@ async def save_draft(
     for appt_data in data.appointments:
         appt_data.is_draft = True
 
-    created = []
-    for appt_data in data.appointments:
-        resolved = await resolve_appointment_fields(db, org_id, appt_data)
-
-        appt = Appointment(
-            organization_id=org_id,
-            data_type=appt_data.data_type,
-            department=appt_data.department,
-            location_id=resolved["location_id"],
-            location_name=appt_data.location_name,
-            provider=appt_data.provider,
-            specialty=appt_data.specialty,
-            patient_encounter_number=appt_data.patient_encounter_number,
-            appointment_date=appt_data.appointment_date,
-            day_of_week=resolved["day_of_week"],
-            week_of_month=resolved["week_of_month"],
-            appointment_time=appt_data.appointment_time,
-            session=resolved["session"],
-            visit_type=appt_data.visit_type,
-            visit_points=resolved["visit_points"],
-            appointment_type_id=resolved["appointment_type_id"],
-            appt_comments=appt_data.appt_comments,
-            rooming_tech=appt_data.rooming_tech,
-            source="manual",
-            is_draft=True,
-        )
-        db.add(appt)
-        created.append(appt)
-
-    await db.flush()
-    for appt in created:
-        await db.refresh(appt)
-
-    return [AppointmentResponse.model_validate(a) for a in created]
+    created = await insert_manual_appointments(db, org_id, data.appointments, DRAFT_FIELDS)
+    return model_response(
+        [AppointmentResponse.model_validate(a) for a in created], status.HTTP_201_CREATED
+    )
 
 
 @router.get("/drafts", response_model=AppointmentListResponse)
@@ -354,27 +490,24 @@ async def list_drafts(
     current_user: CurrentUser,
     db: DbSession,
     org_id: OrgId,
-    limit: int = Query(default=100, le=1000),
+    limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    count: CountMode = Query(default="exact"),
 ):
-    """List draft appointments."""
-    query = select(Appointment).where(
+    """List draft appointments, newest first."""
+    query = select(*APPOINTMENT_LIST_COLUMNS).where(
         Appointment.organization_id == org_id,
         Appointment.is_draft == True,  # noqa: E712
     )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
-    query = query.order_by(
-        Appointment.created_at.desc(),
-    ).limit(limit).offset(offset)
+    try:
+        appointments, next_cursor = await fetch_page(
+            db, query, DRAFT_LIST_ORDER, cursor, limit, offset, entities=False
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    result = await db.execute(query)
-    appointments = result.scalars().all()
+    total, total_is_estimate = await count_rows(db, query, count)
 
-    return AppointmentListResponse(
-        appointments=[AppointmentResponse.model_validate(a) for a in appointments],
-        total=total,
-    )
+    return appointment_list_response(appointments, total, total_is_estimate, next_cursor)
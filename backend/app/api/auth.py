@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, status
 from app.api.deps import CurrentUser, DbSession, OrgId
 from app.schemas.auth import LoginRequest, TokenResponse, UserMeResponse
 from app.services.auth_service import (
+    PasswordHashingBusy,
     authenticate_user,
     create_access_token,
     get_organization_name,
@@ -14,7 +15,14 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/login", response_model=TokenResponse)
 async def login(request: LoginRequest, db: DbSession):
     """Authenticate user and return a JWT token."""
-    user = await authenticate_user(db, request.email, request.password)
+    try:
+        user = await authenticate_user(db, request.email, request.password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many logins in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
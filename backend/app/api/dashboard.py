@@ -3,12 +3,28 @@ from typing import List, Optional
 from fastapi import APIRouter, Query
 
 from app.api.deps import CurrentUser, DbSession, OrgId
-from app.schemas.dashboard import DashboardOverviewResponse, LocationTableResponse
-from app.services.dashboard_service import get_dashboard_overview, get_location_table
+from app.api.responses import model_response
+from app.schemas.dashboard import (
+    DashboardOverviewResponse,
+    DashboardSummaryResponse,
+    LocationTableResponse,
+)
+from app.services.dashboard_service import (
+    get_dashboard_overview,
+    get_dashboard_summary,
+    get_location_table,
+)
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
+def parse_location_names(locations: Optional[str]) -> Optional[List[str]]:
+    """Location names from a comma-separated query parameter."""
+    if not locations:
+        return None
+    return [loc.strip() for loc in locations.split(",") if loc.strip()] or None
+
+
 @router.get("/overview", response_model=DashboardOverviewResponse)
 async def dashboard_overview(
     current_user: CurrentUser,
@@ -24,11 +40,8 @@ async def dashboard_overview(
 
     Optionally filter by location names (comma-separated).
     """
-    location_names = None
-    if locations:
-        location_names = [loc.strip() for loc in locations.split(",") if loc.strip()]
-
-    return await get_dashboard_overview(db, org_id, location_names, days)
+    overview = await get_dashboard_overview(db, org_id, parse_location_names(locations), days)
+    return model_response(overview)
 
 
 @router.get("/location-table", response_model=LocationTableResponse)
@@ -42,4 +55,26 @@ async def dashboard_location_table(
     ),
 ):
     """Get location table data with employee counts, YTD/MTD points, and manager names."""
-    return await get_location_table(db, org_id, search)
+    return model_response(await get_location_table(db, org_id, search))
+
+
+@router.get("/summary", response_model=DashboardSummaryResponse)
+async def dashboard_summary(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    locations: Optional[str] = Query(
+        default=None,
+        description="Comma-separated location names to filter the overview by",
+    ),
+    days: int = Query(default=10, ge=1, le=365, description="Number of days for trend data"),
+    search: Optional[str] = Query(
+        default=None,
+        description="Search keyword to filter the location table",
+    ),
+):
+    """Get the dashboard overview and location table in one response."""
+    summary = await get_dashboard_summary(
+        db, org_id, parse_location_names(locations), days, search
+    )
+    return model_response(summary)
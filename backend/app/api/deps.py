@@ -6,26 +6,34 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.services.auth_service import decode_access_token, get_user_by_id
-from app.models.user import User
+from app.services.auth_service import Principal, decode_access_token, get_active_principal
 
 security = HTTPBearer()
 
 
-async def get_current_user(
+async def get_token_payload(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    """Extract and validate the current user from the JWT token."""
-    token = credentials.credentials
-    payload = decode_access_token(token)
+) -> dict:
+    """Decode and verify the bearer token.
+
+    get_current_user and get_org_id both depend on this, and FastAPI caches
+    dependency results per request, so the signature is checked once.
+    """
+    payload = decode_access_token(credentials.credentials)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
 
+async def get_current_user(
+    payload: Annotated[dict, Depends(get_token_payload)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Principal:
+    """Resolve the token's user, from the principal cache when possible."""
     user_id_str = payload.get("sub")
     if not user_id_str:
         raise HTTPException(
@@ -41,28 +49,20 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    user = await get_user_by_id(db, user_id)
-    if user is None or not user.is_active:
+    principal = await get_active_principal(db, user_id)
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive",
         )
 
-    return user
+    return principal
 
 
 async def get_org_id(
-    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    payload: Annotated[dict, Depends(get_token_payload)],
 ) -> UUID:
-    """Extract organization ID from the JWT token."""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
-
+    """Extract organization ID from the JWT token. Needs no database access."""
     org_id_str = payload.get("org_id")
     if not org_id_str:
         raise HTTPException(
@@ -82,8 +82,8 @@ async def get_org_id(
 def require_role(*roles: str):
     """Dependency factory: require the current user to have one of the specified roles."""
     async def role_checker(
-        current_user: Annotated[User, Depends(get_current_user)],
-    ) -> User:
+        current_user: Annotated[Principal, Depends(get_current_user)],
+    ) -> Principal:
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -94,7 +94,7 @@ def require_role(*roles: str):
 
 
 # Common type aliases for dependency injection
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(require_role("clinic_admin"))]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+AdminUser = Annotated[Principal, Depends(require_role("clinic_admin"))]
 OrgId = Annotated[UUID, Depends(get_org_id)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
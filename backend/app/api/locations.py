@@ -2,15 +2,31 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.api.deps import AdminUser, CurrentUser, DbSession, OrgId
 from app.models.location import Location
 from app.schemas.location import LocationCreate, LocationUpdate, LocationResponse
+from app.services.report_cache import mark_report_data_changed
 
 router = APIRouter(prefix="/locations", tags=["Locations"])
 
 
+async def ensure_location_name_available(db, org_id: UUID, name: str) -> None:
+    """Location names are unique per organization, ignoring case."""
+    existing = await db.execute(
+        select(Location.id).where(
+            Location.organization_id == org_id,
+            func.lower(Location.name) == name.lower(),
+        )
+    )
+    if existing.first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A location with this name already exists",
+        )
+
+
 @router.get("/", response_model=List[LocationResponse])
 async def list_locations(
     current_user: CurrentUser,
@@ -35,6 +51,8 @@ async def create_location(
     org_id: OrgId,
 ):
     """Create a new location (admin only)."""
+    await ensure_location_name_available(db, org_id, location_data.name)
+
     new_location = Location(
         organization_id=org_id,
         name=location_data.name,
@@ -48,6 +66,7 @@ async def create_location(
     )
     db.add(new_location)
     await db.flush()
+    mark_report_data_changed(db, org_id)
     await db.refresh(new_location)
 
     return LocationResponse.model_validate(new_location)
@@ -76,10 +95,14 @@ async def update_location(
         )
 
     update_fields = location_data.model_dump(exclude_unset=True)
+    if update_fields.get("name") and update_fields["name"].lower() != location.name.lower():
+        await ensure_location_name_available(db, org_id, update_fields["name"])
+
     for field, value in update_fields.items():
         setattr(location, field, value)
 
     await db.flush()
+    mark_report_data_changed(db, org_id)
     await db.refresh(location)
 
     return LocationResponse.model_validate(location)
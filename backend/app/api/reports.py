@@ -1,12 +1,17 @@
+import re
+from typing import List
+
 from fastapi import APIRouter, HTTPException, Query, status
 
 from app.api.deps import CurrentUser, DbSession, OrgId
+from app.api.responses import model_response
 from app.schemas.report import (
     TechPointsByLocationResponse,
     MonthlyTechPointsResponse,
     ScheduledPointsByProviderResponse,
     PointsPaidTechFteResponse,
     WeeklyPointsByLocationResponse,
+    ReportBatchResponse,
 )
 from app.services.report_service import (
     get_tech_points_by_location,
@@ -14,10 +19,37 @@ from app.services.report_service import (
     get_scheduled_points_by_provider,
     get_points_paid_tech_fte,
     get_weekly_points_by_location,
+    get_report_batch,
+    BATCH_REPORTS,
+)
+from app.services.export_service import (
+    ExportFormat,
+    export_response,
+    in_batches,
+    tech_points_table,
+    scheduled_points_table,
+    points_paid_table,
+    weekly_points_table,
 )
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
+MAX_BATCH_LOCATIONS = 100
+MAX_BATCH_MONTHS = 24
+
+
+def split_list(value: str) -> List[str]:
+    """Distinct non-empty items of a comma-separated query parameter, in order."""
+    return list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+
+
+def check_period(period: str) -> None:
+    if period not in ("one_week", "four_weeks"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Period must be 'one_week' or 'four_weeks'",
+        )
+
 
 @router.get("/tech-points-by-location", response_model=TechPointsByLocationResponse)
 async def tech_points_by_location(
@@ -36,13 +68,10 @@ async def tech_points_by_location(
     Uses retrospective data. Period can be 'one_week' (last 7 days of month)
     or 'four_weeks' (full month).
     """
-    if period not in ("one_week", "four_weeks"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Period must be 'one_week' or 'four_weeks'",
-        )
+    check_period(period)
 
-    return await get_tech_points_by_location(db, org_id, location_name, month, period)
+    report = await get_tech_points_by_location(db, org_id, location_name, month, period)
+    return model_response(report)
 
 
 @router.get("/monthly-tech-points-by-location", response_model=MonthlyTechPointsResponse)
@@ -57,7 +86,8 @@ async def monthly_tech_points_by_location(
 
     Uses retrospective data.
     """
-    return await get_monthly_tech_points_by_location(db, org_id, location_name, month)
+    report = await get_monthly_tech_points_by_location(db, org_id, location_name, month)
+    return model_response(report)
 
 
 @router.get("/scheduled-points-by-provider", response_model=ScheduledPointsByProviderResponse)
@@ -72,7 +102,8 @@ async def scheduled_points_by_provider(
 
     Uses prospective data. Groups by location manager -> providers.
     """
-    return await get_scheduled_points_by_provider(db, org_id, location_name, month)
+    report = await get_scheduled_points_by_provider(db, org_id, location_name, month)
+    return model_response(report)
 
 
 @router.get("/points-paid-tech-fte", response_model=PointsPaidTechFteResponse)
@@ -87,7 +118,8 @@ async def points_paid_tech_fte(
 
     Uses retrospective data. Compares two months side by side.
     """
-    return await get_points_paid_tech_fte(db, org_id, month1, month2)
+    report = await get_points_paid_tech_fte(db, org_id, month1, month2)
+    return model_response(report)
 
 
 @router.get("/weekly-points-by-location", response_model=WeeklyPointsByLocationResponse)
@@ -102,4 +134,143 @@ async def weekly_points_by_location(
 
     Uses prospective data. Shows daily AM/PM/Total for each location.
     """
-    return await get_weekly_points_by_location(db, org_id, month, week)
+    report = await get_weekly_points_by_location(db, org_id, month, week)
+    return model_response(report)
+
+
+@router.get("/batch", response_model=ReportBatchResponse)
+async def report_batch(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    locations: str = Query(..., description="Comma-separated location names"),
+    months: str = Query(..., description="Comma-separated months in YYYY-MM format"),
+    reports: str = Query(
+        default=",".join(BATCH_REPORTS),
+        description="Comma-separated reports: " + ", ".join(BATCH_REPORTS),
+    ),
+    period: str = Query(
+        default="four_weeks",
+        description="Period of tech-points-by-location: one_week or four_weeks",
+    ),
+):
+    """Get per-location reports for several locations and months in one request.
+
+    Runs one query per report type across every location and month. Results
+    are keyed by location name, then month, and match the single-location
+    endpoints.
+    """
+    report_names = split_list(reports)
+    unknown = [name for name in report_names if name not in BATCH_REPORTS]
+    if unknown or not report_names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reports must be among: {', '.join(BATCH_REPORTS)}",
+        )
+    check_period(period)
+
+    location_names = split_list(locations)
+    if not location_names or len(location_names) > MAX_BATCH_LOCATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Give between 1 and {MAX_BATCH_LOCATIONS} locations",
+        )
+    month_list = split_list(months)
+    if not month_list or len(month_list) > MAX_BATCH_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Give between 1 and {MAX_BATCH_MONTHS} months",
+        )
+    if not all(re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", month) for month in month_list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Months must be in YYYY-MM format",
+        )
+
+    report = await get_report_batch(
+        db, org_id, report_names, location_names, month_list, period
+    )
+    return model_response(report)
+
+
+# CSV/XLSX exports of the reports above, one row per leaf of the JSON response
+
+@router.get("/tech-points-by-location/export")
+async def export_tech_points_by_location(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    location_name: str = Query(..., description="Location name"),
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    period: str = Query(default="four_weeks", description="Period: one_week or four_weeks"),
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export tech points by location as CSV or XLSX."""
+    check_period(period)
+    report = await get_tech_points_by_location(db, org_id, location_name, month, period)
+    header, rows = tech_points_table(report)
+    return export_response(f"tech-points-{month}", format, header, in_batches(rows))
+
+
+@router.get("/monthly-tech-points-by-location/export")
+async def export_monthly_tech_points_by_location(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    location_name: str = Query(..., description="Location name"),
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export monthly tech points by location as CSV or XLSX."""
+    report = await get_monthly_tech_points_by_location(db, org_id, location_name, month)
+    header, rows = tech_points_table(report)
+    return export_response(f"monthly-tech-points-{month}", format, header, in_batches(rows))
+
+
+@router.get("/scheduled-points-by-provider/export")
+async def export_scheduled_points_by_provider(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    location_name: str = Query(..., description="Location name"),
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export scheduled points by provider as CSV or XLSX."""
+    report = await get_scheduled_points_by_provider(db, org_id, location_name, month)
+    header, rows = scheduled_points_table(report)
+    return export_response(f"scheduled-points-{month}", format, header, in_batches(rows))
+
+
+@router.get("/points-paid-tech-fte/export")
+async def export_points_paid_tech_fte(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    month1: str = Query(..., description="First month in YYYY-MM format"),
+    month2: str = Query(..., description="Second month in YYYY-MM format"),
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export points by specialty/location across two months as CSV or XLSX."""
+    report = await get_points_paid_tech_fte(db, org_id, month1, month2)
+    header, rows = points_paid_table(report)
+    return export_response(
+        f"points-paid-tech-fte-{month1}-{month2}", format, header, in_batches(rows)
+    )
+
+
+@router.get("/weekly-points-by-location/export")
+async def export_weekly_points_by_location(
+    current_user: CurrentUser,
+    db: DbSession,
+    org_id: OrgId,
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    week: int = Query(..., ge=1, le=6, description="Week number (1-based)"),
+    format: ExportFormat = Query(default="csv", description="csv or xlsx"),
+):
+    """Export weekly points by location as CSV or XLSX."""
+    report = await get_weekly_points_by_location(db, org_id, month, week)
+    header, rows = weekly_points_table(report)
+    return export_response(
+        f"weekly-points-{month}-week{week}", format, header, in_batches(rows)
+    )
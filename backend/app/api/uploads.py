@@ -1,17 +1,68 @@
-from typing import List, Optional
-from uuid import UUID
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, status
+import aiofiles
+from fastapi import APIRouter, HTTPException, Query, Response, UploadFile, File, status
 from sqlalchemy import select
 
 from app.api.deps import AdminUser, CurrentUser, DbSession, OrgId
+from app.config import settings
 from app.models.upload import Upload
 from app.schemas.upload import UploadResponse, UploadListResponse
-from app.services.upload_service import process_upload
+from app.services.file_readers import supported_extensions
+from app.services.pagination import CountMode, InvalidCursor, SortKey, count_rows, fetch_page
+from app.services.upload_jobs import enqueue_upload, process_upload
+from app.services.upload_service import find_identical_upload
 
 router = APIRouter(prefix="/uploads", tags=["Uploads"])
 
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+SPOOL_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Keyset ordering for upload history, matched by idx_uploads_org_uploaded
+UPLOAD_LIST_ORDER = [
+    SortKey(Upload.uploaded_at, descending=True),
+    SortKey(Upload.id, descending=True),
+]
+
+
+async def spool_upload_file(file: UploadFile) -> Tuple[str, str]:
+    """Stream an uploaded file to UPLOAD_DIR without holding it in memory.
+
+    Enforces MAX_FILE_SIZE while copying and hashes the content on the way.
+    Returns (path, SHA-256 hex digest); the caller owns the file afterwards.
+    """
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    path = upload_dir / f".spool-{uuid4().hex}{Path(file.filename).suffix.lower()}"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(SPOOL_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="File exceeds maximum size of 50MB",
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty",
+            )
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return str(path), digest.hexdigest()
 
 
 @router.post("/retrospective", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
@@ -19,10 +70,17 @@ async def upload_retrospective(
     admin: AdminUser,
     db: DbSession,
     org_id: OrgId,
+    response: Response,
     file: UploadFile = File(...),
+    background: bool = Query(
+        default=False,
+        description="Process the file in the background and return 202 immediately",
+    ),
 ):
     """Upload a retrospective Excel/CSV file (admin only).
     Parses the file, calculates visit points, detects duplicates, and creates appointments.
+    With background=true the file is queued and progress is polled via GET /uploads/{id}.
+    Re-uploading the file of the active dataset returns its upload with 200.
     """
     if not file.filename:
         raise HTTPException(
@@ -32,34 +90,48 @@ async def upload_retrospective(
 
     # Validate file extension
     lower_name = file.filename.lower()
-    if not any(lower_name.endswith(ext) for ext in (".csv", ".xlsx", ".xls")):
+    extensions = supported_extensions()
+    if not any(lower_name.endswith(ext) for ext in extensions):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file format. Accepted: .csv, .xlsx, .xls",
+            detail=f"Invalid file format. Accepted: {', '.join(extensions)}",
         )
 
-    # Read file content
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="File exceeds maximum size of 50MB",
-        )
+    # Stream the file to disk
+    path, file_hash = await spool_upload_file(file)
 
-    if len(content) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is empty",
+    # The file of the active dataset again: nothing to ingest
+    existing = await find_identical_upload(db, org_id, "retrospective", file_hash)
+    if existing is not None:
+        os.remove(path)
+        response.status_code = status.HTTP_200_OK
+        return UploadResponse.model_validate(existing)
+
+    if background:
+        upload = await enqueue_upload(
+            db=db,
+            org_id=org_id,
+            user_id=admin.id,
+            upload_type="retrospective",
+            filename=file.filename,
+            path=path,
+            file_hash=file_hash,
         )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return UploadResponse.model_validate(upload)
 
-    upload = await process_upload(
-        db=db,
-        org_id=org_id,
-        user_id=admin.id,
-        upload_type="retrospective",
-        filename=file.filename,
-        file_content=content,
-    )
+    try:
+        upload = await process_upload(
+            db=db,
+            org_id=org_id,
+            user_id=admin.id,
+            upload_type="retrospective",
+            filename=file.filename,
+            path=path,
+            file_hash=file_hash,
+        )
+    finally:
+        os.remove(path)
 
     if upload.status == "failed":
         raise HTTPException(
@@ -75,10 +147,17 @@ async def upload_prospective(
     admin: AdminUser,
     db: DbSession,
     org_id: OrgId,
+    response: Response,
     file: UploadFile = File(...),
+    background: bool = Query(
+        default=False,
+        description="Process the file in the background and return 202 immediately",
+    ),
 ):
     """Upload a prospective Excel/CSV file (admin only).
     Parses the file, calculates visit points from appointment types, detects duplicates.
+    With background=true the file is queued and progress is polled via GET /uploads/{id}.
+    Re-uploading the file of the active dataset returns its upload with 200.
     """
     if not file.filename:
         raise HTTPException(
@@ -87,33 +166,48 @@ async def upload_prospective(
         )
 
     lower_name = file.filename.lower()
-    if not any(lower_name.endswith(ext) for ext in (".csv", ".xlsx", ".xls")):
+    extensions = supported_extensions()
+    if not any(lower_name.endswith(ext) for ext in extensions):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file format. Accepted: .csv, .xlsx, .xls",
+            detail=f"Invalid file format. Accepted: {', '.join(extensions)}",
         )
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="File exceeds maximum size of 50MB",
-        )
+    # Stream the file to disk
+    path, file_hash = await spool_upload_file(file)
 
-    if len(content) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is empty",
+    # The file of the active dataset again: nothing to ingest
+    existing = await find_identical_upload(db, org_id, "prospective", file_hash)
+    if existing is not None:
+        os.remove(path)
+        response.status_code = status.HTTP_200_OK
+        return UploadResponse.model_validate(existing)
+
+    if background:
+        upload = await enqueue_upload(
+            db=db,
+            org_id=org_id,
+            user_id=admin.id,
+            upload_type="prospective",
+            filename=file.filename,
+            path=path,
+            file_hash=file_hash,
         )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return UploadResponse.model_validate(upload)
 
-    upload = await process_upload(
-        db=db,
-        org_id=org_id,
-        user_id=admin.id,
-        upload_type="prospective",
-        filename=file.filename,
-        file_content=content,
-    )
+    try:
+        upload = await process_upload(
+            db=db,
+            org_id=org_id,
+            user_id=admin.id,
+            upload_type="prospective",
+            filename=file.filename,
+            path=path,
+            file_hash=file_hash,
+        )
+    finally:
+        os.remove(path)
 
     if upload.status == "failed":
         raise HTTPException(
@@ -131,8 +225,11 @@ async def list_uploads(
     org_id: OrgId,
     upload_type: Optional[str] = None,
     is_active: Optional[bool] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    count: CountMode = Query(default="exact"),
 ):
-    """List upload history for the organization."""
+    """List upload history for the organization, newest first, one page at a time."""
     query = select(Upload).where(Upload.organization_id == org_id)
 
     if upload_type:
@@ -140,13 +237,18 @@ async def list_uploads(
     if is_active is not None:
         query = query.where(Upload.is_active == is_active)
 
-    query = query.order_by(Upload.uploaded_at.desc())
-    result = await db.execute(query)
-    uploads = result.scalars().all()
+    try:
+        uploads, next_cursor = await fetch_page(db, query, UPLOAD_LIST_ORDER, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    total, total_is_estimate = await count_rows(db, query, count)
 
     return UploadListResponse(
         uploads=[UploadResponse.model_validate(u) for u in uploads],
-        total=len(uploads),
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
     )
 
 
@@ -157,7 +259,7 @@ async def get_upload(
     db: DbSession,
     org_id: OrgId,
 ):
-    """Get upload details."""
+    """Get upload details. Poll this for status and progress of background uploads."""
     result = await db.execute(
         select(Upload).where(
             Upload.id == upload_id,
@@ -15,7 +15,7 @@ from app.schemas.user import (
     UserWithLocationsResponse,
     UserBranchAssignment,
 )
-from app.services.auth_service import hash_password
+from app.services.auth_service import PasswordHashingBusy, forget_principal, hash_password
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -81,10 +81,19 @@ async def create_user(
             detail="A user with this email already exists in the organization",
         )
 
+    try:
+        password_hash = await hash_password(user_data.password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password changes in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
+
     new_user = User(
         organization_id=org_id,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=password_hash,
         full_name=user_data.full_name,
         role=user_data.role,
     )
@@ -122,6 +131,7 @@ async def update_user(
         setattr(user, field, value)
 
     await db.flush()
+    forget_principal(db, user.id)
     await db.refresh(user)
 
     return UserResponse.model_validate(user)
@@ -150,6 +160,7 @@ async def deactivate_user(
 
     user.is_active = False
     await db.flush()
+    forget_principal(db, user.id)
 
     return {"message": "User deactivated successfully"}
 
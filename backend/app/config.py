@@ -12,6 +12,22 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_HOURS: int = 24
     CORS_ORIGINS: str = '["http://localhost:3000","http://localhost:5173"]'
     UPLOAD_DIR: str = "./uploads"
+    KEEP_UPLOAD_FILES: bool = False  # keep background upload files after ingestion
+    UPLOAD_CHUNK_ROWS: int = 10000
+    EXCEL_FAST_READER_MAX_MB: int = 10
+    UPLOAD_WORKER_PROCESSES: int = 2
+    UPLOAD_JOBS_PER_ORG: int = 1
+    UPLOAD_JOBS_PER_ORG_OVERRIDES: str = "{}"
+    POINT_RECALC_BATCH_DAYS: int = 31
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_BACKEND: str = "memory"  # or "package.module:factory" returning a CacheBackend
+    REPORT_CACHE_MAX_ENTRIES: int = 2048
+    REPORT_CACHE_TTL_SECONDS: int = 300
 
     @property
     def cors_origins_list(self) -> List[str]:
@@ -20,6 +36,14 @@ class Settings(BaseSettings):
         except (json.JSONDecodeError, TypeError):
             return ["http://localhost:3000", "http://localhost:5173"]
 
+    def upload_jobs_limit(self, org_id: str) -> int:
+        """Concurrent background uploads allowed for an organization."""
+        try:
+            overrides = json.loads(self.UPLOAD_JOBS_PER_ORG_OVERRIDES)
+        except (json.JSONDecodeError, TypeError):
+            overrides = {}
+        return max(1, int(overrides.get(str(org_id), self.UPLOAD_JOBS_PER_ORG)))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,5 +1,8 @@
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.config import settings
 
@@ -22,6 +25,28 @@ class Base(DeclarativeBase):
     pass
 
 
+class random_uuid(FunctionElement):
+    """A random UUID made by the database, for server defaults of UUID keys.
+
+    gen_random_uuid() on PostgreSQL, as in the migrations; 32 random hex
+    digits elsewhere, the form UUID columns are stored in there. Rows added
+    with INSERT ... SELECT get their ids from it.
+    """
+
+    type = UUID(as_uuid=True)
+    inherit_cache = True
+
+
+@compiles(random_uuid)
+def _compile_random_uuid(element: random_uuid, compiler, **kw) -> str:
+    return "gen_random_uuid()"
+
+
+@compiles(random_uuid, "sqlite")
+def _compile_random_uuid_sqlite(element: random_uuid, compiler, **kw) -> str:
+    return "lower(hex(randomblob(16)))"
+
+
 async def get_db() -> AsyncSession:
     """Dependency that yields a database session."""
     async with AsyncSessionLocal() as session:
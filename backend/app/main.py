@@ -5,14 +5,25 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api import auth, users, locations, appointment_types, uploads, appointments, reports, dashboard
+from app.services.auth_service import password_hasher
+from app.services.loop_monitor import loop_monitor
+from app.services.point_recalculation import point_recalculation
+from app.services.report_cache import report_cache
+from app.services.upload_jobs import upload_jobs
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown lifecycle."""
     # Startup
+    loop_monitor.start()
+    await upload_jobs.start()
     yield
     # Shutdown
+    await loop_monitor.stop()
+    await upload_jobs.shutdown()
+    await point_recalculation.shutdown()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -46,3 +57,19 @@ app.include_router(dashboard.router, prefix="/api/v1")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "optimizeflow-api"}
+
+
+@app.get("/health/report-cache", tags=["Health"])
+async def report_cache_stats():
+    """Report cache size and hit/miss counters for this worker process."""
+    return report_cache.stats()
+
+
+@app.get("/health/event-loop", tags=["Health"])
+async def event_loop_lag():
+    """How late this worker's event loop runs ready tasks, in milliseconds.
+
+    Lag stays near zero unless something blocks the loop; requests served by
+    the worker are delayed by as much.
+    """
+    return loop_monitor.stats()
@@ -4,6 +4,7 @@ from app.models.location import Location, user_locations
 from app.models.appointment_type import AppointmentType
 from app.models.upload import Upload
 from app.models.appointment import Appointment
+from app.models.daily_points_rollup import DailyPointsRollup
 
 __all__ = [
     "Organization",
@@ -13,4 +14,5 @@ __all__ = [
     "AppointmentType",
     "Upload",
     "Appointment",
+    "DailyPointsRollup",
 ]
@@ -13,19 +13,36 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     Index,
+    BigInteger,
+    func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, random_uuid
 
 
 class Appointment(Base):
+    """One appointment row, from an upload or manual entry.
+
+    On PostgreSQL the table is partitioned by list on organization_id, one
+    partition per organization (see app.services.partitions), so the
+    partition key is part of the primary key.
+    """
+
     __tablename__ = "appointments"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # The server defaults match the migrations; rows moved in with INSERT ...
+    # SELECT (appointment_loader.insert_staged_rows) get id and timestamps from them
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=random_uuid()
+    )
     organization_id = Column(
-        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
     )
     upload_id = Column(
         UUID(as_uuid=True), ForeignKey("uploads.id", ondelete="CASCADE"), nullable=True
@@ -78,6 +95,8 @@ class Appointment(Base):
     is_duplicate = Column(Boolean, default=False, nullable=False)
     is_excluded_from_reporting = Column(Boolean, default=False, nullable=False)
     exclusion_reason = Column(String(50))
+    dedup_key = Column(BigInteger)  # hash of the duplicate key fields, see appointment_dedup_key
+    content_hash = Column(BigInteger)  # hash of the row as read, see content_hash_column
 
     # Source
     source = Column(String(20), default="csv", nullable=False)  # csv, manual
@@ -87,18 +106,29 @@ class Appointment(Base):
     is_draft = Column(Boolean, default=False, nullable=False)
 
     created_at = Column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
     )
     updated_at = Column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False,
     )
 
     __table_args__ = (
         Index("idx_appointments_org_date", "organization_id", "appointment_date"),
         Index("idx_appointments_org_location", "organization_id", "location_name"),
+        # Case-insensitive location filters: lower(location_name) = :name
+        Index(
+            "idx_appointments_org_location_lower",
+            "organization_id",
+            text("lower(location_name)"),
+            "appointment_date",
+        ),
         Index("idx_appointments_org_type", "organization_id", "data_type"),
         Index(
             "idx_appointments_reporting",
@@ -107,6 +137,54 @@ class Appointment(Base):
             "data_type",
         ),
         Index("idx_appointments_upload", "upload_id"),
+        # Covers the rollup's source aggregate (rollup_service.reportable_totals)
+        Index(
+            "idx_appointments_reportable",
+            "organization_id",
+            "data_type",
+            "appointment_date",
+            postgresql_include=[
+                "visit_points",
+                "session",
+                "rooming_tech",
+                "provider",
+                "specialty",
+                "location_name",
+                "location_id",
+            ],
+            postgresql_where=text("NOT is_excluded_from_reporting"),
+        ),
+        # Keyset pagination orders of list_appointments and list_drafts
+        Index(
+            "idx_appointments_org_listing",
+            "organization_id",
+            text("appointment_date DESC"),
+            "appointment_time",
+            "id",
+        ),
+        Index(
+            "idx_appointments_org_drafts",
+            "organization_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_draft"),
+        ),
+        Index(
+            "idx_appointments_dedup",
+            "organization_id",
+            "data_type",
+            "dedup_key",
+            postgresql_where=text("NOT is_excluded_from_reporting AND NOT is_draft"),
+        ),
+        # Matches re-uploaded rows against the active dataset (appointment_loader)
+        Index(
+            "idx_appointments_content",
+            "organization_id",
+            "data_type",
+            "content_hash",
+            postgresql_where=text("NOT is_excluded_from_reporting AND NOT is_draft"),
+        ),
+        {"postgresql_partition_by": "LIST (organization_id)"},
     )
 
     # Relationships
@@ -0,0 +1,124 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column,
+    String,
+    Numeric,
+    Integer,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base, random_uuid
+
+
+def null_safe_key(column):
+    """A rollup key column as SQLite's unique key compares it: NULL as ''.
+
+    SQLite has no NULLS NOT DISTINCT, and two NULLs never conflict in a
+    plain unique index.
+    """
+    return func.coalesce(column, literal_column("''")) if column.nullable else column
+
+
+class DailyPointsRollup(Base):
+    """Visit points per day and report dimension, summed over reportable appointments.
+
+    One row per distinct (organization, data_type, date, location, rooming_tech,
+    provider, specialty, session) among appointments that are not excluded
+    from reporting. Reports and the dashboard read this table instead of
+    scanning appointments; app.services.rollup_service keeps it in step.
+    """
+
+    __tablename__ = "daily_points_rollup"
+
+    # The server defaults match the migration; rows merged in with INSERT ... SELECT
+    # (rollup_service) get id and updated_at from them
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=random_uuid()
+    )
+    organization_id = Column(
+        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
+    )
+    data_type = Column(String(20), nullable=False)  # retrospective, prospective
+    appointment_date = Column(Date, nullable=False)
+    location_id = Column(
+        UUID(as_uuid=True), ForeignKey("locations.id", ondelete="SET NULL"), nullable=True
+    )
+    location_name = Column(String(255), nullable=False)
+    rooming_tech = Column(String(255))
+    provider = Column(String(255), nullable=False)
+    specialty = Column(String(255))
+    session = Column(String(5))  # AM, PM
+
+    total_points = Column(Numeric(14, 2), default=0, nullable=False)
+    appointment_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Upsert target; leads with the columns every report filters on and
+        # includes the sums, so reports without a location are index-only scans
+        Index(
+            "uq_daily_points_rollup_key",
+            "organization_id",
+            "data_type",
+            "appointment_date",
+            "location_name",
+            "location_id",
+            "rooming_tech",
+            "provider",
+            "specialty",
+            "session",
+            unique=True,
+            postgresql_include=["total_points", "appointment_count"],
+            postgresql_nulls_not_distinct=True,
+        ).ddl_if(dialect="postgresql"),
+        # The same key on SQLite, with NULLs made equal by null_safe_key
+        Index(
+            "uq_daily_points_rollup_key_sqlite",
+            *[
+                null_safe_key(column)
+                for column in (
+                    organization_id,
+                    data_type,
+                    appointment_date,
+                    location_name,
+                    location_id,
+                    rooming_tech,
+                    provider,
+                    specialty,
+                    session,
+                )
+            ],
+            unique=True,
+        ).ddl_if(dialect="sqlite"),
+        # Report queries by location; the included columns make them index-only scans
+        Index(
+            "idx_daily_points_rollup_location",
+            organization_id,
+            data_type,
+            func.lower(location_name),
+            appointment_date,
+            postgresql_include=[
+                "rooming_tech",
+                "provider",
+                "specialty",
+                "session",
+                "total_points",
+                "appointment_count",
+            ],
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Table, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, Table, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -53,6 +53,10 @@ class Location(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("uq_locations_org_name", organization_id, func.lower(name), unique=True),
+    )
+
     # Relationships
     organization = relationship("Organization", back_populates="locations")
     users = relationship(
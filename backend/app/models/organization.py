@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -14,6 +14,8 @@ class Organization(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     slug = Column(String(100), unique=True, nullable=False)
+    # Bumped whenever reporting data changes; part of every report cache key
+    data_version = Column(BigInteger, default=0, nullable=False)
     created_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
     )
@@ -32,5 +34,9 @@ class Organization(Base):
     )
     uploads = relationship("Upload", back_populates="organization", cascade="all, delete-orphan")
     appointments = relationship(
-        "Appointment", back_populates="organization", cascade="all, delete-orphan"
+        "Appointment",
+        back_populates="organization",
+        cascade="all, delete-orphan",
+        # Left to ON DELETE CASCADE instead of loading and deleting each row
+        passive_deletes=True,
     )
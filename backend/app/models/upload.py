@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -25,8 +25,14 @@ class Upload(Base):
     row_count = Column(Integer, default=0, nullable=False)
     valid_row_count = Column(Integer, default=0, nullable=False)
     duplicate_count = Column(Integer, default=0, nullable=False)
+    unchanged_row_count = Column(Integer, default=0, nullable=False)  # kept from earlier versions
+    removed_row_count = Column(Integer, default=0, nullable=False)  # earlier rows not in the file
     status = Column(String(20), default="processing", nullable=False)  # processing, completed, failed
+    progress_percent = Column(Integer, default=0, nullable=False)
+    file_reader = Column(String(50))  # reader chosen for the file, e.g. openpyxl-streaming
+    read_duration_ms = Column(Integer)  # time spent reading the file
     error_message = Column(Text)
+    # Latest completed version of its type; its unchanged rows stay with the upload that added them
     is_active = Column(Boolean, default=True, nullable=False)
     uploaded_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
@@ -35,9 +41,23 @@ class Upload(Base):
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
     )
 
+    __table_args__ = (
+        # Keyset pagination order of list_uploads
+        Index(
+            "idx_uploads_org_uploaded",
+            "organization_id",
+            text("uploaded_at DESC"),
+            text("id DESC"),
+        ),
+    )
+
     # Relationships
     organization = relationship("Organization", back_populates="uploads")
     uploaded_by_user = relationship("User", back_populates="uploads")
     appointments = relationship(
-        "Appointment", back_populates="upload", cascade="all, delete-orphan"
+        "Appointment",
+        back_populates="upload",
+        cascade="all, delete-orphan",
+        # Left to ON DELETE CASCADE instead of loading and deleting each row
+        passive_deletes=True,
     )
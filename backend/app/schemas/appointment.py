@@ -108,4 +108,6 @@ class AppointmentResponse(BaseModel):
 
 class AppointmentListResponse(BaseModel):
     appointments: List[AppointmentResponse]
-    total: int
+    total: Optional[int] = None  # None when count=none was requested
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # pass as cursor to get the next page
@@ -35,3 +35,9 @@ class LocationTableResponse(BaseModel):
     """Response for location table."""
     locations: List[LocationTableRow]
     total: int
+
+
+class DashboardSummaryResponse(BaseModel):
+    """Response for the dashboard summary: overview and location table together."""
+    overview: DashboardOverviewResponse
+    location_table: LocationTableResponse
@@ -100,3 +100,16 @@ class WeeklyPointsByLocationResponse(BaseModel):
     month: str
     week: int
     locations: List[LocationWeeklyPoints]
+
+
+class ReportBatchResponse(BaseModel):
+    """Response for the batch report.
+
+    Each requested report is keyed by location name, then month; reports that
+    were not requested are empty.
+    """
+    locations: List[str]
+    months: List[str]
+    tech_points_by_location: Dict[str, Dict[str, TechPointsByLocationResponse]] = {}
+    monthly_tech_points_by_location: Dict[str, Dict[str, MonthlyTechPointsResponse]] = {}
+    scheduled_points_by_provider: Dict[str, Dict[str, ScheduledPointsByProviderResponse]] = {}
@@ -15,7 +15,12 @@ class UploadResponse(BaseModel):
     row_count: int
     valid_row_count: int
     duplicate_count: int
+    unchanged_row_count: int
+    removed_row_count: int
     status: str
+    progress_percent: int
+    file_reader: Optional[str] = None
+    read_duration_ms: Optional[int] = None
     error_message: Optional[str] = None
     is_active: bool
     uploaded_at: datetime
@@ -26,4 +31,6 @@ class UploadResponse(BaseModel):
 
 class UploadListResponse(BaseModel):
     uploads: list[UploadResponse]
-    total: int
+    total: Optional[int] = None  # None when count=none was requested
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # pass as cursor to get the next page
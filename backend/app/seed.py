@@ -18,6 +18,7 @@ from app.models.user import User
 from app.models.location import Location, user_locations
 from app.models.appointment_type import AppointmentType
 from app.services.auth_service import hash_password
+from app.services.partitions import ensure_appointment_partition
 
 
 # Seed data definitions
@@ -131,6 +132,7 @@ async def seed_database():
             org = Organization(**ORGANIZATION)
             session.add(org)
             await session.flush()
+            await ensure_appointment_partition(session, org.id)
             print(f"  Created organization: {org.name} (ID: {org.id})")
 
             # 2. Create users
@@ -139,7 +141,7 @@ async def seed_database():
                 user = User(
                     organization_id=org.id,
                     email=user_data["email"],
-                    password_hash=hash_password(user_data["password"]),
+                    password_hash=await hash_password(user_data["password"]),
                     full_name=user_data["full_name"],
                     role=user_data["role"],
                 )
@@ -0,0 +1,224 @@
+from typing import List
+from uuid import UUID
+
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Index,
+    MetaData,
+    Table,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.appointment import Appointment
+
+# Columns supplied by the loader; id and timestamps come from the columns' server defaults
+APPOINTMENT_LOAD_COLUMNS = [
+    column.name
+    for column in Appointment.__table__.columns
+    if column.name not in ("id", "created_at", "updated_at")
+]
+
+# Rows per multi-row INSERT on engines without COPY (keeps bind params well under SQLite's limit)
+INSERT_BATCH_SIZE = 500
+
+# Per-connection scratch table that an upload is loaded into before it is
+# compared with existing appointments and moved across
+APPOINTMENT_STAGING = Table(
+    "appointment_staging",
+    MetaData(),
+    *[
+        Column(column.name, column.type)
+        for column in Appointment.__table__.columns
+        if column.name in APPOINTMENT_LOAD_COLUMNS
+    ],
+    # Probed once per earlier row of the dataset by superseded_rows
+    Index("appointment_staging_content", "content_hash"),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# Text fields of the duplicate key, compared case-insensitively
+_DEDUP_TEXT_FIELDS = {
+    "retrospective": ["provider", "location_name", "visit_type", "rooming_tech"],
+    "prospective": ["provider", "location_name", "visit_type"],
+}
+
+
+def supports_copy(conn: AsyncConnection) -> bool:
+    """Whether the connection can stream rows with asyncpg's binary COPY."""
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+
+
+async def create_staging_table(db: AsyncSession) -> None:
+    """Create the connection's staging table for an upload, if it does not exist yet.
+
+    The whole file is staged before anything is written to appointments, so
+    it can be compared with the active dataset in one pass (see
+    superseded_rows and drop_unchanged_staged_rows) and the rest moved
+    across with insert_staged_rows.
+    """
+    conn = await db.connection()
+    await conn.run_sync(lambda sync_conn: APPOINTMENT_STAGING.create(sync_conn, checkfirst=True))
+
+
+async def stage_upload_rows(db: AsyncSession, frame: pd.DataFrame) -> None:
+    """Load a chunk of upload rows into the staging table."""
+    if frame.empty:
+        return
+
+    # Pending ORM objects (the Upload, new locations) must exist before the FKs are checked
+    await db.flush()
+
+    conn = await db.connection()
+    await _load_frame(conn, APPOINTMENT_STAGING, frame)
+
+
+async def analyze_staged_rows(db: AsyncSession) -> None:
+    """Give the planner statistics for the staging table, which autovacuum never analyzes."""
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text(f"ANALYZE {APPOINTMENT_STAGING.name}"))
+
+
+def superseded_rows(upload_type: str, upload_id: UUID) -> list:
+    """Criteria for the rows of earlier uploads of a type that the staged file does not repeat.
+
+    A staged row repeats an appointment when their content_hash is equal;
+    rows stored before content hashes existed never match. Combine with the
+    organization and NOT is_excluded_from_reporting.
+    """
+    staged = APPOINTMENT_STAGING.c
+    return [
+        Appointment.data_type == upload_type,
+        Appointment.upload_id.is_not(None),
+        Appointment.upload_id != upload_id,
+        Appointment.is_draft == False,  # noqa: E712
+        ~exists().where(
+            staged.content_hash == Appointment.content_hash,
+            staged.is_duplicate == False,  # noqa: E712
+        ),
+    ]
+
+
+async def drop_unchanged_staged_rows(db: AsyncSession, org_id: UUID, upload_type: str) -> int:
+    """Drop staged rows that repeat a reported row of an earlier upload.
+
+    Those appointments stay as they are, with the upload that first added
+    them. Run after the superseded rows are excluded, so every reported
+    upload row of the type left is one the file repeats. Within-file
+    duplicates are kept and stored as before. Uses the (organization_id,
+    data_type, content_hash) index of the organization's partition.
+    Returns the number of rows dropped.
+    """
+    staged = APPOINTMENT_STAGING.c
+    existing = Appointment.__table__.alias("existing")
+    result = await db.execute(
+        delete(APPOINTMENT_STAGING).where(
+            staged.is_duplicate == False,  # noqa: E712
+            exists().where(
+                existing.c.organization_id == org_id,
+                existing.c.data_type == upload_type,
+                existing.c.content_hash == staged.content_hash,
+                existing.c.is_excluded_from_reporting == False,  # noqa: E712
+                existing.c.is_draft == False,  # noqa: E712
+                existing.c.upload_id.is_not(None),
+            ),
+        )
+    )
+    return result.rowcount
+
+
+async def insert_staged_rows(db: AsyncSession, org_id: UUID, upload_type: str) -> int:
+    """Move the staged rows into appointments, flagging those that duplicate earlier data.
+
+    One UPDATE marks staged rows whose dedup_key matches a reported
+    appointment from another upload or manual entry, as
+    exclusion_reason="CROSS_UPLOAD_DUPLICATE". The match uses the
+    (organization_id, data_type, dedup_key) index of the organization's
+    partition and then compares the key fields themselves. One INSERT ...
+    SELECT then moves the rows into appointments. Rows already flagged as
+    within-file duplicates keep that flag.
+    Returns the number of cross-upload duplicates found.
+    """
+    conn = await db.connection()
+    result = await conn.execute(_flag_cross_upload_duplicates(org_id, upload_type))
+    # id and timestamps come from the server defaults declared on Appointment
+    await conn.execute(
+        insert(Appointment).from_select(
+            APPOINTMENT_LOAD_COLUMNS,
+            select(*[APPOINTMENT_STAGING.c[col] for col in APPOINTMENT_LOAD_COLUMNS]),
+            include_defaults=False,
+        )
+    )
+    await conn.execute(delete(APPOINTMENT_STAGING))
+    return result.rowcount
+
+
+def _flag_cross_upload_duplicates(org_id: UUID, upload_type: str):
+    """UPDATE of the staging table marking rows that match an existing appointment."""
+    staged = APPOINTMENT_STAGING.c
+    existing = Appointment.__table__.alias("existing")
+    matches = exists().where(
+        # A constant rather than staged.organization_id, so only one partition is planned
+        existing.c.organization_id == org_id,
+        existing.c.data_type == staged.data_type,
+        existing.c.dedup_key == staged.dedup_key,
+        existing.c.is_excluded_from_reporting == False,  # noqa: E712
+        existing.c.is_draft == False,  # noqa: E712
+        or_(existing.c.upload_id.is_(None), existing.c.upload_id != staged.upload_id),
+        existing.c.appointment_date == staged.appointment_date,
+        existing.c.appointment_time == staged.appointment_time,
+        *[
+            func.coalesce(func.lower(existing.c[field]), "")
+            == func.coalesce(func.lower(staged[field]), "")
+            for field in _DEDUP_TEXT_FIELDS[upload_type]
+        ],
+    )
+    return (
+        update(APPOINTMENT_STAGING)
+        .where(staged.is_duplicate == False, matches)  # noqa: E712
+        .values(
+            is_duplicate=True,
+            is_excluded_from_reporting=True,
+            exclusion_reason="CROSS_UPLOAD_DUPLICATE",
+        )
+    )
+
+
+async def _load_frame(conn: AsyncConnection, table: Table, frame: pd.DataFrame) -> None:
+    """Load a frame's rows into table: one binary COPY on PostgreSQL, batched INSERTs elsewhere."""
+    columns = [col for col in APPOINTMENT_LOAD_COLUMNS if col in frame.columns]
+    if supports_copy(conn):
+        await _copy_records(conn, table, frame, columns)
+    else:
+        await _insert_batches(conn, table, frame, columns)
+
+
+async def _copy_records(
+    conn: AsyncConnection, table: Table, frame: pd.DataFrame, columns: List[str]
+) -> None:
+    """Stream rows into a table with COPY ... FROM STDIN (BINARY)."""
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=frame[columns].itertuples(index=False, name=None),
+        columns=columns,
+    )
+
+
+async def _insert_batches(
+    conn: AsyncConnection, table: Table, frame: pd.DataFrame, columns: List[str]
+) -> None:
+    """Insert rows with multi-row INSERT ... VALUES statements."""
+    for start in range(0, len(frame), INSERT_BATCH_SIZE):
+        batch = frame.iloc[start:start + INSERT_BATCH_SIZE][columns].to_dict("records")
+        await conn.execute(insert(table).values(batch))
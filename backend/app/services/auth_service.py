@@ -1,27 +1,122 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, NamedTuple, Optional, Tuple, TypeVar
 from uuid import UUID
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.user import User
 from app.models.organization import Organization
+from app.services.report_cache import MemoryCacheBackend
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below BCRYPT_ROUNDS are upgraded when their user next logs in
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
+T = TypeVar("T")
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+# Session.info key for users whose cached principal must be dropped after commit
+_CHANGED_USERS = "principal_cache_changed_users"
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+class Principal(NamedTuple):
+    """The authenticated user as seen by route handlers.
+
+    An immutable snapshot of the User row, so it can be cached and shared
+    between requests without being tied to any session.
+    """
+
+    id: UUID
+    organization_id: UUID
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            user.id, user.organization_id, user.email, user.full_name, user.role, user.is_active
+        )
+
+
+# Active principals by user id, so authenticated requests usually skip the users query.
+# Per process: an update made through another worker shows up here within the TTL.
+principal_cache = MemoryCacheBackend(settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+class PasswordHashingBusy(Exception):
+    """Too many password hashes are already running or waiting; retry shortly."""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a bounded thread pool.
+
+    A bcrypt hash takes a few hundred milliseconds of CPU. bcrypt releases
+    the GIL while hashing, so a thread pool keeps that off the event loop
+    and other requests keep being served during a wave of logins. At most
+    settings.PASSWORD_HASH_WORKERS hashes run at once per server process;
+    once settings.PASSWORD_HASH_QUEUE_LIMIT calls are running or waiting,
+    further calls raise PasswordHashingBusy instead of queueing without
+    bound.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._pending >= settings.PASSWORD_HASH_QUEUE_LIMIT:
+            raise PasswordHashingBusy()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, password_hash: str
+    ) -> Tuple[bool, Optional[str]]:
+        """(whether the password matches, a new hash if the old one should be replaced)."""
+        return await self._run(pwd_context.verify_and_update, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt, off the event loop.
+
+    Raises PasswordHashingBusy when the hashing pool is saturated.
+    """
+    return await password_hasher.hash(password)
 
 
 def create_access_token(
@@ -56,15 +151,23 @@ def decode_access_token(token: str) -> Optional[dict]:
 async def authenticate_user(
     db: AsyncSession, email: str, password: str
 ) -> Optional[User]:
-    """Authenticate a user by email and password."""
+    """Authenticate a user by email and password.
+
+    A hash made with outdated settings (fewer rounds than BCRYPT_ROUNDS) is
+    replaced on a successful login; the change is committed with the request.
+    Raises PasswordHashingBusy when the hashing pool is saturated.
+    """
     result = await db.execute(
         select(User).where(User.email == email, User.is_active == True)  # noqa: E712
     )
     user = result.scalar_one_or_none()
     if user is None:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash is not None:
+        user.password_hash = new_hash
     return user
 
 
@@ -74,6 +177,41 @@ async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
     return result.scalar_one_or_none()
 
 
+async def get_active_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+    """The principal for an active user, from the cache or the database."""
+    principal = principal_cache.get(str(user_id))
+    if principal is not None:
+        return principal
+
+    user = await get_user_by_id(db, user_id)
+    if user is None or not user.is_active:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(str(user_id), principal, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return principal
+
+
+def forget_principal(db: AsyncSession, user_id: UUID) -> None:
+    """Drop a user's cached principal now and again once the session commits.
+
+    The second eviction discards a principal that a concurrent request
+    cached from the row as it was before this transaction committed.
+    """
+    principal_cache.delete(str(user_id))
+    db.info.setdefault(_CHANGED_USERS, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_principals_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        principal_cache.delete(str(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
+
+
 async def get_organization_name(db: AsyncSession, org_id: UUID) -> Optional[str]:
     """Get organization name by ID."""
     result = await db.execute(select(Organization.name).where(Organization.id == org_id))
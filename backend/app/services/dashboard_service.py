@@ -3,26 +3,29 @@ from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select, func, and_, extract, or_
+from sqlalchemy import select, func, and_, case, extract, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.appointment import Appointment
+from app.models.daily_points_rollup import DailyPointsRollup
 from app.models.location import Location
+from app.services.report_cache import cached_report
 from app.schemas.dashboard import (
     TrendDataPoint,
     DashboardOverviewResponse,
     LocationTableRow,
     LocationTableResponse,
+    DashboardSummaryResponse,
 )
 
 
+@cached_report("dashboard-overview", depends_on_today=True)
 async def get_dashboard_overview(
     db: AsyncSession,
     org_id: UUID,
     location_names: Optional[List[str]] = None,
     days: int = 10,
 ) -> DashboardOverviewResponse:
-    """Get dashboard overview with trend data and summary stats.
+    """Get dashboard overview with trend data and summary stats, in a single query.
 
     Args:
         db: Database session
@@ -35,55 +38,61 @@ async def get_dashboard_overview(
 
     # Base filter conditions
     base_conditions = [
-        Appointment.organization_id == org_id,
-        Appointment.is_excluded_from_reporting == False,  # noqa: E712
-        Appointment.data_type == "retrospective",
+        DailyPointsRollup.organization_id == org_id,
+        DailyPointsRollup.data_type == "retrospective",
     ]
 
     if location_names:
         base_conditions.append(
-            func.lower(Appointment.location_name).in_(
+            func.lower(DailyPointsRollup.location_name).in_(
                 [ln.strip().lower() for ln in location_names]
             )
         )
 
-    # Total points (all time)
-    total_result = await db.execute(
+    # One pass over the rollup: the () grouping set gives the all-time totals
+    # and distinct locations, the trend_day set the points per day of the
+    # trend window (days before it fall into a trend_day NULL group)
+    rows = (
         select(
-            func.coalesce(func.sum(Appointment.visit_points), 0).label("total_points"),
-            func.count(Appointment.id).label("total_appointments"),
-        ).where(*base_conditions)
-    )
-    total_row = total_result.one()
-    total_points = Decimal(str(total_row.total_points))
-    total_appointments = total_row.total_appointments
-
-    # Active locations count
-    loc_result = await db.execute(
-        select(func.count(func.distinct(Appointment.location_name)))
+            DailyPointsRollup.location_name,
+            DailyPointsRollup.total_points,
+            DailyPointsRollup.appointment_count,
+            case(
+                (
+                    and_(
+                        DailyPointsRollup.appointment_date >= start_date,
+                        DailyPointsRollup.appointment_date <= today,
+                    ),
+                    DailyPointsRollup.appointment_date,
+                ),
+            ).label("trend_day"),
+        )
         .where(*base_conditions)
+        .subquery()
     )
-    active_locations = loc_result.scalar_one()
-
-    # Trend data: daily points for the last N days
-    trend_conditions = base_conditions + [
-        Appointment.appointment_date >= start_date,
-        Appointment.appointment_date <= today,
-    ]
-    trend_result = await db.execute(
+    result = await db.execute(
         select(
-            Appointment.appointment_date,
-            func.coalesce(func.sum(Appointment.visit_points), 0).label("day_points"),
-            func.count(Appointment.id).label("day_count"),
-        )
-        .where(*trend_conditions)
-        .group_by(Appointment.appointment_date)
-        .order_by(Appointment.appointment_date)
+            rows.c.trend_day,
+            func.grouping(rows.c.trend_day).label("is_total"),
+            func.coalesce(func.sum(rows.c.total_points), 0).label("points"),
+            func.coalesce(func.sum(rows.c.appointment_count), 0).label("appointments"),
+            func.count(func.distinct(rows.c.location_name)).label("locations"),
+        ).group_by(func.grouping_sets(tuple_(), tuple_(rows.c.trend_day)))
     )
-    trend_rows = trend_result.all()
+
+    total_points = Decimal("0")
+    total_appointments = 0
+    active_locations = 0
+    trend_map = {}
+    for row in result.all():
+        if row.is_total:
+            total_points = Decimal(str(row.points))
+            total_appointments = row.appointments
+            active_locations = row.locations
+        elif row.trend_day is not None:
+            trend_map[row.trend_day] = row
 
     # Build trend data, filling in missing days with zeros
-    trend_map = {row.appointment_date: row for row in trend_rows}
     trend_data = []
     total_trend_points = Decimal("0")
     active_days = 0
@@ -92,8 +101,8 @@ async def get_dashboard_overview(
     while current <= today:
         if current in trend_map:
             row = trend_map[current]
-            pts = Decimal(str(row.day_points))
-            cnt = row.day_count
+            pts = Decimal(str(row.points))
+            cnt = row.appointments
             total_trend_points += pts
             active_days += 1
         else:
@@ -120,84 +129,95 @@ async def get_dashboard_overview(
     )
 
 
+@cached_report("dashboard-location-table", depends_on_today=True)
 async def get_location_table(
     db: AsyncSession,
     org_id: UUID,
     search: Optional[str] = None,
 ) -> LocationTableResponse:
-    """Get location table data with employee counts, YTD points, and manager names."""
+    """Get location table data with employee counts, YTD/MTD points, and manager names.
+
+    Issues a single query.
+    """
     today = date.today()
     year_start = date(today.year, 1, 1)
     month_start = date(today.year, today.month, 1)
 
-    # Get locations
-    location_query = select(Location).where(
-        Location.organization_id == org_id,
-        Location.is_active == True,  # noqa: E712
-    )
-    if search:
-        location_query = location_query.where(
-            func.lower(Location.name).contains(search.strip().lower())
-        )
-    location_query = location_query.order_by(Location.name)
-
-    loc_result = await db.execute(location_query)
-    locations = loc_result.scalars().all()
-
-    # Get YTD points per location
-    ytd_result = await db.execute(
+    # YTD and MTD points per location in one pass over the year's rollup rows
+    points = (
         select(
-            func.lower(Appointment.location_name).label("loc_name"),
-            func.coalesce(func.sum(Appointment.visit_points), 0).label("ytd_points"),
-            func.count(Appointment.id).label("appt_count"),
+            func.lower(DailyPointsRollup.location_name).label("loc_name"),
+            func.coalesce(func.sum(DailyPointsRollup.total_points), 0).label("ytd_points"),
+            func.coalesce(
+                func.sum(DailyPointsRollup.total_points).filter(
+                    DailyPointsRollup.appointment_date >= month_start
+                ),
+                0,
+            ).label("mtd_points"),
+            func.coalesce(func.sum(DailyPointsRollup.appointment_count), 0).label("appt_count"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.data_type == "retrospective",
-            Appointment.appointment_date >= year_start,
-            Appointment.appointment_date <= today,
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.data_type == "retrospective",
+            DailyPointsRollup.appointment_date >= year_start,
+            DailyPointsRollup.appointment_date <= today,
         )
-        .group_by(func.lower(Appointment.location_name))
+        .group_by(func.lower(DailyPointsRollup.location_name))
+        .subquery()
     )
-    ytd_rows = ytd_result.all()
-    ytd_map = {row.loc_name: row for row in ytd_rows}
 
-    # Get MTD points per location
-    mtd_result = await db.execute(
+    # Joined to the locations in the same statement
+    location_query = (
         select(
-            func.lower(Appointment.location_name).label("loc_name"),
-            func.coalesce(func.sum(Appointment.visit_points), 0).label("mtd_points"),
+            Location.id,
+            Location.name,
+            Location.num_employees,
+            Location.manager_name,
+            points.c.ytd_points,
+            points.c.mtd_points,
+            points.c.appt_count,
         )
+        .outerjoin(points, points.c.loc_name == func.lower(func.trim(Location.name)))
         .where(
-            Appointment.organization_id == org_id,
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.data_type == "retrospective",
-            Appointment.appointment_date >= month_start,
-            Appointment.appointment_date <= today,
+            Location.organization_id == org_id,
+            Location.is_active == True,  # noqa: E712
         )
-        .group_by(func.lower(Appointment.location_name))
     )
-    mtd_rows = mtd_result.all()
-    mtd_map = {row.loc_name: row for row in mtd_rows}
+    if search:
+        location_query = location_query.where(
+            func.lower(Location.name).contains(search.strip().lower())
+        )
+    location_query = location_query.order_by(Location.name)
 
-    rows = []
-    for loc in locations:
-        loc_lower = loc.name.strip().lower()
-        ytd_data = ytd_map.get(loc_lower)
-        mtd_data = mtd_map.get(loc_lower)
+    result = await db.execute(location_query)
 
+    rows = []
+    for loc in result.all():
         rows.append(LocationTableRow(
             location_name=loc.name,
             location_id=str(loc.id),
             num_employees=loc.num_employees or 0,
             manager_name=loc.manager_name,
-            ytd_points=Decimal(str(ytd_data.ytd_points)) if ytd_data else Decimal("0"),
-            mtd_points=Decimal(str(mtd_data.mtd_points)) if mtd_data else Decimal("0"),
-            appointment_count=ytd_data.appt_count if ytd_data else 0,
+            ytd_points=Decimal(str(loc.ytd_points or 0)),
+            mtd_points=Decimal(str(loc.mtd_points or 0)),
+            appointment_count=loc.appt_count or 0,
         ))
 
     return LocationTableResponse(
         locations=rows,
         total=len(rows),
     )
+
+
+async def get_dashboard_summary(
+    db: AsyncSession,
+    org_id: UUID,
+    location_names: Optional[List[str]] = None,
+    days: int = 10,
+    search: Optional[str] = None,
+) -> DashboardSummaryResponse:
+    """Overview and location table together, for the Dashboard page's single request."""
+    return DashboardSummaryResponse(
+        overview=await get_dashboard_overview(db, org_id, location_names, days),
+        location_table=await get_location_table(db, org_id, search),
+    )
@@ -0,0 +1,200 @@
+import asyncio
+import csv
+import io
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterable, List, Literal, Sequence, Tuple, Union
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, Table as SqlTable, cast
+from sqlalchemy.sql import Select
+
+from app.database import engine
+from app.schemas.report import (
+    TechPointsByLocationResponse,
+    MonthlyTechPointsResponse,
+    ScheduledPointsByProviderResponse,
+    PointsPaidTechFteResponse,
+    WeeklyPointsByLocationResponse,
+)
+
+ExportFormat = Literal["csv", "xlsx"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rows fetched per round trip of the server-side cursor, and written per chunk
+EXPORT_BATCH_SIZE = 5000
+
+# Bytes per chunk when sending a finished .xlsx file
+FILE_CHUNK_SIZE = 256 * 1024
+
+RowBatches = AsyncIterator[Sequence[Sequence[Any]]]
+Table = Tuple[List[str], List[Tuple[Any, ...]]]
+
+
+def export_response(
+    filename: str, export_format: ExportFormat, header: List[str], batches: RowBatches
+) -> StreamingResponse:
+    """Stream batches of rows as a CSV or XLSX attachment.
+
+    CSV is written and sent batch by batch. XLSX is written with openpyxl's
+    write-only workbook, which keeps rows in a temporary file rather than in
+    memory, and sent once complete, since the file is a zip archive. openpyxl
+    writes a few thousand rows a second, so CSV is the format for large exports.
+    """
+    # Parameters end up in the name; keep it a safe header value
+    filename = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    if export_format == "csv":
+        body = _csv_chunks(header, batches)
+    else:
+        body = _xlsx_chunks(header, batches)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+def export_columns(table: SqlTable, names: List[str]) -> list:
+    """Columns of a table to select for an export, UUIDs cast to text by the database.
+
+    Exported UUIDs only end up as text; casting in SQL skips building a
+    uuid.UUID per value, which dominates the cost of large exports.
+    """
+    columns = []
+    for name in names:
+        column = table.c[name]
+        if column.type.python_type is UUID:
+            column = cast(column, String).label(name)
+        columns.append(column)
+    return columns
+
+
+async def stream_query(query: Select) -> RowBatches:
+    """Rows of a Core query in batches, read through a server-side cursor.
+
+    Opens its own connection: the request's session is closed when the
+    endpoint returns, before a streaming response body is sent.
+    """
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def in_batches(rows: Iterable[Sequence[Any]]) -> RowBatches:
+    """Rows already in memory (a report table) in batches."""
+    rows = list(rows)
+    for start in range(0, len(rows), EXPORT_BATCH_SIZE):
+        yield rows[start:start + EXPORT_BATCH_SIZE]
+
+
+async def _csv_chunks(header: List[str], batches: RowBatches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an export without rows
+        yield buffer.getvalue().encode()
+
+
+async def _xlsx_chunks(header: List[str], batches: RowBatches) -> AsyncIterator[bytes]:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    async for rows in batches:
+        # openpyxl is pure Python; keep it off the event loop
+        await asyncio.to_thread(_append_rows, sheet, rows)
+
+    with tempfile.TemporaryFile() as file:
+        await asyncio.to_thread(workbook.save, file)
+        file.seek(0)
+        while chunk := await asyncio.to_thread(file.read, FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def _append_rows(sheet, rows: Sequence[Sequence[Any]]) -> None:
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+
+
+def _xlsx_value(value: Any) -> Any:
+    """Cell value openpyxl can write: UUIDs as text, datetimes in naive UTC."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Reports as flat tables, one row per leaf of the response
+
+def tech_points_table(
+    report: Union[TechPointsByLocationResponse, MonthlyTechPointsResponse],
+) -> Table:
+    header = [
+        "location_name", "month", "rooming_tech", "date", "day_of_week",
+        "am_points", "pm_points", "total_points",
+    ]
+    rows = [
+        (
+            report.location_name, report.month, tech.rooming_tech, day.date, day.day_of_week,
+            day.am_points, day.pm_points, day.total_points,
+        )
+        for tech in report.techs
+        for day in tech.daily_points
+    ]
+    return header, rows
+
+
+def scheduled_points_table(report: ScheduledPointsByProviderResponse) -> Table:
+    header = [
+        "location_name", "month", "manager_name", "provider",
+        "am_points", "pm_points", "total_points",
+    ]
+    rows = [
+        (
+            manager.location_name, report.month, manager.manager_name, provider.provider,
+            provider.am_points, provider.pm_points, provider.total_points,
+        )
+        for manager in report.managers
+        for provider in manager.providers
+    ]
+    return header, rows
+
+
+def points_paid_table(report: PointsPaidTechFteResponse) -> Table:
+    header = ["specialty", "location_name", f"points_{report.month1}", f"points_{report.month2}"]
+    rows = [
+        (item.specialty, item.location_name, item.month1_points, item.month2_points)
+        for item in report.data
+    ]
+    return header, rows
+
+
+def weekly_points_table(report: WeeklyPointsByLocationResponse) -> Table:
+    header = [
+        "location_name", "month", "week", "date", "day_of_week",
+        "am_points", "pm_points", "total_points",
+    ]
+    rows = [
+        (
+            location.location_name, report.month, report.week, day.date, day.day_of_week,
+            day.am_points, day.pm_points, day.total_points,
+        )
+        for location in report.locations
+        for day in location.daily_points
+    ]
+    return header, rows
@@ -0,0 +1,179 @@
+import importlib.util
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from app.config import settings
+
+# A reader yields (chunk of at most chunksize rows, fraction of the file consumed so far).
+# Chunks carry a running index so row numbers continue across chunks.
+ChunkIterator = Iterator[Tuple[pd.DataFrame, float]]
+ReadFunction = Callable[[str, int], ChunkIterator]
+
+
+class FileReader(NamedTuple):
+    """A registered way of turning an upload file into DataFrame chunks."""
+
+    name: str
+    extensions: Tuple[str, ...]
+    read: ReadFunction
+    priority: int  # highest eligible priority wins
+    max_bytes: Optional[int]  # None: any size; readers that load the whole file set a cap
+
+
+_READERS: List[FileReader] = []
+
+
+def register_reader(
+    name: str,
+    extensions: Sequence[str],
+    read: ReadFunction,
+    priority: int = 0,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """Make a reader available for automatic selection by select_reader."""
+    _READERS.append(
+        FileReader(name, tuple(ext.lower() for ext in extensions), read, priority, max_bytes)
+    )
+
+
+def supported_extensions() -> List[str]:
+    """File extensions that some registered reader handles, in registration order."""
+    return list(dict.fromkeys(ext for reader in _READERS for ext in reader.extensions))
+
+
+def select_reader(filename: str, size: int) -> FileReader:
+    """Pick the highest-priority reader that handles this file type and size."""
+    extension = Path(filename).suffix.lower()
+    candidates = [
+        reader
+        for reader in _READERS
+        if extension in reader.extensions and (reader.max_bytes is None or size <= reader.max_bytes)
+    ]
+    if not candidates:
+        raise ValueError(
+            f"Unsupported file format: {filename}. Use {', '.join(supported_extensions())}"
+        )
+    return max(candidates, key=lambda reader: reader.priority)
+
+
+def read_csv_chunks(path: str, chunksize: int) -> ChunkIterator:
+    """Stream a CSV file with pandas' C parser.
+
+    Cells are read as text. pandas infers column types per chunk, so a blank
+    in one chunk would turn that chunk's integers into floats ('1000.0'
+    where other chunks have '1000'); normalize_upload_frame parses the text
+    the same way wherever the row falls.
+    """
+    size = Path(path).stat().st_size or 1
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, dtype=str):
+            yield chunk, min(f.tell() / size, 1.0)
+
+
+def read_xlsx_streaming(path: str, chunksize: int) -> ChunkIterator:
+    """Stream the first sheet of an .xlsx file with openpyxl in read-only mode.
+
+    Cells are converted the way pd.read_excel(engine="openpyxl") converts
+    them, but rows are parsed chunksize at a time instead of building the
+    whole sheet in memory first. Columns keep the cells' own values rather
+    than a type inferred per chunk, as for CSV.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        total_rows = sheet.max_row or 0
+        sheet.reset_dimensions()
+
+        header: Optional[list] = None
+        rows: List[list] = []
+        # Blank rows are held back until a row with data follows, so trailing ones are dropped
+        pending_blank: List[list] = []
+        rows_done = 0
+        offset = 0
+        for row_number, row in enumerate(sheet.rows, start=1):
+            values = [_convert_openpyxl_cell(cell) for cell in row]
+            while values and values[-1] == "":
+                values.pop()
+
+            if header is None:
+                if values:
+                    header = values
+                continue
+            if not values:
+                pending_blank.append(values)
+                continue
+
+            rows.extend(pending_blank)
+            pending_blank = []
+            rows.append(values)
+            rows_done = row_number
+            if len(rows) >= chunksize:
+                chunk = _parse_rows(header, rows[:chunksize], offset)
+                rows = rows[chunksize:]
+                offset += len(chunk)
+                yield chunk, min(rows_done / total_rows, 1.0) if total_rows else 0.0
+
+        if header is None:
+            raise ValueError("No columns to parse from file")
+        if rows or offset == 0:
+            yield _parse_rows(header, rows, offset), 1.0
+    finally:
+        workbook.close()
+
+
+def _convert_openpyxl_cell(cell):
+    """Same conversion as pandas' openpyxl reader."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _parse_rows(header: list, rows: List[list], offset: int) -> pd.DataFrame:
+    """Build a chunk from raw cell rows as pd.read_excel(dtype=object) would."""
+    width = max([len(header)] + [len(row) for row in rows])
+    data = [row + [""] * (width - len(row)) for row in [header] + rows]
+    frame = TextParser(data, header=0, dtype=object).read()
+    frame.index = pd.RangeIndex(offset, offset + len(frame))
+    return frame
+
+
+def read_excel_calamine(path: str, chunksize: int) -> ChunkIterator:
+    """Read the first sheet with the Rust calamine engine, then slice it into chunks.
+
+    Much faster than openpyxl but holds the sheet in memory, so it is only
+    chosen for .xlsx files up to EXCEL_FAST_READER_MAX_MB. It is the only
+    reader of .xls files, whatever their size. Cells keep their own values,
+    as with the streaming reader.
+    """
+    df = pd.read_excel(path, engine="calamine", dtype=object)
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize], min((start + chunksize) / len(df), 1.0)
+    if df.empty:
+        yield df, 1.0
+
+
+register_reader("pandas-csv", [".csv"], read_csv_chunks)
+register_reader("openpyxl-streaming", [".xlsx"], read_xlsx_streaming)
+if importlib.util.find_spec("python_calamine") is not None:
+    register_reader(
+        "calamine",
+        [".xlsx"],
+        read_excel_calamine,
+        priority=10,
+        max_bytes=settings.EXCEL_FAST_READER_MAX_MB * 1024 * 1024,
+    )
+    # openpyxl cannot read .xls, and a .xls sheet holds at most 65,536 rows
+    register_reader("calamine", [".xls"], read_excel_calamine, priority=10)
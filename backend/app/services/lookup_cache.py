@@ -0,0 +1,104 @@
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment_type import AppointmentType
+from app.models.location import Location
+
+# Dialect INSERT constructs that support ON CONFLICT
+UPSERT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def get_point_value_map(
+    db: AsyncSession, org_id: UUID
+) -> Dict[str, Tuple[UUID, Decimal]]:
+    """Build a map of visit_type_name (lowered) -> (appointment_type_id, point_value)."""
+    result = await db.execute(
+        select(AppointmentType).where(
+            AppointmentType.organization_id == org_id,
+            AppointmentType.is_active == True,  # noqa: E712
+        )
+    )
+    types = result.scalars().all()
+    return {
+        at.name.strip().lower(): (at.id, at.point_value)
+        for at in types
+    }
+
+
+class LookupCache:
+    """Location and appointment-type lookups for one organization.
+
+    Loaded with one query each when ingestion starts. Locations first seen in
+    a chunk are created together with a single INSERT ... ON CONFLICT ...
+    RETURNING, and results are mapped back onto the rows with a vectorized
+    join, so no lookups run per row. Keys are lower-cased names.
+    """
+
+    def __init__(
+        self,
+        org_id: UUID,
+        locations: Dict[str, UUID],
+        point_values: Dict[str, Tuple[UUID, Decimal]],
+    ) -> None:
+        self.org_id = org_id
+        self.locations = locations
+        self.point_values = point_values
+
+    @classmethod
+    async def load(cls, db: AsyncSession, org_id: UUID) -> "LookupCache":
+        result = await db.execute(
+            select(Location.id, Location.name).where(Location.organization_id == org_id)
+        )
+        locations = {name.lower(): location_id for location_id, name in result.all()}
+        return cls(org_id, locations, await get_point_value_map(db, org_id))
+
+    async def location_ids(self, db: AsyncSession, names: pd.Series) -> pd.Series:
+        """Location id for each (stripped) name, creating the locations not seen yet."""
+        keys = names.str.lower()
+        unseen = ~keys.isin(list(self.locations)) & ~keys.duplicated()
+        if unseen.any():
+            await self.create_locations(db, names[unseen.to_numpy()])
+        return _lookup(keys, self.locations, None)
+
+    async def create_locations(self, db: AsyncSession, names: Iterable[str]) -> None:
+        """Create locations in one statement and add them to the cache.
+
+        A location created concurrently under another transaction conflicts on
+        uq_locations_org_name; the no-op update makes RETURNING yield it too.
+        """
+        conn = await db.connection()
+        insert = UPSERT_INSERT[conn.dialect.name]
+        stmt = insert(Location).values(
+            [{"organization_id": self.org_id, "name": name} for name in names]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Location.organization_id, func.lower(Location.name)],
+            set_={"name": Location.name},
+        ).returning(Location.id, Location.name)
+        result = await db.execute(stmt)
+        for location_id, name in result.all():
+            self.locations[name.lower()] = location_id
+
+    def appointment_types(self, visit_types: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """(appointment_type_id, visit_points) for each visit type; unknown types score 0."""
+        keys = visit_types.str.lower()
+        type_ids = _lookup(keys, {k: v[0] for k, v in self.point_values.items()}, None)
+        points = _lookup(keys, {k: v[1] for k, v in self.point_values.items()}, Decimal("0"))
+        return type_ids, points
+
+
+def _lookup(keys: pd.Series, mapping: dict, default) -> pd.Series:
+    """Map keys through a dict with a hash join; keys not in it get default."""
+    index = pd.Index(list(mapping), dtype=object)
+    values = np.empty(len(mapping) + 1, dtype=object)
+    values[:-1] = list(mapping.values())
+    values[-1] = default
+    # get_indexer returns -1 for misses, which selects the default in the last slot
+    return pd.Series(values[index.get_indexer(keys)], index=keys.index, dtype=object)
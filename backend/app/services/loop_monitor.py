@@ -0,0 +1,69 @@
+import asyncio
+from collections import deque
+from typing import Deque, Optional
+
+# How often the monitor wakes up, and how many recent wake-ups it keeps
+LAG_INTERVAL_SECONDS = 0.05
+LAG_WINDOW = 1200  # one minute
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps at a fixed interval.
+
+    The lag is how long a ready task waits for the loop, for instance behind
+    CPU-bound work done inline; every request on the loop waits as long.
+    A healthy loop stays within a few milliseconds.
+    """
+
+    def __init__(self, interval: float = LAG_INTERVAL_SECONDS, window: int = LAG_WINDOW) -> None:
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.max_lag = 0.0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> dict:
+        """Lag in milliseconds over the recent window, and the maximum since start or reset."""
+        samples = sorted(self.samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": len(samples),
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            "window_max_ms": round(samples[-1] * 1000, 2) if samples else None,
+            "max_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+loop_monitor = EventLoopLagMonitor()
@@ -0,0 +1,149 @@
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, List, Literal, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import ClauseElement, Executable, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+
+# How a list endpoint fills in total: a full COUNT, a cheap estimate, or not at all
+CountMode = Literal["exact", "estimated", "none"]
+
+
+class SortKey(NamedTuple):
+    """One column of a keyset ordering."""
+
+    column: Any
+    descending: bool = False
+
+    def order_by(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort key values of the last row on a page."""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of values")
+        return [_parse_value(key.column.type.python_type, v) for key, v in zip(keys, values)]
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def _parse_value(python_type: type, value: str) -> Any:
+    if python_type in (date, datetime, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def keyset_page(
+    query: Select, keys: Sequence[SortKey], cursor: Optional[str], limit: int
+) -> Select:
+    """Order query by keys and restrict it to the limit+1 rows after the cursor.
+
+    The extra row tells whether there is a next page. Orderings may mix
+    directions, so rows after the cursor are matched with the expanded
+    (a < x) OR (a = x AND b > y) ... form, plus a bound on the first key
+    that lets an index on the same columns start the scan at the cursor.
+    """
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        after = []
+        for i, key in enumerate(keys):
+            beyond = key.column < values[i] if key.descending else key.column > values[i]
+            after.append(and_(*[k.column == v for k, v in zip(keys[:i], values[:i])], beyond))
+        first = keys[0]
+        bound = first.column <= values[0] if first.descending else first.column >= values[0]
+        query = query.where(bound, or_(*after))
+    return query.order_by(*[key.order_by() for key in keys]).limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any], keys: Sequence[SortKey], limit: int
+) -> Tuple[list, Optional[str]]:
+    """(rows of this page, cursor for the next page or None) from a keyset_page result."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.column.key) for key in keys])
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[SortKey],
+    cursor: Optional[str],
+    limit: int,
+    offset: int = 0,
+    entities: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """(entities on the page, next cursor) for a query, paged by cursor or by offset.
+
+    With entities=False the page holds the Rows of a query of columns, which
+    must include the sort key columns under their own names.
+    """
+    if cursor and offset:
+        raise InvalidCursor("Use either cursor or offset, not both")
+    result = await db.execute(keyset_page(query, keys, cursor, limit).offset(offset))
+    return split_page(result.scalars().all() if entities else result.all(), keys, limit)
+
+
+async def count_rows(
+    db: AsyncSession, query: Select, mode: CountMode
+) -> Tuple[Optional[int], bool]:
+    """(total rows matched by query, whether it is an estimate).
+
+    exact runs a COUNT, estimated asks the planner (falling back to a COUNT
+    where it cannot), none skips counting and returns no total.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "estimated":
+        estimate = await estimate_rows(db, query)
+        if estimate is not None:
+            return estimate, True
+    total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    return total, False
+
+
+async def estimate_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """The PostgreSQL planner's row estimate for query, without running it.
+
+    Returns None on other databases, where callers fall back to counting.
+    """
+    conn = await db.connection()
+    if conn.dialect.name != "postgresql":
+        return None
+    plan = await db.scalar(_Explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, executed with the statement's own parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
@@ -0,0 +1,44 @@
+from typing import Set
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Organizations whose appointments partition is known to exist (committed)
+_existing_partitions: Set[UUID] = set()
+
+
+def appointment_partition_name(org_id: UUID) -> str:
+    """Name of the appointments partition holding an organization's rows."""
+    return f"appointments_org_{org_id.hex}"
+
+
+async def ensure_appointment_partition(db: AsyncSession, org_id: UUID) -> None:
+    """Create the organization's appointments partition if it does not exist yet.
+
+    Call before inserting appointments for an organization, or when creating
+    one. After the first call per process that finds the partition it costs
+    nothing. A partition created here is only remembered once a later call
+    sees it, so a rolled back transaction cannot leave it cached. Does
+    nothing on databases other than PostgreSQL, where the table is not
+    partitioned.
+    """
+    if org_id in _existing_partitions:
+        return
+    conn = await db.connection()
+    if conn.dialect.name != "postgresql":
+        return
+
+    name = appointment_partition_name(org_id)
+    if await db.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+        _existing_partitions.add(org_id)
+        return
+
+    # Serialize with other workers creating the same partition
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": name})
+    await db.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            f"PARTITION OF appointments FOR VALUES IN ('{org_id}')"
+        )
+    )
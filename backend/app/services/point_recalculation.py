@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.appointment import Appointment
+from app.models.appointment_type import AppointmentType
+from app.services.rollup_service import rebuild_rollup
+from app.services.upload_service import lock_upload_dataset
+
+logger = logging.getLogger(__name__)
+
+# Locked in this order, so two recalculations cannot wait on each other
+DATA_TYPES = ["prospective", "retrospective"]
+
+
+async def reportable_date_range(db: AsyncSession, org_id: UUID) -> Optional[Tuple[date, date]]:
+    """First and last date of the organization's reportable appointments, if it has any."""
+    first, last = (
+        await db.execute(
+            select(func.min(Appointment.appointment_date), func.max(Appointment.appointment_date))
+            .where(
+                Appointment.organization_id == org_id,
+                Appointment.is_excluded_from_reporting == False,  # noqa: E712
+            )
+        )
+    ).one()
+    return None if first is None else (first, last)
+
+
+async def recalculate_points_in_range(
+    db: AsyncSession, org_id: UUID, date_from: date, date_to: date
+) -> int:
+    """Give the organization's reportable appointments in a date range their type's points.
+
+    One UPDATE ... FROM appointment_types matches each appointment's
+    visit_type to an active type case-insensitively, as ingestion does, and
+    only writes rows whose points or type differ. Appointments whose visit
+    type matches no active type keep what they have. The rollup is rebuilt
+    for the range if any row changed. Uploads of the organization wait for
+    the transaction. Returns the number of appointments updated.
+    """
+    for data_type in DATA_TYPES:
+        await lock_upload_dataset(db, org_id, data_type)
+
+    result = await db.execute(
+        update(Appointment)
+        .where(
+            Appointment.organization_id == org_id,
+            Appointment.appointment_date.between(date_from, date_to),
+            Appointment.is_excluded_from_reporting == False,  # noqa: E712
+            AppointmentType.organization_id == org_id,
+            AppointmentType.is_active == True,  # noqa: E712
+            func.lower(func.trim(AppointmentType.name)) == func.lower(Appointment.visit_type),
+            or_(
+                Appointment.visit_points.is_distinct_from(AppointmentType.point_value),
+                Appointment.appointment_type_id.is_distinct_from(AppointmentType.id),
+            ),
+        )
+        .values(visit_points=AppointmentType.point_value, appointment_type_id=AppointmentType.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await rebuild_rollup(db, org_id, date_from, date_to)
+    return result.rowcount
+
+
+async def recalculate_points(org_id: UUID) -> int:
+    """Re-apply appointment type point values to all of an organization's appointments.
+
+    Works through the dates POINT_RECALC_BATCH_DAYS at a time, each batch in
+    its own transaction, so rows stay locked only while their batch is
+    written. Returns the number of appointments updated.
+    """
+    async with AsyncSessionLocal() as db:
+        dates = await reportable_date_range(db, org_id)
+    if dates is None:
+        return 0
+
+    updated = 0
+    batch_from, last = dates
+    batch_days = timedelta(days=settings.POINT_RECALC_BATCH_DAYS)
+    while batch_from <= last:
+        batch_to = min(batch_from + batch_days - timedelta(days=1), last)
+        async with AsyncSessionLocal() as db:
+            updated += await recalculate_points_in_range(db, org_id, batch_from, batch_to)
+            await db.commit()
+        batch_from = batch_to + timedelta(days=1)
+    return updated
+
+
+class PointRecalculationJobs:
+    """Background point recalculations, at most one running per organization.
+
+    Submitting while the organization's job runs makes it go over the data
+    once more when it finishes, so edits made during a run are applied too.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+        self._resubmitted: Set[UUID] = set()
+
+    def submit(self, org_id: UUID) -> None:
+        """Recalculate an organization's points once committed type changes are visible."""
+        if org_id in self._tasks:
+            self._resubmitted.add(org_id)
+            return
+        self._tasks[org_id] = asyncio.create_task(self._run(org_id))
+
+    async def _run(self, org_id: UUID) -> None:
+        while True:
+            try:
+                await recalculate_points(org_id)
+            except Exception:
+                # Committed batches stay; the next type change goes over the rest
+                logger.exception("Point recalculation failed for organization %s", org_id)
+            if org_id not in self._resubmitted:
+                del self._tasks[org_id]
+                return
+            self._resubmitted.discard(org_id)
+
+    async def shutdown(self) -> None:
+        """Let running recalculations finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+point_recalculation = PointRecalculationJobs()
@@ -0,0 +1,202 @@
+import functools
+import importlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.organization import Organization
+
+T = TypeVar("T")
+
+
+class CacheBackend:
+    """Storage for cached report results.
+
+    The default MemoryCacheBackend is per process. A backend over a shared
+    store (Redis, memcached) can be configured with REPORT_CACHE_BACKEND so
+    that uvicorn workers share entries; it has to serialize values itself,
+    e.g. with the response models' model_dump_json. Invalidation does not
+    depend on the backend: keys carry the organization's data_version.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None on a miss."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with a TTL per entry."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class ReportCache:
+    """Caches report results per organization, report name and parameters.
+
+    Keys include organizations.data_version, which is bumped in the same
+    transaction as any change to reporting data, just before it commits. A
+    report computed before that commit is cached under the old version and
+    never served after it, in any worker. Entries for old versions age out
+    of the LRU.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    async def get_or_compute(
+        self,
+        db: AsyncSession,
+        name: str,
+        org_id: UUID,
+        params: Any,
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        if not self.enabled:
+            return await compute()
+
+        version = await db.scalar(
+            select(Organization.data_version).where(Organization.id == org_id)
+        )
+        key = f"{org_id}:{version}:{name}:{json.dumps(params, default=str, sort_keys=True)}"
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits[name] = self.hits.get(name, 0) + 1
+            return value
+
+        self.misses[name] = self.misses.get(name, 0) + 1
+        value = await compute()
+        self.backend.set(key, value, self.ttl)
+        return value
+
+    def stats(self) -> dict:
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "reports": {
+                name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                for name in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+def _create_backend() -> CacheBackend:
+    """Backend named by REPORT_CACHE_BACKEND: "memory" or "package.module:factory"."""
+    if settings.REPORT_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.REPORT_CACHE_MAX_ENTRIES)
+    module_name, _, attr = settings.REPORT_CACHE_BACKEND.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory()
+
+
+report_cache = ReportCache(
+    _create_backend(),
+    ttl=settings.REPORT_CACHE_TTL_SECONDS,
+    enabled=settings.REPORT_CACHE_ENABLED,
+)
+
+
+def cached_report(name: str, depends_on_today: bool = False):
+    """Cache an async report function called as fn(db, org_id, *params).
+
+    depends_on_today adds the current date to the key, for results relative
+    to today such as the dashboard's trend window.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(db: AsyncSession, org_id: UUID, *args, **kwargs) -> T:
+            params = [args, kwargs]
+            if depends_on_today:
+                params.append(date.today())
+            return await report_cache.get_or_compute(
+                db, name, org_id, params, lambda: fn(db, org_id, *args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
+
+
+# Session.info key of the organizations whose data_version the session bumps on commit
+CHANGED_ORGS_KEY = "report_data_changed"
+
+
+def mark_report_data_changed(db: AsyncSession, org_id: UUID) -> None:
+    """Invalidate the organization's cached reports when the session commits.
+
+    Its data_version is bumped by the last statement of the transaction,
+    not here: the UPDATE locks the organizations row until the commit, and a
+    long upload would otherwise hold that lock from its first rollup change
+    on, making every other writer of the organization wait.
+    """
+    db.sync_session.info.setdefault(CHANGED_ORGS_KEY, set()).add(org_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_data_versions(session: Session) -> None:
+    org_ids = session.info.pop(CHANGED_ORGS_KEY, None)
+    # In a consistent order, so transactions bumping several organizations cannot deadlock
+    for org_id in sorted(org_ids or (), key=str):
+        session.execute(
+            update(Organization)
+            .where(Organization.id == org_id)
+            .values(data_version=Organization.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_data_changes(session: Session) -> None:
+    session.info.pop(CHANGED_ORGS_KEY, None)
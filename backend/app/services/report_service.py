@@ -1,14 +1,16 @@
 import calendar
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select, func, case, and_, extract
+from sqlalchemy import select, func, case, and_, extract, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.appointment import Appointment
+from app.models.daily_points_rollup import DailyPointsRollup
 from app.models.location import Location
+from app.services.report_cache import cached_report
 from app.schemas.report import (
     TechDailyPoints,
     TechPointsSummary,
@@ -22,6 +24,15 @@ from app.schemas.report import (
     LocationDailyPoints,
     LocationWeeklyPoints,
     WeeklyPointsByLocationResponse,
+    ReportBatchResponse,
+)
+
+
+# Per-location reports the batch endpoint can return together
+BATCH_REPORTS = (
+    "tech-points-by-location",
+    "monthly-tech-points-by-location",
+    "scheduled-points-by-provider",
 )
 
 
@@ -31,6 +42,12 @@ def parse_month(month_str: str) -> tuple[int, int]:
     return int(parts[0]), int(parts[1])
 
 
+def normalize_month(month_str: str) -> str:
+    """A month as YYYY-MM, whichever way it was written ("2026-1" is "2026-01")."""
+    year, month = parse_month(month_str)
+    return f"{year:04d}-{month:02d}"
+
+
 def get_month_date_range(year: int, month: int) -> tuple[date, date]:
     """Get start and end dates for a month."""
     start = date(year, month, 1)
@@ -39,6 +56,15 @@ def get_month_date_range(year: int, month: int) -> tuple[date, date]:
     return start, end
 
 
+def get_period_date_range(month_str: str, period: str = "four_weeks") -> tuple[date, date]:
+    """Date range of a tech points report: the whole month, or its last 7 days for one_week."""
+    year, month = parse_month(month_str)
+    month_start, month_end = get_month_date_range(year, month)
+    if period == "one_week":
+        return month_end - timedelta(days=6), month_end
+    return month_start, month_end
+
+
 def get_week_date_range(year: int, month: int, week: int) -> tuple[date, date]:
     """Get Mon-Fri date range for a specific week of a month (1-based).
     Week 1 starts on the first Monday on or before the first of the month,
@@ -62,53 +88,9 @@ def get_week_date_range(year: int, month: int, week: int) -> tuple[date, date]:
     return week_start, week_end
 
 
-async def get_tech_points_by_location(
-    db: AsyncSession,
-    org_id: UUID,
-    location_name: str,
-    month_str: str,
-    period: str = "four_weeks",
-) -> TechPointsByLocationResponse:
-    """Report: Tech points by location for a given period.
-    Returns daily AM/PM point totals for each rooming_tech.
-    """
-    year, month = parse_month(month_str)
-    month_start, month_end = get_month_date_range(year, month)
-
-    if period == "one_week":
-        # Last 7 days of the month
-        end_date = month_end
-        start_date = end_date - timedelta(days=6)
-    else:
-        start_date = month_start
-        end_date = month_end
-
-    result = await db.execute(
-        select(
-            Appointment.rooming_tech,
-            Appointment.appointment_date,
-            Appointment.session,
-            func.sum(Appointment.visit_points).label("total_points"),
-        )
-        .where(
-            Appointment.organization_id == org_id,
-            func.lower(Appointment.location_name) == location_name.strip().lower(),
-            Appointment.data_type == "retrospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= start_date,
-            Appointment.appointment_date <= end_date,
-            Appointment.rooming_tech.isnot(None),
-        )
-        .group_by(
-            Appointment.rooming_tech,
-            Appointment.appointment_date,
-            Appointment.session,
-        )
-        .order_by(Appointment.rooming_tech, Appointment.appointment_date)
-    )
-    rows = result.all()
-
-    # Organize by tech
+def _tech_summaries(rows) -> List[TechPointsSummary]:
+    """Per-tech daily AM/PM points from rows of rooming_tech, appointment_date, session
+    and total_points, ordered by tech and date."""
     tech_data: dict = {}
     for row in rows:
         tech_name = row.rooming_tech
@@ -149,6 +131,84 @@ async def get_tech_points_by_location(
             grand_total=total_am + total_pm,
         ))
 
+    return techs
+
+
+def _manager_points(
+    rows, manager_name: Optional[str], location_name: str
+) -> List[ManagerProviderPoints]:
+    """A location's provider AM/PM points from (provider, session, total_points) rows."""
+    provider_data: dict = {}
+    for row in rows:
+        if row.provider not in provider_data:
+            provider_data[row.provider] = {"am": Decimal("0"), "pm": Decimal("0")}
+        if row.session == "AM":
+            provider_data[row.provider]["am"] += row.total_points or Decimal("0")
+        else:
+            provider_data[row.provider]["pm"] += row.total_points or Decimal("0")
+
+    providers = []
+    total_am = Decimal("0")
+    total_pm = Decimal("0")
+    for prov_name, points in provider_data.items():
+        providers.append(ProviderPointsSummary(
+            provider=prov_name,
+            am_points=points["am"],
+            pm_points=points["pm"],
+            total_points=points["am"] + points["pm"],
+        ))
+        total_am += points["am"]
+        total_pm += points["pm"]
+
+    return [ManagerProviderPoints(
+        manager_name=manager_name,
+        location_name=location_name,
+        providers=providers,
+        total_am=total_am,
+        total_pm=total_pm,
+        grand_total=total_am + total_pm,
+    )]
+
+
+@cached_report("tech-points-by-location")
+async def get_tech_points_by_location(
+    db: AsyncSession,
+    org_id: UUID,
+    location_name: str,
+    month_str: str,
+    period: str = "four_weeks",
+) -> TechPointsByLocationResponse:
+    """Report: Tech points by location for a given period.
+    Returns daily AM/PM point totals for each rooming_tech.
+    """
+    start_date, end_date = get_period_date_range(month_str, period)
+
+    result = await db.execute(
+        select(
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
+        )
+        .where(
+            DailyPointsRollup.organization_id == org_id,
+            func.lower(DailyPointsRollup.location_name) == location_name.strip().lower(),
+            DailyPointsRollup.data_type == "retrospective",
+            DailyPointsRollup.appointment_date >= start_date,
+            DailyPointsRollup.appointment_date <= end_date,
+            DailyPointsRollup.rooming_tech.isnot(None),
+        )
+        .group_by(
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+        )
+        .order_by(DailyPointsRollup.rooming_tech, DailyPointsRollup.appointment_date)
+    )
+    rows = result.all()
+
+    techs = _tech_summaries(rows)
+
     return TechPointsByLocationResponse(
         location_name=location_name,
         period=period,
@@ -157,6 +217,7 @@ async def get_tech_points_by_location(
     )
 
 
+@cached_report("monthly-tech-points-by-location")
 async def get_monthly_tech_points_by_location(
     db: AsyncSession,
     org_id: UUID,
@@ -169,68 +230,29 @@ async def get_monthly_tech_points_by_location(
 
     result = await db.execute(
         select(
-            Appointment.rooming_tech,
-            Appointment.appointment_date,
-            Appointment.session,
-            func.sum(Appointment.visit_points).label("total_points"),
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            func.lower(Appointment.location_name) == location_name.strip().lower(),
-            Appointment.data_type == "retrospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= start_date,
-            Appointment.appointment_date <= end_date,
-            Appointment.rooming_tech.isnot(None),
+            DailyPointsRollup.organization_id == org_id,
+            func.lower(DailyPointsRollup.location_name) == location_name.strip().lower(),
+            DailyPointsRollup.data_type == "retrospective",
+            DailyPointsRollup.appointment_date >= start_date,
+            DailyPointsRollup.appointment_date <= end_date,
+            DailyPointsRollup.rooming_tech.isnot(None),
         )
         .group_by(
-            Appointment.rooming_tech,
-            Appointment.appointment_date,
-            Appointment.session,
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
         )
-        .order_by(Appointment.rooming_tech, Appointment.appointment_date)
+        .order_by(DailyPointsRollup.rooming_tech, DailyPointsRollup.appointment_date)
     )
     rows = result.all()
 
-    tech_data: dict = {}
-    for row in rows:
-        tech_name = row.rooming_tech
-        if tech_name not in tech_data:
-            tech_data[tech_name] = {}
-
-        d = row.appointment_date
-        if d not in tech_data[tech_name]:
-            tech_data[tech_name][d] = {"am": Decimal("0"), "pm": Decimal("0")}
-
-        if row.session == "AM":
-            tech_data[tech_name][d]["am"] += row.total_points or Decimal("0")
-        else:
-            tech_data[tech_name][d]["pm"] += row.total_points or Decimal("0")
-
-    techs = []
-    for tech_name, dates in tech_data.items():
-        daily = []
-        total_am = Decimal("0")
-        total_pm = Decimal("0")
-        for d in sorted(dates.keys()):
-            am = dates[d]["am"]
-            pm = dates[d]["pm"]
-            total_am += am
-            total_pm += pm
-            daily.append(TechDailyPoints(
-                date=d,
-                day_of_week=d.strftime("%A"),
-                am_points=am,
-                pm_points=pm,
-                total_points=am + pm,
-            ))
-        techs.append(TechPointsSummary(
-            rooming_tech=tech_name,
-            daily_points=daily,
-            total_am=total_am,
-            total_pm=total_pm,
-            grand_total=total_am + total_pm,
-        ))
+    techs = _tech_summaries(rows)
 
     return MonthlyTechPointsResponse(
         location_name=location_name,
@@ -239,6 +261,7 @@ async def get_monthly_tech_points_by_location(
     )
 
 
+@cached_report("scheduled-points-by-provider")
 async def get_scheduled_points_by_provider(
     db: AsyncSession,
     org_id: UUID,
@@ -263,53 +286,23 @@ async def get_scheduled_points_by_provider(
     # Query provider points
     result = await db.execute(
         select(
-            Appointment.provider,
-            Appointment.session,
-            func.sum(Appointment.visit_points).label("total_points"),
+            DailyPointsRollup.provider,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            func.lower(Appointment.location_name) == location_name.strip().lower(),
-            Appointment.data_type == "prospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= start_date,
-            Appointment.appointment_date <= end_date,
+            DailyPointsRollup.organization_id == org_id,
+            func.lower(DailyPointsRollup.location_name) == location_name.strip().lower(),
+            DailyPointsRollup.data_type == "prospective",
+            DailyPointsRollup.appointment_date >= start_date,
+            DailyPointsRollup.appointment_date <= end_date,
         )
-        .group_by(Appointment.provider, Appointment.session)
-        .order_by(Appointment.provider)
+        .group_by(DailyPointsRollup.provider, DailyPointsRollup.session)
+        .order_by(DailyPointsRollup.provider)
     )
     rows = result.all()
 
-    provider_data: dict = {}
-    for row in rows:
-        if row.provider not in provider_data:
-            provider_data[row.provider] = {"am": Decimal("0"), "pm": Decimal("0")}
-        if row.session == "AM":
-            provider_data[row.provider]["am"] += row.total_points or Decimal("0")
-        else:
-            provider_data[row.provider]["pm"] += row.total_points or Decimal("0")
-
-    providers = []
-    total_am = Decimal("0")
-    total_pm = Decimal("0")
-    for prov_name, points in provider_data.items():
-        providers.append(ProviderPointsSummary(
-            provider=prov_name,
-            am_points=points["am"],
-            pm_points=points["pm"],
-            total_points=points["am"] + points["pm"],
-        ))
-        total_am += points["am"]
-        total_pm += points["pm"]
-
-    managers = [ManagerProviderPoints(
-        manager_name=manager_name,
-        location_name=location_name,
-        providers=providers,
-        total_am=total_am,
-        total_pm=total_pm,
-        grand_total=total_am + total_pm,
-    )]
+    managers = _manager_points(rows, manager_name, location_name)
 
     return ScheduledPointsByProviderResponse(
         location_name=location_name,
@@ -318,6 +311,7 @@ async def get_scheduled_points_by_provider(
     )
 
 
+@cached_report("points-paid-tech-fte")
 async def get_points_paid_tech_fte(
     db: AsyncSession,
     org_id: UUID,
@@ -333,34 +327,32 @@ async def get_points_paid_tech_fte(
     # Query for both months
     month1_points = (
         select(
-            Appointment.specialty,
-            Appointment.location_name,
-            func.sum(Appointment.visit_points).label("points"),
+            DailyPointsRollup.specialty,
+            DailyPointsRollup.location_name,
+            func.sum(DailyPointsRollup.total_points).label("points"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            Appointment.data_type == "retrospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= start1,
-            Appointment.appointment_date <= end1,
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.data_type == "retrospective",
+            DailyPointsRollup.appointment_date >= start1,
+            DailyPointsRollup.appointment_date <= end1,
         )
-        .group_by(Appointment.specialty, Appointment.location_name)
+        .group_by(DailyPointsRollup.specialty, DailyPointsRollup.location_name)
     )
 
     month2_points = (
         select(
-            Appointment.specialty,
-            Appointment.location_name,
-            func.sum(Appointment.visit_points).label("points"),
+            DailyPointsRollup.specialty,
+            DailyPointsRollup.location_name,
+            func.sum(DailyPointsRollup.total_points).label("points"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            Appointment.data_type == "retrospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= start2,
-            Appointment.appointment_date <= end2,
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.data_type == "retrospective",
+            DailyPointsRollup.appointment_date >= start2,
+            DailyPointsRollup.appointment_date <= end2,
         )
-        .group_by(Appointment.specialty, Appointment.location_name)
+        .group_by(DailyPointsRollup.specialty, DailyPointsRollup.location_name)
     )
 
     result1 = await db.execute(month1_points)
@@ -399,6 +391,7 @@ async def get_points_paid_tech_fte(
     )
 
 
+@cached_report("weekly-points-by-location")
 async def get_weekly_points_by_location(
     db: AsyncSession,
     org_id: UUID,
@@ -411,24 +404,23 @@ async def get_weekly_points_by_location(
 
     result = await db.execute(
         select(
-            Appointment.location_name,
-            Appointment.appointment_date,
-            Appointment.session,
-            func.sum(Appointment.visit_points).label("total_points"),
+            DailyPointsRollup.location_name,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
         )
         .where(
-            Appointment.organization_id == org_id,
-            Appointment.data_type == "prospective",
-            Appointment.is_excluded_from_reporting == False,  # noqa: E712
-            Appointment.appointment_date >= week_start,
-            Appointment.appointment_date <= week_end,
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.data_type == "prospective",
+            DailyPointsRollup.appointment_date >= week_start,
+            DailyPointsRollup.appointment_date <= week_end,
         )
         .group_by(
-            Appointment.location_name,
-            Appointment.appointment_date,
-            Appointment.session,
+            DailyPointsRollup.location_name,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
         )
-        .order_by(Appointment.location_name, Appointment.appointment_date)
+        .order_by(DailyPointsRollup.location_name, DailyPointsRollup.appointment_date)
     )
     rows = result.all()
 
@@ -477,3 +469,182 @@ async def get_weekly_points_by_location(
         week=week,
         locations=locations,
     )
+
+
+@cached_report("report-batch")
+async def get_report_batch(
+    db: AsyncSession,
+    org_id: UUID,
+    reports: List[str],
+    location_names: List[str],
+    months: List[str],
+    period: str = "four_weeks",
+) -> ReportBatchResponse:
+    """Per-location reports for several locations and months at once.
+
+    Runs one query per report type, grouped by location as well, instead of
+    one query per location and month. Each report is keyed by location name,
+    then month, and equals the single-location report for that pair. Months
+    are keyed as YYYY-MM, each once however often it was given.
+    """
+    # Every month has to be a distinct key: the rows in a range go to one of them
+    months = list(dict.fromkeys(normalize_month(m) for m in months))
+    response = ReportBatchResponse(locations=location_names, months=months)
+    keys = sorted({name.strip().lower() for name in location_names})
+
+    if "tech-points-by-location" in reports:
+        ranges = {m: get_period_date_range(m, period) for m in months}
+        techs = await _batch_tech_summaries(db, org_id, keys, ranges)
+        response.tech_points_by_location = {
+            name: {
+                m: TechPointsByLocationResponse(
+                    location_name=name,
+                    period=period,
+                    month=m,
+                    techs=techs.get((name.strip().lower(), m), []),
+                )
+                for m in months
+            }
+            for name in location_names
+        }
+
+    if "monthly-tech-points-by-location" in reports:
+        ranges = {m: get_month_date_range(*parse_month(m)) for m in months}
+        techs = await _batch_tech_summaries(db, org_id, keys, ranges)
+        response.monthly_tech_points_by_location = {
+            name: {
+                m: MonthlyTechPointsResponse(
+                    location_name=name,
+                    month=m,
+                    techs=techs.get((name.strip().lower(), m), []),
+                )
+                for m in months
+            }
+            for name in location_names
+        }
+
+    if "scheduled-points-by-provider" in reports:
+        ranges = {m: get_month_date_range(*parse_month(m)) for m in months}
+        provider_rows = await _batch_provider_rows(db, org_id, keys, ranges)
+
+        manager_result = await db.execute(
+            select(func.lower(Location.name).label("loc_name"), Location.manager_name).where(
+                Location.organization_id == org_id,
+                func.lower(Location.name).in_(keys),
+            )
+        )
+        manager_names: dict = {}
+        for row in manager_result.all():
+            manager_names.setdefault(row.loc_name, row.manager_name)
+
+        response.scheduled_points_by_provider = {
+            name: {
+                m: ScheduledPointsByProviderResponse(
+                    location_name=name,
+                    month=m,
+                    managers=_manager_points(
+                        provider_rows.get((name.strip().lower(), m), []),
+                        manager_names.get(name.strip().lower()),
+                        name,
+                    ),
+                )
+                for m in months
+            }
+            for name in location_names
+        }
+
+    return response
+
+
+async def _batch_tech_summaries(
+    db: AsyncSession,
+    org_id: UUID,
+    location_keys: List[str],
+    ranges: Dict[str, tuple[date, date]],
+) -> Dict[tuple[str, str], List[TechPointsSummary]]:
+    """Tech summaries per (lowercased location name, month) over retrospective data."""
+    loc_name = func.lower(DailyPointsRollup.location_name)
+    result = await db.execute(
+        select(
+            loc_name.label("loc_name"),
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
+        )
+        .where(
+            DailyPointsRollup.organization_id == org_id,
+            loc_name.in_(location_keys),
+            DailyPointsRollup.data_type == "retrospective",
+            _in_ranges(ranges),
+            DailyPointsRollup.rooming_tech.isnot(None),
+        )
+        .group_by(
+            loc_name,
+            DailyPointsRollup.rooming_tech,
+            DailyPointsRollup.appointment_date,
+            DailyPointsRollup.session,
+        )
+        .order_by(loc_name, DailyPointsRollup.rooming_tech, DailyPointsRollup.appointment_date)
+    )
+
+    grouped = defaultdict(list)
+    for row in result.all():
+        # Ranges never overlap: each lies within its own month
+        for month_str, (start, end) in ranges.items():
+            if start <= row.appointment_date <= end:
+                grouped[(row.loc_name, month_str)].append(row)
+                break
+    return {key: _tech_summaries(rows) for key, rows in grouped.items()}
+
+
+async def _batch_provider_rows(
+    db: AsyncSession,
+    org_id: UUID,
+    location_keys: List[str],
+    ranges: Dict[str, tuple[date, date]],
+) -> Dict[tuple[str, str], list]:
+    """Prospective provider/session points per (lowercased location name, month)."""
+    loc_name = func.lower(DailyPointsRollup.location_name)
+    year = extract("year", DailyPointsRollup.appointment_date)
+    month = extract("month", DailyPointsRollup.appointment_date)
+    result = await db.execute(
+        select(
+            loc_name.label("loc_name"),
+            year.label("year"),
+            month.label("month"),
+            DailyPointsRollup.provider,
+            DailyPointsRollup.session,
+            func.sum(DailyPointsRollup.total_points).label("total_points"),
+        )
+        .where(
+            DailyPointsRollup.organization_id == org_id,
+            loc_name.in_(location_keys),
+            DailyPointsRollup.data_type == "prospective",
+            _in_ranges(ranges),
+        )
+        .group_by(
+            loc_name, year, month, DailyPointsRollup.provider, DailyPointsRollup.session
+        )
+        .order_by(loc_name, year, month, DailyPointsRollup.provider)
+    )
+
+    month_names = {parse_month(m): m for m in ranges}
+    grouped = defaultdict(list)
+    for row in result.all():
+        month_str = month_names[(int(row.year), int(row.month))]
+        grouped[(row.loc_name, month_str)].append(row)
+    return grouped
+
+
+def _in_ranges(ranges: Dict[str, tuple[date, date]]):
+    """Condition matching rollup rows dated within any of the ranges."""
+    return or_(
+        *[
+            and_(
+                DailyPointsRollup.appointment_date >= start,
+                DailyPointsRollup.appointment_date <= end,
+            )
+            for start, end in ranges.values()
+        ]
+    )
@@ -0,0 +1,234 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.appointment import Appointment
+from app.models.daily_points_rollup import DailyPointsRollup, null_safe_key
+from app.services.lookup_cache import UPSERT_INSERT
+from app.services.report_cache import mark_report_data_changed
+
+# Dimensions of daily_points_rollup, in the order of its unique key
+ROLLUP_KEY_COLUMNS = [
+    "organization_id",
+    "data_type",
+    "appointment_date",
+    "location_name",
+    "location_id",
+    "rooming_tech",
+    "provider",
+    "specialty",
+    "session",
+]
+
+RollupKey = Tuple
+
+
+def counts_toward_reports(appt: Appointment) -> bool:
+    """Whether an appointment is included in report totals (and so in the rollup)."""
+    return not appt.is_excluded_from_reporting
+
+
+def reportable_totals(*criteria, negate: bool = False) -> Select:
+    """Rollup rows (key, points, count) summed from the reportable appointments matching criteria.
+
+    negate flips the sign of the totals, for taking appointments back out of
+    the rollup. Filtered by organization, data type and date range it can be
+    answered from the partial covering index idx_appointments_reportable alone.
+    """
+    columns = [Appointment.__table__.c[name] for name in ROLLUP_KEY_COLUMNS]
+    totals = [func.coalesce(func.sum(Appointment.visit_points), 0), func.count()]
+    if negate:
+        totals = [-total for total in totals]
+    return (
+        select(*columns, *totals)
+        .where(
+            Appointment.is_excluded_from_reporting == False,  # noqa: E712
+            *criteria,
+        )
+        .group_by(*columns)
+    )
+
+
+async def add_upload_to_rollup(db: AsyncSession, org_id: UUID, upload_id: UUID) -> None:
+    """Add an upload's reportable appointments to the rollup with one INSERT ... SELECT.
+
+    The rows are grouped by the rollup key in SQL and merged into existing
+    rollup rows with ON CONFLICT DO UPDATE, so nothing is read back.
+    """
+    await _merge_into_rollup(
+        db,
+        reportable_totals(
+            Appointment.organization_id == org_id, Appointment.upload_id == upload_id
+        ),
+    )
+    mark_report_data_changed(db, org_id)
+
+
+async def remove_from_rollup(db: AsyncSession, org_id: UUID, *criteria) -> None:
+    """Subtract the organization's reportable appointments matching criteria from the rollup.
+
+    Call before they are excluded or changed. Like add_upload_to_rollup, with
+    the totals negated; rollup rows left with no appointments are then
+    deleted.
+    """
+    await _merge_into_rollup(
+        db,
+        reportable_totals(Appointment.organization_id == org_id, *criteria, negate=True),
+    )
+    await db.execute(
+        delete(DailyPointsRollup).where(
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.appointment_count <= 0,
+        )
+    )
+    mark_report_data_changed(db, org_id)
+
+
+async def rebuild_rollup(db: AsyncSession, org_id: UUID, date_from: date, date_to: date) -> None:
+    """Recompute the organization's rollup rows for a date range from its appointments.
+
+    For changes that are not tracked row by row, such as new point values
+    set in place. The range is deleted and summed back in with one INSERT
+    ... SELECT, an index-only scan of idx_appointments_reportable.
+    """
+    await db.execute(
+        delete(DailyPointsRollup).where(
+            DailyPointsRollup.organization_id == org_id,
+            DailyPointsRollup.appointment_date.between(date_from, date_to),
+        )
+    )
+    await _merge_into_rollup(
+        db,
+        reportable_totals(
+            Appointment.organization_id == org_id,
+            Appointment.appointment_date.between(date_from, date_to),
+        ),
+    )
+    mark_report_data_changed(db, org_id)
+
+
+async def _merge_into_rollup(db: AsyncSession, rows: Select) -> None:
+    """INSERT ... SELECT of reportable_totals rows, accumulated into existing rollup rows."""
+    conn = await db.connection()
+    insert = UPSERT_INSERT[conn.dialect.name]
+    stmt = insert(DailyPointsRollup).from_select(
+        ROLLUP_KEY_COLUMNS + ["total_points", "appointment_count"],
+        rows,
+        include_defaults=False,
+    )
+    await db.execute(_accumulate_on_conflict(stmt, conn.dialect.name))
+
+
+async def count_reportable_appointments(
+    db: AsyncSession,
+    org_id: UUID,
+    location_name: Optional[str] = None,
+    data_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    provider: Optional[str] = None,
+) -> int:
+    """Number of reportable appointments matching list filters, summed from the rollup.
+
+    Drafts that are not excluded count toward reports and so are included,
+    which makes this an estimate for listings that leave drafts out.
+    """
+    query = select(func.coalesce(func.sum(DailyPointsRollup.appointment_count), 0)).where(
+        DailyPointsRollup.organization_id == org_id
+    )
+    if location_name:
+        query = query.where(
+            func.lower(DailyPointsRollup.location_name) == location_name.strip().lower()
+        )
+    if data_type:
+        query = query.where(DailyPointsRollup.data_type == data_type)
+    if date_from:
+        query = query.where(DailyPointsRollup.appointment_date >= date_from)
+    if date_to:
+        query = query.where(DailyPointsRollup.appointment_date <= date_to)
+    if provider:
+        query = query.where(
+            func.lower(DailyPointsRollup.provider).contains(provider.strip().lower())
+        )
+    return int(await db.scalar(query))
+
+
+class RollupDelta:
+    """Changes to the rollup from appointments created, edited or deleted one by one.
+
+    Call remove() with an appointment's state before it changes or is deleted
+    and add() with its state after it is created or changed, then apply().
+    Contributions are netted per rollup key before anything is written.
+    """
+
+    def __init__(self, org_id: UUID) -> None:
+        self.org_id = org_id
+        self.changes: Dict[RollupKey, List] = {}
+
+    def add(self, appt: Appointment) -> None:
+        self._record(appt, 1)
+
+    def remove(self, appt: Appointment) -> None:
+        self._record(appt, -1)
+
+    def _record(self, appt: Appointment, sign: int) -> None:
+        if not counts_toward_reports(appt):
+            return
+        key = tuple(getattr(appt, name) for name in ROLLUP_KEY_COLUMNS)
+        change = self.changes.setdefault(key, [Decimal("0"), 0])
+        change[0] += sign * Decimal(appt.visit_points or 0)
+        change[1] += sign
+
+    async def apply(self, db: AsyncSession) -> None:
+        """Upsert the net changes in one statement and drop rows left with no appointments."""
+        values = [
+            {
+                **dict(zip(ROLLUP_KEY_COLUMNS, key)),
+                "total_points": points,
+                "appointment_count": count,
+            }
+            for key, (points, count) in self.changes.items()
+            if points or count
+        ]
+        self.changes = {}
+        if not values:
+            return
+
+        conn = await db.connection()
+        insert = UPSERT_INSERT[conn.dialect.name]
+        stmt = _accumulate_on_conflict(
+            insert(DailyPointsRollup).values(values), conn.dialect.name
+        ).returning(
+            DailyPointsRollup.id, DailyPointsRollup.appointment_count
+        )
+        result = await db.execute(stmt)
+        emptied = [row_id for row_id, count in result.all() if count <= 0]
+        if emptied:
+            await db.execute(delete(DailyPointsRollup).where(DailyPointsRollup.id.in_(emptied)))
+        mark_report_data_changed(db, self.org_id)
+
+
+def _accumulate_on_conflict(stmt, dialect_name: str):
+    """ON CONFLICT on the rollup key that adds the new totals to the existing row.
+
+    The key is NULLS NOT DISTINCT on PostgreSQL; elsewhere its unique index
+    is on null_safe_key columns, which the conflict target has to repeat.
+    """
+    key = [DailyPointsRollup.__table__.c[name] for name in ROLLUP_KEY_COLUMNS]
+    if dialect_name != "postgresql":
+        key = [null_safe_key(column) for column in key]
+    return stmt.on_conflict_do_update(
+        index_elements=key,
+        set_={
+            "total_points": DailyPointsRollup.total_points + stmt.excluded.total_points,
+            "appointment_count": (
+                DailyPointsRollup.appointment_count + stmt.excluded.appointment_count
+            ),
+            "updated_at": func.now(),
+        },
+    )
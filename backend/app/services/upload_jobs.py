@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, wait as wait_futures
+from contextlib import aclosing
+from functools import partial
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.upload import Upload
+from app.services.upload_service import (
+    StageTimer,
+    UploadChunk,
+    UploadProcessingError,
+    create_pending_upload,
+    ingest_upload_chunks,
+    iter_upload_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock every running server process holds in shared mode
+SERVER_LOCK_KEY = "upload-jobs:servers"
+INTERRUPTED_UPLOAD_MESSAGE = "Processing was interrupted by a server restart; upload the file again"
+
+
+def saved_upload_path(upload_id: UUID, filename: str) -> Path:
+    """Where a background upload's file is kept under UPLOAD_DIR until it is ingested."""
+    return Path(settings.UPLOAD_DIR) / f"{upload_id}{Path(filename).suffix.lower()}"
+
+
+def remove_upload_file(path: Path) -> None:
+    """Delete a background upload's file once it is done with, unless KEEP_UPLOAD_FILES is set."""
+    if not settings.KEEP_UPLOAD_FILES:
+        path.unlink(missing_ok=True)
+
+
+async def fail_interrupted_uploads(db: AsyncSession) -> List[Tuple[UUID, str]]:
+    """Mark every upload still "processing" as failed; returns their (id, filename).
+
+    Only safe while no server process is running upload jobs.
+    """
+    result = await db.execute(
+        update(Upload)
+        .where(Upload.status == "processing")
+        .values(status="failed", error_message=INTERRUPTED_UPLOAD_MESSAGE)
+        .returning(Upload.id, Upload.filename)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def update_upload_progress(upload_id: UUID, percent: int, **fields) -> None:
+    """Commit a progress update in its own transaction so pollers see it immediately."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Upload)
+            .where(Upload.id == upload_id)
+            .values(progress_percent=percent, **fields)
+        )
+        await db.commit()
+
+
+async def mark_upload_failed(upload_id: UUID, error_message: str) -> None:
+    """Record a background upload failure."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Upload)
+            .where(Upload.id == upload_id)
+            .values(status="failed", error_message=error_message)
+        )
+        await db.commit()
+
+
+def send_upload_chunks(conn: Connection, path: str, filename: str, upload_type: str) -> None:
+    """Worker-process entry point: parse a saved file and send its chunks to the parent.
+
+    Sending blocks while the parent is still writing the previous chunk, so at
+    most one chunk waits in the pipe. None marks the end of the file; errors
+    propagate through the executor future.
+    """
+    try:
+        for chunk in iter_upload_chunks(path, filename, upload_type):
+            conn.send(chunk)
+        conn.send(None)
+    finally:
+        conn.close()
+
+
+def _receive_chunk(conn: Connection, future: Future) -> Optional[UploadChunk]:
+    """Wait for the next chunk, giving up if the worker finishes without sending one."""
+    while not conn.poll(0.2):
+        if future.done():
+            if conn.poll():
+                break
+            future.result()
+            raise EOFError("Upload worker exited before the end of the file")
+    return conn.recv()
+
+
+class UploadJobQueue:
+    """In-process queue that ingests uploaded files in the background.
+
+    Each job runs as an asyncio task. File parsing goes to a process pool so
+    it does not stall the event loop; the worker streams normalized chunks back
+    over a pipe while database work stays on the loop. The number of jobs
+    running at once per organization (per server process) is capped by
+    settings.upload_jobs_limit(); extra jobs wait their turn. Uploads
+    processed within the request (process_upload) are parsed by the same
+    pool.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Set[asyncio.Task] = set()
+        self._org_slots: Dict[UUID, asyncio.Semaphore] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._server_lock: Optional[AsyncConnection] = None
+
+    async def start(self) -> None:
+        """Fail the uploads that a stopped server left "processing", when it is safe to.
+
+        Jobs live in the memory of the server process that accepted them, so
+        uploads still processing when every server stopped never finish.
+        Each server process holds SERVER_LOCK_KEY in shared mode while it
+        runs; one that can take it exclusively first is the only one running,
+        and fails those uploads and removes their files. A worker restarted
+        while others keep running leaves them for the next full restart.
+        """
+        conn = await engine.connect()
+        if conn.dialect.name != "postgresql":
+            await conn.close()
+            return
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        key = {"key": SERVER_LOCK_KEY}
+        alone = await conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:key))"), key)
+        if alone:
+            async with AsyncSessionLocal() as db:
+                interrupted = await fail_interrupted_uploads(db)
+                await db.commit()
+            for upload_id, filename in interrupted:
+                remove_upload_file(saved_upload_path(upload_id, filename))
+            if interrupted:
+                logger.warning("Marked %d interrupted uploads as failed", len(interrupted))
+        await conn.execute(text("SELECT pg_advisory_lock_shared(hashtext(:key))"), key)
+        if alone:
+            await conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), key)
+        self._server_lock = conn
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.UPLOAD_WORKER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _org_slot(self, org_id: UUID) -> asyncio.Semaphore:
+        if org_id not in self._org_slots:
+            self._org_slots[org_id] = asyncio.Semaphore(settings.upload_jobs_limit(org_id))
+        return self._org_slots[org_id]
+
+    def submit(
+        self,
+        upload_id: UUID,
+        org_id: UUID,
+        path: str,
+        filename: str,
+        upload_type: str,
+    ) -> None:
+        """Queue ingestion of a saved file for an already-committed pending Upload."""
+        task = asyncio.create_task(self._run(upload_id, org_id, path, filename, upload_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stream_chunks(
+        self, path: str, filename: str, upload_type: str
+    ) -> AsyncIterator[UploadChunk]:
+        """Parse a saved file in a worker process, yielding chunks as they arrive."""
+        loop = asyncio.get_running_loop()
+        receiver, sender = multiprocessing.get_context("spawn").Pipe(duplex=False)
+        future = self._get_executor().submit(send_upload_chunks, sender, path, filename, upload_type)
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, _receive_chunk, receiver, future)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # Closing our end unblocks a worker that is still sending; its
+            # errors were already raised by _receive_chunk
+            receiver.close()
+            await loop.run_in_executor(None, wait_futures, [future])
+            sender.close()
+
+    async def _run(
+        self,
+        upload_id: UUID,
+        org_id: UUID,
+        path: str,
+        filename: str,
+        upload_type: str,
+    ) -> None:
+        async with self._org_slot(org_id):
+            try:
+                await self._ingest(upload_id, path, filename, upload_type)
+            finally:
+                remove_upload_file(Path(path))
+
+    async def _ingest(self, upload_id: UUID, path: str, filename: str, upload_type: str) -> None:
+        await update_upload_progress(upload_id, 5)
+
+        async with AsyncSessionLocal() as db:
+            try:
+                upload = await db.get(Upload, upload_id)
+                async with aclosing(self.stream_chunks(path, filename, upload_type)) as chunks:
+                    await ingest_upload_chunks(
+                        db,
+                        upload,
+                        chunks,
+                        progress=partial(update_upload_progress, upload_id),
+                    )
+                await db.commit()
+            except UploadProcessingError as e:
+                await db.rollback()
+                await mark_upload_failed(upload_id, str(e))
+            except Exception as e:
+                await db.rollback()
+                await mark_upload_failed(upload_id, f"Failed to process file: {str(e)}")
+
+    async def shutdown(self) -> None:
+        """Let running jobs finish, then stop the worker processes."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._server_lock is not None:
+            await self._server_lock.execute(
+                text("SELECT pg_advisory_unlock_shared(hashtext(:key))"), {"key": SERVER_LOCK_KEY}
+            )
+            await self._server_lock.close()
+            self._server_lock = None
+
+
+upload_jobs = UploadJobQueue()
+
+
+async def enqueue_upload(
+    db: AsyncSession,
+    org_id: UUID,
+    user_id: UUID,
+    upload_type: str,
+    filename: str,
+    path: str,
+    file_hash: str,
+) -> Upload:
+    """Keep a spooled upload file under UPLOAD_DIR and queue it for background ingestion.
+
+    Commits the pending Upload before the job starts so progress updates,
+    which use their own sessions, can see it. The file is deleted once the
+    job ends, unless KEEP_UPLOAD_FILES is set.
+    """
+    upload = await create_pending_upload(db, org_id, user_id, upload_type, filename, file_hash)
+
+    saved_path = saved_upload_path(upload.id, filename)
+    os.replace(path, saved_path)
+
+    await db.commit()
+    upload_jobs.submit(upload.id, org_id, str(saved_path), filename, upload_type)
+    return upload
+
+
+async def process_upload(
+    db: AsyncSession,
+    org_id: UUID,
+    user_id: UUID,
+    upload_type: str,
+    filename: str,
+    path: str,
+    file_hash: str,
+    timer: Optional[StageTimer] = None,
+) -> Upload:
+    """Process an uploaded file saved at path and create appointments within the request.
+
+    The file is parsed in the upload worker pool (see UploadJobQueue) and
+    written with ingest_upload_chunks, so the event loop only does database
+    work while the request waits. A file that cannot be parsed yields a
+    failed Upload with none of its rows kept.
+    """
+    upload = await create_pending_upload(db, org_id, user_id, upload_type, filename, file_hash)
+
+    try:
+        async with db.begin_nested():
+            async with aclosing(upload_jobs.stream_chunks(path, filename, upload_type)) as chunks:
+                await ingest_upload_chunks(db, upload, chunks, timer=timer)
+    except UploadProcessingError as e:
+        upload.status = "failed"
+        upload.error_message = str(e)
+        await db.flush()
+
+    return upload
@@ -1,19 +1,43 @@
 import hashlib
-import io
 import math
+import os
+from contextlib import contextmanager
 from datetime import datetime, time, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Optional, Tuple
+from time import perf_counter
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 from uuid import UUID
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import select, func
+from sqlalchemy import func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.appointment import Appointment
-from app.models.appointment_type import AppointmentType
-from app.models.location import Location
 from app.models.upload import Upload
+from app.services.appointment_loader import (
+    analyze_staged_rows,
+    create_staging_table,
+    drop_unchanged_staged_rows,
+    insert_staged_rows,
+    stage_upload_rows,
+    superseded_rows,
+)
+from app.services.file_readers import ChunkIterator, select_reader
+from app.services.lookup_cache import LookupCache
+from app.services.partitions import ensure_appointment_partition
+from app.services.rollup_service import add_upload_to_rollup, remove_from_rollup
 
 
 # Column name mappings for normalization
@@ -68,6 +92,49 @@ PROSPECTIVE_COLUMN_MAP = {
     "appt comments": "appt_comments",
 }
 
+# Optional columns copied onto appointments, grouped by how they are coerced
+COMMON_TEXT_FIELDS = ["department", "specialty", "patient_encounter_number", "appt_comments"]
+
+RETROSPECTIVE_TEXT_FIELDS = [
+    "rooming_tech",
+    "check_in_staff",
+    "check_in_comment",
+    "check_out_comment",
+    "tech_level",
+    "rooming_comment",
+    "tech_comment",
+    "primary_diagnosis",
+]
+
+RETROSPECTIVE_TIME_FIELDS = ["check_in_time", "check_out_time", "rooming_time", "tech_in", "tech_out"]
+
+RETROSPECTIVE_NUMERIC_FIELDS = [
+    "visit_duration_min",
+    "total_wait_duration",
+    "tech_duration",
+    "check_in_to_tech",
+    "appt_time_to_tech",
+    "pt_check_time",
+]
+
+DUPLICATE_KEY_FIELDS = {
+    "retrospective": [
+        "provider",
+        "location_name",
+        "appointment_date",
+        "appointment_time",
+        "visit_type",
+        "rooming_tech",
+    ],
+    "prospective": [
+        "provider",
+        "location_name",
+        "appointment_date",
+        "appointment_time",
+        "visit_type",
+    ],
+}
+
 
 def compute_file_hash(file_content: bytes) -> str:
     """Compute SHA-256 hash of file content."""
@@ -175,21 +242,6 @@ def normalize_columns(df: pd.DataFrame, column_map: Dict[str, str]) -> pd.DataFr
     return df
 
 
-def read_file_to_dataframe(file_content: bytes, filename: str) -> pd.DataFrame:
-    """Read CSV or Excel file content into a pandas DataFrame."""
-    buffer = io.BytesIO(file_content)
-    lower_name = filename.lower()
-
-    if lower_name.endswith(".xlsx") or lower_name.endswith(".xls"):
-        df = pd.read_excel(buffer, engine="openpyxl")
-    elif lower_name.endswith(".csv"):
-        df = pd.read_csv(buffer)
-    else:
-        raise ValueError(f"Unsupported file format: {filename}. Use .csv, .xlsx, or .xls")
-
-    return df
-
-
 def validate_required_columns(df: pd.DataFrame, upload_type: str) -> List[str]:
     """Validate that required columns are present. Returns list of missing columns."""
     if upload_type == "retrospective":
@@ -215,48 +267,140 @@ def validate_required_columns(df: pd.DataFrame, upload_type: str) -> List[str]:
     return missing
 
 
-async def get_point_value_map(
-    db: AsyncSession, org_id: UUID
-) -> Dict[str, Tuple[UUID, Decimal]]:
-    """Build a map of visit_type_name (lowered) -> (appointment_type_id, point_value)."""
-    result = await db.execute(
-        select(AppointmentType).where(
-            AppointmentType.organization_id == org_id,
-            AppointmentType.is_active == True,  # noqa: E712
-        )
-    )
-    types = result.scalars().all()
-    return {
-        at.name.strip().lower(): (at.id, at.point_value)
-        for at in types
-    }
-
-
-async def get_or_create_location(
-    db: AsyncSession, org_id: UUID, location_name: str
-) -> Optional[UUID]:
-    """Get or create a location by name within the organization. Returns location_id."""
-    if not location_name:
-        return None
+def _map_distinct(values: pd.Series, func) -> Tuple[pd.Series, np.ndarray]:
+    """Apply a scalar parser once per distinct cell value and broadcast the results.
 
-    result = await db.execute(
-        select(Location).where(
-            Location.organization_id == org_id,
-            func.lower(Location.name) == location_name.strip().lower(),
-        )
+    Cells are compared by value *and* type, so ``1``/``1.0``/``True`` or
+    ``None``/``NaN``/``NaT`` never share a result. Returns the mapped column
+    (object dtype) and a mask of rows whose value made ``func`` raise.
+    """
+    cells = values.to_numpy(dtype=object)
+    codes, _ = pd.factorize(cells, use_na_sentinel=False)
+    if values.dtype == object and len(cells):
+        type_codes, type_uniques = pd.factorize(values.map(type).to_numpy())
+        if len(type_uniques) > 1:
+            codes, _ = pd.factorize(codes * len(type_uniques) + type_codes)
+
+    _, first_index = np.unique(codes, return_index=True)
+    results = np.empty(len(first_index), dtype=object)
+    failed = np.zeros(len(first_index), dtype=bool)
+    for code, cell in enumerate(cells[first_index]):
+        try:
+            results[code] = func(cell)
+        except Exception:
+            failed[code] = True
+
+    return pd.Series(results[codes], index=values.index, dtype=object), failed[codes]
+
+
+def _clean_text_column(values: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """Column-wide equivalent of ``safe_str``."""
+    if values.dtype != object or pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        return _map_distinct(values, safe_str)
+
+    cleaned = values.str.strip()
+    blank = cleaned.isna() | (cleaned == "") | (cleaned.str.lower() == "nan")
+    cleaned = cleaned.astype(object)
+    cleaned[blank] = None
+    return cleaned, np.zeros(len(values), dtype=bool)
+
+
+def _fill_where(values: pd.Series, mask: pd.Series, fallback: pd.Series) -> pd.Series:
+    """Replace masked cells with ``fallback`` without letting pandas re-infer the dtype."""
+    filled = values.to_numpy(dtype=object).copy()
+    mask = mask.to_numpy(dtype=bool)
+    filled[mask] = fallback.to_numpy(dtype=object)[mask]
+    return pd.Series(filled, index=values.index, dtype=object)
+
+
+def _is_missing(values: pd.Series) -> np.ndarray:
+    """Rows holding None (or NaT) after coercion."""
+    return values.isna().to_numpy()
+
+
+def normalize_upload_frame(
+    df: pd.DataFrame, upload_type: str, row_offset: int = 0
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """Coerce a column-normalized upload DataFrame into appointment fields.
+
+    Columnar counterpart of parsing each row with ``safe_str``,
+    ``parse_date_value``, ``parse_time_value``, ``parse_numeric``,
+    ``parse_int`` and ``determine_session``: text columns are cleaned with
+    vectorized string operations and the scalar parsers run once per distinct
+    cell value rather than once per row.
+
+    Returns the validated frame (rows that pass required-field checks, object
+    dtype, in file order) and a per-row rejection mask aligned with ``df``.
+    ``row_offset`` shifts ``row_number`` for frames that start mid-file.
+    """
+    if len(df.columns) and all(dt.kind in "iuf" for dt in df.dtypes):
+        # Row-wise parsing saw a single upcast dtype when no column held objects
+        df = df.astype(np.result_type(*df.dtypes))
+
+    rejected = np.zeros(len(df), dtype=bool)
+
+    def column(name: str) -> pd.Series:
+        if name in df.columns:
+            return df[name]
+        return pd.Series(None, index=df.index, dtype=object)
+
+    def coerce(name: str, func=None) -> pd.Series:
+        nonlocal rejected
+        if func is None:
+            values, failed = _clean_text_column(column(name))
+        else:
+            values, failed = _map_distinct(column(name), func)
+        rejected |= failed
+        return values
+
+    fields: Dict[str, pd.Series] = {}
+    for name in ("location_name", "provider", "visit_type"):
+        fields[name] = coerce(name)
+        rejected |= _is_missing(fields[name])
+
+    fields["appointment_date"] = coerce("appointment_date", parse_date_value)
+    rejected |= _is_missing(fields["appointment_date"])
+    fields["appointment_time"] = coerce("appointment_time", parse_time_value)
+    rejected |= _is_missing(fields["appointment_time"])
+
+    for name in COMMON_TEXT_FIELDS:
+        fields[name] = coerce(name)
+
+    # Session: an explicit AM/PM value wins, otherwise derive from the hour
+    session_val = coerce("session").str.upper()
+    derived, failed = _map_distinct(
+        fields["appointment_time"], lambda t: "AM" if t.hour < 12 else "PM"
     )
-    location = result.scalar_one_or_none()
-    if location:
-        return location.id
+    rejected |= failed
+    fields["session"] = _fill_where(session_val, ~session_val.isin(["AM", "PM"]), derived)
 
-    # Auto-create
-    new_location = Location(
-        organization_id=org_id,
-        name=location_name.strip(),
+    # Day of week / week of month fall back to values derived from the date
+    dates = fields["appointment_date"]
+    day_names, failed = _map_distinct(dates, lambda d: d.strftime("%A"))
+    rejected |= failed
+    day_of_week = coerce("day_of_week")
+    fields["day_of_week"] = _fill_where(day_of_week, day_of_week.isna(), day_names)
+
+    week_numbers, failed = _map_distinct(dates, lambda d: (d.day - 1) // 7 + 1)
+    rejected |= failed
+    week_of_month = coerce("week_of_month", parse_int)
+    fields["week_of_month"] = _fill_where(week_of_month, week_of_month.isna(), week_numbers)
+
+    if upload_type == "retrospective":
+        for name in RETROSPECTIVE_TEXT_FIELDS:
+            fields[name] = coerce(name)
+        for name in RETROSPECTIVE_TIME_FIELDS:
+            fields[name] = coerce(name, parse_time_value)
+        for name in RETROSPECTIVE_NUMERIC_FIELDS:
+            fields[name] = coerce(name, parse_numeric)
+
+    fields["row_number"] = pd.Series(
+        (df.index.to_numpy() + 1 + row_offset).tolist(), index=df.index, dtype=object
     )
-    db.add(new_location)
-    await db.flush()
-    return new_location.id
+
+    rejection_mask = pd.Series(rejected, index=df.index)
+    frame = pd.DataFrame(fields, index=df.index)[~rejected].copy()
+    return frame, rejection_mask
 
 
 async def get_next_version(
@@ -267,300 +411,463 @@ async def get_next_version(
         select(func.max(Upload.version_number)).where(
             Upload.organization_id == org_id,
             Upload.upload_type == upload_type,
+            Upload.status != "processing",
         )
     )
     max_version = result.scalar_one_or_none()
     return (max_version or 0) + 1
 
 
-async def deactivate_previous_uploads(
-    db: AsyncSession, org_id: UUID, upload_type: str
-) -> None:
-    """Mark all previous active uploads of the same type as inactive."""
-    result = await db.execute(
-        select(Upload).where(
+async def find_identical_upload(
+    db: AsyncSession, org_id: UUID, upload_type: str, file_hash: str
+) -> Optional[Upload]:
+    """The active upload of a type, if it was made from a file with this hash.
+
+    Ingesting the same file again would change nothing, so callers return
+    this upload instead.
+    """
+    return await db.scalar(
+        select(Upload)
+        .where(
             Upload.organization_id == org_id,
             Upload.upload_type == upload_type,
             Upload.is_active == True,  # noqa: E712
+            Upload.status == "completed",
+            Upload.file_hash == file_hash,
         )
+        .limit(1)
     )
-    previous_uploads = result.scalars().all()
-    for up in previous_uploads:
-        up.is_active = False
 
 
-def detect_duplicates_retrospective(rows: List[dict]) -> List[dict]:
-    """Mark within-file duplicates for retrospective data.
-    Duplicate key: Provider + Location + Appt Date + Appt Time + Visit Type + Rooming Tech
-    """
-    seen = set()
-    for row in rows:
-        key = (
-            (row.get("provider") or "").lower(),
-            (row.get("location_name") or "").lower(),
-            str(row.get("appointment_date")),
-            str(row.get("appointment_time")),
-            (row.get("visit_type") or "").lower(),
-            (row.get("rooming_tech") or "").lower(),
+async def lock_upload_dataset(db: AsyncSession, org_id: UUID, upload_type: str) -> None:
+    """Serialize writers of an organization's data of one type, until the transaction ends."""
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"upload-dataset:{org_id}:{upload_type}"},
         )
-        if key in seen:
-            row["is_duplicate"] = True
-            row["is_excluded_from_reporting"] = True
-            row["exclusion_reason"] = "WITHIN_FILE_DUPLICATE"
-        else:
-            seen.add(key)
-    return rows
 
 
-def detect_duplicates_prospective(rows: List[dict]) -> List[dict]:
-    """Mark within-file duplicates for prospective data.
-    Duplicate key: Provider + Location + Appt Date + Appt Time + Visit Type
+async def supersede_previous_rows(db: AsyncSession, upload: Upload) -> int:
+    """Take the rows that the staged file no longer contains out of the organization's dataset.
+
+    Reported rows of earlier uploads of the same type that no staged row
+    repeats (see appointment_loader.superseded_rows) are subtracted from the
+    rollup and flagged excluded (exclusion_reason="SUPERSEDED_UPLOAD") with
+    one set-based statement each; the rows themselves are kept as history.
+    Earlier uploads of the type are marked inactive. Runs in the ingesting
+    transaction after the file is staged and before any new row is written,
+    so new rows are not flagged as duplicates of the data they replace, and
+    readers see either the old dataset or the new one. Returns the number
+    of rows taken out.
     """
-    seen = set()
-    for row in rows:
-        key = (
-            (row.get("provider") or "").lower(),
-            (row.get("location_name") or "").lower(),
-            str(row.get("appointment_date")),
-            str(row.get("appointment_time")),
-            (row.get("visit_type") or "").lower(),
+    org_id = upload.organization_id
+    criteria = superseded_rows(upload.upload_type, upload.id)
+    await remove_from_rollup(db, org_id, *criteria)
+    result = await db.execute(
+        update(Appointment)
+        .where(
+            Appointment.organization_id == org_id,
+            Appointment.is_excluded_from_reporting == False,  # noqa: E712
+            *criteria,
         )
-        if key in seen:
-            row["is_duplicate"] = True
-            row["is_excluded_from_reporting"] = True
-            row["exclusion_reason"] = "WITHIN_FILE_DUPLICATE"
-        else:
-            seen.add(key)
-    return rows
+        .values(is_excluded_from_reporting=True, exclusion_reason="SUPERSEDED_UPLOAD")
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Upload)
+        .where(
+            Upload.organization_id == org_id,
+            Upload.upload_type == upload.upload_type,
+            Upload.is_active == True,  # noqa: E712
+            Upload.id != upload.id,
+        )
+        .values(is_active=False)
+    )
+    return result.rowcount
 
 
-async def process_upload(
-    db: AsyncSession,
-    org_id: UUID,
-    user_id: UUID,
-    upload_type: str,
-    filename: str,
-    file_content: bytes,
-) -> Upload:
-    """Process an uploaded file and create appointments.
-
-    Steps:
-    1. Read file to DataFrame
-    2. Normalize column names
-    3. Validate required columns
-    4. Look up point values
-    5. Detect duplicates
-    6. Create Upload record
-    7. Deactivate previous uploads
-    8. Bulk insert appointments
-    9. Auto-create locations
+# Joins the key fields before hashing; cannot occur in normal text
+DEDUP_KEY_SEPARATOR = "\x1f"
+
+
+def _hash_key_text(text: str) -> int:
+    """First 64 bits of the MD5 of a key, as a signed integer.
+
+    Matches ('x' || substr(md5(key), 1, 16))::bit(64)::bigint in PostgreSQL,
+    which the migration used to backfill existing rows.
     """
-    file_hash = compute_file_hash(file_content)
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "big", signed=True)
 
-    # Read file
-    try:
-        df = read_file_to_dataframe(file_content, filename)
-    except Exception as e:
-        upload = Upload(
-            organization_id=org_id,
-            uploaded_by=user_id,
-            upload_type=upload_type,
-            filename=filename,
-            file_hash=file_hash,
-            status="failed",
-            error_message=f"Failed to read file: {str(e)}",
-        )
-        db.add(upload)
-        await db.flush()
-        return upload
-
-    if df.empty:
-        upload = Upload(
-            organization_id=org_id,
-            uploaded_by=user_id,
-            upload_type=upload_type,
-            filename=filename,
-            file_hash=file_hash,
-            status="failed",
-            error_message="File is empty",
-        )
-        db.add(upload)
-        await db.flush()
-        return upload
 
-    # Normalize columns
-    column_map = RETROSPECTIVE_COLUMN_MAP if upload_type == "retrospective" else PROSPECTIVE_COLUMN_MAP
-    df = normalize_columns(df, column_map)
-
-    # Validate required columns
-    missing = validate_required_columns(df, upload_type)
-    if missing:
-        upload = Upload(
-            organization_id=org_id,
-            uploaded_by=user_id,
-            upload_type=upload_type,
-            filename=filename,
-            file_hash=file_hash,
-            status="failed",
-            error_message=f"Missing required columns: {', '.join(missing)}",
-        )
-        db.add(upload)
-        await db.flush()
-        return upload
+def appointment_dedup_key(
+    data_type: str,
+    provider: Optional[str],
+    location_name: Optional[str],
+    appointment_date,
+    appointment_time: time,
+    visit_type: Optional[str],
+    rooming_tech: Optional[str] = None,
+) -> int:
+    """Duplicate key of a single appointment, stored in appointments.dedup_key.
 
-    # Get point value map
-    point_map = await get_point_value_map(db, org_id)
+    Retrospective key: Provider + Location + Appt Date + Appt Time + Visit Type + Rooming Tech
+    Prospective key: Provider + Location + Appt Date + Appt Time + Visit Type
+    Text is compared case-insensitively; times to the second.
+    """
+    parts = [
+        (provider or "").lower(),
+        (location_name or "").lower(),
+        appointment_date.isoformat(),
+        appointment_time.strftime("%H:%M:%S"),
+        (visit_type or "").lower(),
+    ]
+    if data_type == "retrospective":
+        parts.append((rooming_tech or "").lower())
+    return _hash_key_text(DEDUP_KEY_SEPARATOR.join(parts))
+
+
+def dedup_key_column(frame: pd.DataFrame, upload_type: str) -> pd.Series:
+    """appointment_dedup_key for every row of a normalized frame."""
+    key_text = None
+    for field in DUPLICATE_KEY_FIELDS[upload_type]:
+        part = _duplicate_key_column(frame[field])
+        key_text = part if key_text is None else key_text + DEDUP_KEY_SEPARATOR + part
+    return pd.Series(
+        [_hash_key_text(text) for text in key_text], index=frame.index, dtype="int64"
+    )
 
-    # Build location cache
-    location_cache: Dict[str, UUID] = {}
 
-    # Process rows
-    rows = []
-    total_rows = len(df)
-    valid_rows = 0
+def content_hash_column(frame: pd.DataFrame) -> pd.Series:
+    """Hash of each row's normalized fields, stored in appointments.content_hash.
+
+    Covers every field read from the file except row_number, so a row that
+    comes back unchanged matches its earlier copy wherever it sits in the
+    file. pandas' row hash (SipHash) works column by column in C; a pandas
+    upgrade that changed it would only make the next upload of each type a
+    full replacement.
+    """
+    fields = frame.drop(columns=["row_number"], errors="ignore")
+    hashes = pd.util.hash_pandas_object(fields, index=False).to_numpy()
+    return pd.Series(hashes.view(np.int64), index=frame.index)
+
+
+def _duplicate_key_column(values: pd.Series) -> pd.Series:
+    """Render a normalized column the way the duplicate key compares it."""
+    if values.name == "appointment_date":
+        return _map_distinct(values, lambda d: d.isoformat())[0]
+    if values.name == "appointment_time":
+        return _map_distinct(values, lambda t: t.strftime("%H:%M:%S"))[0]
+    return _map_distinct(values, lambda v: (v or "").lower())[0]
+
+
+class DuplicateKeyTracker:
+    """Flag within-file duplicates across the chunks of one upload.
+
+    The first occurrence of each dedup key is kept. Keys seen in earlier
+    chunks are remembered in a sorted array (8 bytes per distinct key), so
+    memory does not grow with the width of the rows.
+    """
+
+    def __init__(self) -> None:
+        self._seen = np.empty(0, dtype=np.int64)
+
+    def mark(self, keys: pd.Series) -> pd.Series:
+        """Return a boolean Series, True for rows whose key was already seen."""
+        duplicates = keys.duplicated(keep="first") | keys.isin(self._seen)
+        self._seen = np.union1d(self._seen, keys[~duplicates].to_numpy())
+        return duplicates
+
 
-    for idx, row_data in df.iterrows():
+class UploadProcessingError(ValueError):
+    """Raised when an uploaded file cannot be turned into appointment rows."""
+
+
+# Awaited as progress(percent, **upload_fields) between ingestion stages
+ProgressCallback = Callable[..., Awaitable[None]]
+
+
+class StageTimer:
+    """Wall time spent in each stage of an ingestion, in seconds.
+
+    Stages: read, normalize and dedup (measured where the file is parsed,
+    a worker process), supersede, resolve, insert and rollup.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = perf_counter()
         try:
-            location_name = safe_str(row_data.get("location_name"))
-            if not location_name:
-                continue
+            yield
+        finally:
+            self.record(name, perf_counter() - started)
 
-            provider = safe_str(row_data.get("provider"))
-            if not provider:
-                continue
+    def record(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
 
-            appointment_date = parse_date_value(row_data.get("appointment_date"))
-            if appointment_date is None:
-                continue
 
-            appointment_time = parse_time_value(row_data.get("appointment_time"))
-            if appointment_time is None:
-                continue
+class ColumnarFrame(NamedTuple):
+    """A DataFrame in compact column form, for sending between processes.
 
-            visit_type = safe_str(row_data.get("visit_type"))
-            if not visit_type:
+    Object columns (names, dates, times, point values) are factorized: each
+    distinct value is kept once, with an integer code per row, so a chunk
+    pickles to a fraction of the DataFrame's size and is rebuilt with array
+    indexing instead of one Python object per cell. Other columns are kept
+    as they are. Missing values come back as None.
+    """
+
+    length: int
+    codes: Dict[str, np.ndarray]  # per factorized column, -1 for missing
+    values: Dict[str, np.ndarray]  # distinct values of a factorized column, or the column
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "ColumnarFrame":
+        codes: Dict[str, np.ndarray] = {}
+        values: Dict[str, np.ndarray] = {}
+        for name in frame.columns:
+            column = frame[name]
+            if column.dtype != object:
+                values[name] = column.to_numpy()
                 continue
+            column_codes, uniques = pd.factorize(column)
+            code_type = np.int16 if len(uniques) < np.iinfo(np.int16).max else np.int32
+            codes[name] = column_codes.astype(code_type)
+            # Code -1 picks the trailing None
+            values[name] = np.append(np.asarray(uniques, dtype=object), None)
+        return cls(len(frame), codes, values)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                name: values[self.codes[name]] if name in self.codes else values
+                for name, values in self.values.items()
+            },
+            index=pd.RangeIndex(self.length),
+        )
 
-            # Resolve location
-            loc_key = location_name.strip().lower()
-            if loc_key not in location_cache:
-                loc_id = await get_or_create_location(db, org_id, location_name)
-                location_cache[loc_key] = loc_id
-            location_id = location_cache[loc_key]
-
-            # Resolve points from DB appointment types (CSV visit_points column is ignored)
-            vt_lower = visit_type.strip().lower()
-            appointment_type_id = None
-
-            if vt_lower in point_map:
-                appointment_type_id, visit_points = point_map[vt_lower]
-            else:
-                visit_points = Decimal("0")
-
-            # Determine session
-            session_val = safe_str(row_data.get("session"))
-            session = determine_session(appointment_time, session_val)
-
-            # Day of week
-            day_of_week = safe_str(row_data.get("day_of_week"))
-            if not day_of_week and appointment_date:
-                day_of_week = appointment_date.strftime("%A")
-
-            # Week of month
-            week_of_month = parse_int(row_data.get("week_of_month"))
-            if week_of_month is None and appointment_date:
-                week_of_month = (appointment_date.day - 1) // 7 + 1
-
-            appt_row = {
-                "organization_id": org_id,
-                "data_type": upload_type,
-                "department": safe_str(row_data.get("department")),
-                "location_id": location_id,
-                "location_name": location_name,
-                "provider": provider,
-                "specialty": safe_str(row_data.get("specialty")),
-                "patient_encounter_number": safe_str(row_data.get("patient_encounter_number")),
-                "appointment_date": appointment_date,
-                "day_of_week": day_of_week,
-                "week_of_month": week_of_month,
-                "appointment_time": appointment_time,
-                "session": session,
-                "visit_type": visit_type,
-                "visit_points": visit_points,
-                "appointment_type_id": appointment_type_id,
-                "appt_comments": safe_str(row_data.get("appt_comments")),
-                "source": "csv",
-                "row_number": int(idx) + 1,
-                "is_duplicate": False,
-                "is_excluded_from_reporting": False,
-                "exclusion_reason": None,
-            }
-
-            # Retrospective-only fields
-            if upload_type == "retrospective":
-                appt_row.update({
-                    "rooming_tech": safe_str(row_data.get("rooming_tech")),
-                    "check_in_staff": safe_str(row_data.get("check_in_staff")),
-                    "check_in_time": parse_time_value(row_data.get("check_in_time")),
-                    "check_in_comment": safe_str(row_data.get("check_in_comment")),
-                    "check_out_time": parse_time_value(row_data.get("check_out_time")),
-                    "check_out_comment": safe_str(row_data.get("check_out_comment")),
-                    "visit_duration_min": parse_numeric(row_data.get("visit_duration_min")),
-                    "total_wait_duration": parse_numeric(row_data.get("total_wait_duration")),
-                    "tech_level": safe_str(row_data.get("tech_level")),
-                    "rooming_time": parse_time_value(row_data.get("rooming_time")),
-                    "rooming_comment": safe_str(row_data.get("rooming_comment")),
-                    "tech_in": parse_time_value(row_data.get("tech_in")),
-                    "tech_out": parse_time_value(row_data.get("tech_out")),
-                    "tech_duration": parse_numeric(row_data.get("tech_duration")),
-                    "tech_comment": safe_str(row_data.get("tech_comment")),
-                    "check_in_to_tech": parse_numeric(row_data.get("check_in_to_tech")),
-                    "appt_time_to_tech": parse_numeric(row_data.get("appt_time_to_tech")),
-                    "pt_check_time": parse_numeric(row_data.get("pt_check_time")),
-                    "primary_diagnosis": safe_str(row_data.get("primary_diagnosis")),
-                })
-
-            rows.append(appt_row)
-            valid_rows += 1
 
-        except Exception:
-            # Skip problematic rows silently
-            continue
+class UploadChunk(NamedTuple):
+    """One normalized chunk of an uploaded file."""
 
-    # Detect duplicates
-    if upload_type == "retrospective":
-        rows = detect_duplicates_retrospective(rows)
-    else:
-        rows = detect_duplicates_prospective(rows)
+    columns: ColumnarFrame  # valid rows, with dedup_key, content_hash and is_duplicate
+    rows_read: int  # data rows read from the file, valid or not
+    fraction_read: float  # share of the file consumed so far
+    reader: str  # name of the file reader used
+    read_seconds: float  # time spent in the reader so far
+    normalize_seconds: float  # time spent normalizing so far
+    dedup_seconds: float  # time spent hashing rows and finding duplicates so far
 
-    duplicate_count = sum(1 for r in rows if r.get("is_duplicate"))
 
-    # Get next version and deactivate previous
-    version_number = await get_next_version(db, org_id, upload_type)
-    await deactivate_previous_uploads(db, org_id, upload_type)
+def iter_upload_chunks(
+    path: str, filename: str, upload_type: str, chunksize: Optional[int] = None
+) -> Iterator[UploadChunk]:
+    """Read, validate and normalize an uploaded file chunk by chunk.
+
+    Pure CPU work with no database access, run in a worker process (see
+    upload_jobs). The reader is chosen by file type and size (see
+    file_readers). Columns are checked on the first chunk, before any rows
+    are yielded. Each row gets its dedup_key and content_hash, and
+    is_duplicate marks repeats of an earlier row of the file.
+    Raises UploadProcessingError when the file is unusable.
+    """
+    try:
+        reader = select_reader(filename, os.path.getsize(path))
+    except Exception as e:
+        raise UploadProcessingError(f"Failed to read file: {str(e)}")
+
+    column_map = RETROSPECTIVE_COLUMN_MAP if upload_type == "retrospective" else PROSPECTIVE_COLUMN_MAP
+    rows_seen = 0
+    normalize_seconds = 0.0
+    dedup_seconds = 0.0
+    duplicates = DuplicateKeyTracker()
+
+    chunks = _timed_chunks(reader.read(path, chunksize or settings.UPLOAD_CHUNK_ROWS))
+    for df, fraction_read, read_seconds in chunks:
+        started = perf_counter()
+        if rows_seen == 0:
+            if df.empty:
+                raise UploadProcessingError("File is empty")
+            df = normalize_columns(df, column_map)
+            missing = validate_required_columns(df, upload_type)
+            if missing:
+                raise UploadProcessingError(f"Missing required columns: {', '.join(missing)}")
+        else:
+            df = normalize_columns(df, column_map)
+
+        rows_seen += len(df)
+        frame, _ = normalize_upload_frame(df, upload_type)
+        normalize_seconds += perf_counter() - started
+
+        started = perf_counter()
+        if not frame.empty:
+            frame["content_hash"] = content_hash_column(frame)
+            frame["dedup_key"] = dedup_key_column(frame, upload_type)
+            frame["is_duplicate"] = duplicates.mark(frame["dedup_key"])
+        dedup_seconds += perf_counter() - started
+
+        yield UploadChunk(
+            ColumnarFrame.from_frame(frame),
+            len(df),
+            fraction_read,
+            reader.name,
+            read_seconds,
+            normalize_seconds,
+            dedup_seconds,
+        )
+
+    if rows_seen == 0:
+        raise UploadProcessingError("File is empty")
+
+
+def _timed_chunks(chunks: ChunkIterator) -> Iterator[Tuple[pd.DataFrame, float, float]]:
+    """Add the cumulative reader time to each chunk, reporting reader errors as UploadProcessingError."""
+    read_seconds = 0.0
+    while True:
+        started = perf_counter()
+        try:
+            df, fraction_read = next(chunks)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise UploadProcessingError(f"Failed to read file: {str(e)}")
+        read_seconds += perf_counter() - started
+        yield df, fraction_read, read_seconds
+
 
-    # Create upload record
+async def create_pending_upload(
+    db: AsyncSession,
+    org_id: UUID,
+    user_id: UUID,
+    upload_type: str,
+    filename: str,
+    file_hash: str,
+) -> Upload:
+    """Create the Upload record for a file that is about to be processed.
+
+    It stays inactive until ingestion completes, so it never replaces the
+    current dataset early and is skipped by version numbering.
+    """
     upload = Upload(
         organization_id=org_id,
         uploaded_by=user_id,
         upload_type=upload_type,
         filename=filename,
         file_hash=file_hash,
-        version_number=version_number,
-        row_count=total_rows,
-        valid_row_count=valid_rows,
-        duplicate_count=duplicate_count,
-        status="completed",
+        status="processing",
+        progress_percent=0,
+        is_active=False,
     )
     db.add(upload)
     await db.flush()
+    return upload
+
+
+async def ingest_upload_chunks(
+    db: AsyncSession,
+    upload: Upload,
+    chunks: AsyncIterator[UploadChunk],
+    progress: Optional[ProgressCallback] = None,
+    timer: Optional[StageTimer] = None,
+) -> Upload:
+    """Write a parsed upload to the database and mark it as the active version.
+
+    Chunks arrive parsed, with within-file duplicates marked (see
+    iter_upload_chunks). For each chunk, locations are resolved (new ones
+    created in bulk) and point values looked up, and the rows are loaded
+    into a staging table. Once the whole file is staged, it is compared with
+    the active dataset of its type by content_hash:
+    1. Rows the file no longer contains are superseded (see
+       supersede_previous_rows)
+    2. Staged rows the dataset already holds are dropped; those appointments
+       keep their rows, upload and point values
+    3. The remaining staged rows, added or changed, are inserted, flagging
+       cross-upload duplicates in SQL
+
+    So a file that differs little from the last one costs writes in
+    proportion to the difference. Then the new rows are added to the daily
+    points rollup and the Upload record completed. Everything happens in
+    the caller's transaction, so the swap of datasets becomes visible at its
+    commit. Time spent per stage is added to timer when one is given.
+    """
+    org_id = upload.organization_id
+    upload_type = upload.upload_type
+    timer = timer or StageTimer()
+
+    await ensure_appointment_partition(db, org_id)
+    await lock_upload_dataset(db, org_id, upload_type)
+    await create_staging_table(db)
+    lookups = await LookupCache.load(db, org_id)
+    total_rows = 0
+    valid_rows = 0
+    duplicate_count = 0
+    chunk: Optional[UploadChunk] = None
+
+    async for chunk in chunks:
+        frame = chunk.columns.to_frame()
+        total_rows += chunk.rows_read
+        valid_rows += len(frame)
+
+        if not frame.empty:
+            with timer.stage("resolve"):
+                frame["location_id"] = await lookups.location_ids(db, frame["location_name"])
+                # Resolve points from DB appointment types (CSV visit_points column is ignored)
+                frame["appointment_type_id"], frame["visit_points"] = lookups.appointment_types(
+                    frame["visit_type"]
+                )
+
+            is_duplicate = frame["is_duplicate"].astype(bool)
+            duplicate_count += int(is_duplicate.sum())
+
+            frame["organization_id"] = org_id
+            frame["upload_id"] = upload.id
+            frame["data_type"] = upload_type
+            frame["source"] = "csv"
+            frame["is_duplicate"] = is_duplicate
+            frame["is_excluded_from_reporting"] = is_duplicate
+            frame["exclusion_reason"] = np.where(is_duplicate, "WITHIN_FILE_DUPLICATE", None)
+            frame["is_draft"] = False
+            with timer.stage("insert"):
+                await stage_upload_rows(db, frame)
+
+        if progress:
+            await progress(
+                10 + int(80 * chunk.fraction_read),
+                row_count=total_rows,
+                valid_row_count=valid_rows,
+                duplicate_count=duplicate_count,
+            )
+
+    with timer.stage("supersede"):
+        await analyze_staged_rows(db)
+        removed_count = await supersede_previous_rows(db, upload)
+        unchanged_count = await drop_unchanged_staged_rows(db, org_id, upload_type)
+    with timer.stage("insert"):
+        duplicate_count += await insert_staged_rows(db, org_id, upload_type)
+
+    with timer.stage("rollup"):
+        await add_upload_to_rollup(db, org_id, upload.id)
 
-    # Bulk insert appointments
-    for row in rows:
-        row["upload_id"] = upload.id
-        appt = Appointment(**row)
-        db.add(appt)
+    version_number = await get_next_version(db, org_id, upload_type)
 
+    upload.version_number = version_number
+    upload.row_count = total_rows
+    upload.valid_row_count = valid_rows
+    upload.duplicate_count = duplicate_count
+    upload.unchanged_row_count = unchanged_count
+    upload.removed_row_count = removed_count
+    if chunk is not None:
+        upload.file_reader = chunk.reader
+        upload.read_duration_ms = int(chunk.read_seconds * 1000)
+        timer.record("read", chunk.read_seconds)
+        timer.record("normalize", chunk.normalize_seconds)
+        timer.record("dedup", chunk.dedup_seconds)
+    upload.status = "completed"
+    upload.progress_percent = 100
+    upload.is_active = True
     await db.flush()
 
     return upload
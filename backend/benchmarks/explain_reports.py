@@ -0,0 +1,284 @@
+"""Check that report and listing queries are planned on their indexes.
+
+Runs each report against a migrated PostgreSQL database (DATABASE_URL),
+captures the SQL it issues and EXPLAINs every statement with the same
+parameters. A check fails if a statement scans appointments or
+daily_points_rollup sequentially, if a statement reads more than one
+appointments partition (it should be pruned to its organization's), or
+if none of its statements uses the index it is expected to use.
+Sequential scans are disabled while explaining, so the result does not
+depend on how much data the database holds; index-only scans also need
+a vacuumed table to be chosen.
+
+Usage, from backend/:
+
+    python -m benchmarks.explain_reports [--org ORG_ID] [--json]
+
+Exits with status 1 if any check fails.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import event, func, select, text
+
+from app.api.appointments import list_appointments
+from app.database import AsyncSessionLocal, engine
+from app.models.appointment import Appointment
+from app.models.daily_points_rollup import DailyPointsRollup
+from app.services import dashboard_service, report_service
+from app.services.report_cache import report_cache
+from app.services.rollup_service import reportable_totals
+
+CHECKED_TABLES = {"appointments", "daily_points_rollup"}
+
+
+class Check(NamedTuple):
+    name: str
+    expected_index: str
+    run: Callable[..., Awaitable]
+
+
+class Scan(NamedTuple):
+    node_type: str
+    relation: Optional[str]
+    index: Optional[str]
+
+
+def build_checks(org_id: UUID, location: str, month: str) -> List[Check]:
+    first_day = date.fromisoformat(f"{month}-01")
+
+    async def rollup_source(db):
+        query = reportable_totals(
+            Appointment.organization_id == org_id,
+            Appointment.data_type == "retrospective",
+            Appointment.appointment_date >= first_day,
+            Appointment.appointment_date <= report_service.get_month_date_range(
+                first_day.year, first_day.month
+            )[1],
+        )
+        return (await db.execute(query)).all()
+
+    async def appointment_list(db):
+        return await list_appointments(
+            current_user=None,
+            db=db,
+            org_id=org_id,
+            location_name=location,
+            data_type=None,
+            date_from=None,
+            date_to=None,
+            provider=None,
+            upload_id=None,
+            include_excluded=False,
+            limit=100,
+            offset=0,
+            cursor=None,
+            count="exact",
+        )
+
+    return [
+        Check(
+            "tech-points-by-location",
+            "idx_daily_points_rollup_location",
+            lambda db: report_service.get_tech_points_by_location(db, org_id, location, month),
+        ),
+        Check(
+            "monthly-tech-points-by-location",
+            "idx_daily_points_rollup_location",
+            lambda db: report_service.get_monthly_tech_points_by_location(
+                db, org_id, location, month
+            ),
+        ),
+        Check(
+            "scheduled-points-by-provider",
+            "idx_daily_points_rollup_location",
+            lambda db: report_service.get_scheduled_points_by_provider(
+                db, org_id, location, month
+            ),
+        ),
+        Check(
+            "points-paid-tech-fte",
+            "uq_daily_points_rollup_key",
+            lambda db: report_service.get_points_paid_tech_fte(db, org_id, month, month),
+        ),
+        Check(
+            "weekly-points-by-location",
+            "uq_daily_points_rollup_key",
+            lambda db: report_service.get_weekly_points_by_location(db, org_id, month, 1),
+        ),
+        Check(
+            "report-batch",
+            "idx_daily_points_rollup_location",
+            lambda db: report_service.get_report_batch(
+                db, org_id, list(report_service.BATCH_REPORTS), [location], [month]
+            ),
+        ),
+        Check(
+            "dashboard-overview",
+            "uq_daily_points_rollup_key",
+            lambda db: dashboard_service.get_dashboard_overview(db, org_id),
+        ),
+        Check(
+            "dashboard-overview by location",
+            "idx_daily_points_rollup_location",
+            lambda db: dashboard_service.get_dashboard_overview(db, org_id, [location]),
+        ),
+        Check(
+            "dashboard-location-table",
+            "uq_daily_points_rollup_key",
+            lambda db: dashboard_service.get_location_table(db, org_id),
+        ),
+        Check(
+            "appointment list by location",
+            "idx_appointments_org_location_lower",
+            appointment_list,
+        ),
+        Check("rollup source aggregate", "idx_appointments_reportable", rollup_source),
+    ]
+
+
+def plan_scans(plan: dict) -> List[Scan]:
+    """Every scan node in an EXPLAIN (FORMAT JSON) plan tree."""
+    scans = []
+    if "Scan" in plan["Node Type"]:
+        scans.append(Scan(plan["Node Type"], plan.get("Relation Name"), plan.get("Index Name")))
+    for child in plan.get("Plans", []):
+        scans.extend(plan_scans(child))
+    return scans
+
+
+async def partition_parents(conn, scans: List[Scan]) -> Dict[str, str]:
+    """{partition or partition index name: partitioned table or index name} for scans."""
+    names = {scan.relation for scan in scans} | {scan.index for scan in scans}
+    result = await conn.execute(
+        text(
+            "SELECT child.relname, parent.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE child.relname = ANY(:names)"
+        ),
+        {"names": [name for name in names if name]},
+    )
+    return dict(result.all())
+
+
+async def explain_check(check: Check) -> dict:
+    """Run a check's queries, then EXPLAIN each statement that reads a checked table."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and any(
+            table in statement for table in CHECKED_TABLES
+        ):
+            statements.append((statement, parameters))
+
+    async with AsyncSessionLocal() as db:
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await check.run(db)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        conn = await db.connection()
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        statement_scans = []
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            statement_scans.append(plan_scans(plan[0]["Plan"]))
+        parents = await partition_parents(conn, [s for scans in statement_scans for s in scans])
+        await db.rollback()
+
+    problems = []
+    for number, scans in enumerate(statement_scans, 1):
+        partitions = {s.relation for s in scans if parents.get(s.relation) == "appointments"}
+        if len(partitions) > 1:
+            problems.append(f"statement {number} reads {len(partitions)} appointments partitions")
+
+    # Report partitions and their indexes as the partitioned table and index
+    scans = [
+        Scan(s.node_type, parents.get(s.relation, s.relation), parents.get(s.index, s.index))
+        for scans in statement_scans
+        for s in scans
+    ]
+    problems.extend(
+        f"sequential scan on {scan.relation}"
+        for scan in scans
+        if scan.node_type == "Seq Scan" and scan.relation in CHECKED_TABLES
+    )
+    if not any(scan.index == check.expected_index for scan in scans):
+        problems.append(f"{check.expected_index} not used")
+    return {
+        "check": check.name,
+        "expected_index": check.expected_index,
+        "statements": len(statements),
+        "scans": [scan._asdict() for scan in scans],
+        "ok": not problems,
+        "problems": problems,
+    }
+
+
+async def pick_sample(org_id: Optional[UUID]) -> tuple:
+    """(organization, busiest location, latest month) to run the reports for."""
+    async with AsyncSessionLocal() as db:
+        query = select(
+            DailyPointsRollup.organization_id,
+            DailyPointsRollup.location_name,
+            func.max(DailyPointsRollup.appointment_date),
+        )
+        if org_id:
+            query = query.where(DailyPointsRollup.organization_id == org_id)
+        row = (
+            await db.execute(
+                query.group_by(DailyPointsRollup.organization_id, DailyPointsRollup.location_name)
+                .order_by(func.sum(DailyPointsRollup.appointment_count).desc())
+                .limit(1)
+            )
+        ).first()
+    if row is None:
+        sys.exit("No reporting data found; upload some appointments first.")
+    return row[0], row[1], row[2].strftime("%Y-%m")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--org", type=UUID, help="Organization to run the reports for")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    # Every report has to reach the database
+    report_cache.enabled = False
+    org_id, location, month = await pick_sample(args.org)
+    results = [await explain_check(check) for check in build_checks(org_id, location, month)]
+    await engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"organization {org_id}, location {location!r}, month {month}")
+        for result in results:
+            scans = ", ".join(
+                f"{s['node_type']} {s['index'] or s['relation']}" for s in result["scans"]
+            )
+            status = "ok  " if result["ok"] else "FAIL"
+            print(f"{status} {result['check']}: {scans}")
+            for problem in result["problems"]:
+                print(f"       {problem}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,321 @@
+"""Generate synthetic retrospective and prospective upload files.
+
+Rows use the seed data's locations and appointment types (app.seed) with
+made-up providers, techs and specialties, spread over 60 weekdays from
+2026-01-05. A share of rows are exact copies of others (within-file
+duplicates) and a share carry dirty cells: blank providers, unparseable
+dates and times, padded or lower-cased locations, unknown visit types and
+non-numeric measurements. Output is reproducible for a given --seed.
+
+Usage, from backend/:
+
+    python -m benchmarks.generate_uploads --type retrospective --rows 60000 \\
+        --format csv --out /tmp/uploads [--duplicates 0.02] [--dirty 0.01] [--seed 1]
+
+Prints the file path and a JSON summary of what was injected.
+"""
+
+import argparse
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.seed import APPOINTMENT_TYPES, LOCATIONS
+
+SPECIALTIES = [
+    "Comprehensive - MD",
+    "Comprehensive - OD",
+    "Cornea",
+    "Glaucoma",
+    "Neuro-Ophthalmology",
+    "Oculoplastics",
+    "Pediatric Ophthalmology",
+    "Retina",
+]
+
+LAST_NAMES = [
+    "Anderson", "Baker", "Carter", "Davis", "Evans", "Foster", "Garcia", "Harris",
+    "Jackson", "Kim", "Lopez", "Martinez", "Nguyen", "Owens", "Patel", "Reed",
+    "Smith", "Thomas", "Walker", "Young",
+]
+FIRST_NAMES = [
+    "Abigail", "Ben", "Chloe", "Daniel", "Elena", "Frank", "Grace", "Hannah",
+    "Isaac", "Julia", "Kevin", "Lena", "Mia", "Naomi", "Omar", "Priya",
+]
+
+PROVIDERS = [f"{last}, {first}" for last in LAST_NAMES for first in FIRST_NAMES[:3]]
+TECHS = [f"{last}, {first}" for last in LAST_NAMES for first in FIRST_NAMES[3:6]]
+CHECK_IN_STAFF = ["Front Desk A", "Front Desk B", "Front Desk C", "Reception 1", "Reception 2"]
+TECH_LEVELS = ["OA", "COA", "COT", "COMT"]
+DIAGNOSES = [
+    "Hyperopia with astigmatism and presbyopia, bilateral",
+    "Primary open-angle glaucoma, bilateral",
+    "Age-related nuclear cataract, bilateral",
+    "Dry eye syndrome of bilateral lacrimal glands",
+    "Type 2 diabetes mellitus without retinopathy",
+    "Myopia, bilateral",
+]
+COMMENTS = ["", "", "", "routine exam", "f/u per provider", "pt running late", "sw pt/TR"]
+
+# Each kind of dirty cell gets an equal share of --dirty
+DIRTY_KINDS = [
+    "blank_provider",
+    "bad_date",
+    "bad_time",
+    "padded_location",
+    "unknown_visit_type",
+    "bad_number",
+]
+
+RETROSPECTIVE_COLUMNS = [
+    "Department", "Location", "Rooming Tech", "Provider", "Specialty",
+    "Patient Encounter Number", "Appt Date", "Day of Week", "Week of Month", "Appt Time",
+    "Session", "Check In", "Check In Time", "Check Out Time", "Visit Duration Min",
+    "Total Wait Duration", "Tech Level", "Rooming Time", "Tech In", "Tech Out",
+    "Tech Duration", "Visit Type", "Visit Points", "Appt Comments", "Primary Diagnosis",
+]
+PROSPECTIVE_COLUMNS = [
+    "Department/Organization", "Location", "Provider", "Specialty",
+    "Patient Encounter Number", "Appt Date", "Day of Week", "Week of Month", "Appt Time",
+    "Visit Type", "Appt Comments",
+]
+
+# "9:45" in CSV files, "09:45 AM" in workbooks, as in the sample files
+CSV_TIME_LABELS = np.array([f"{m // 60}:{m % 60:02d}" for m in range(24 * 60)], dtype=object)
+XLSX_TIME_LABELS = np.array(
+    [datetime(2000, 1, 1, m // 60, m % 60).strftime("%I:%M %p") for m in range(24 * 60)],
+    dtype=object,
+)
+
+
+def weekdays(start: date, count: int) -> List[date]:
+    days = []
+    current = start
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def _pick(rng: np.random.Generator, values: List, size: int) -> np.ndarray:
+    return np.array(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def generate_upload_frame(
+    upload_type: str,
+    rows: int,
+    file_format: str = "csv",
+    duplicate_rate: float = 0.02,
+    dirty_rate: float = 0.01,
+    seed: int = 1,
+    start: date = date(2026, 1, 5),
+    days: int = 60,
+) -> Tuple[pd.DataFrame, Dict]:
+    """A synthetic upload as a DataFrame of file cells, and a summary of its contents."""
+    rng = np.random.default_rng(seed)
+    duplicates = int(rows * duplicate_rate)
+    unique = rows - duplicates
+
+    dates = weekdays(start, days)
+    date_index = rng.integers(0, len(dates), unique)
+    # Appointments every 15 minutes from 7:00 to 16:45
+    minutes = 7 * 60 + 15 * rng.integers(0, 40, unique)
+    time_labels = CSV_TIME_LABELS if file_format == "csv" else XLSX_TIME_LABELS
+    locations = _pick(rng, LOCATIONS, unique)
+
+    cells: Dict[str, np.ndarray] = {
+        "Location": locations,
+        "Provider": _pick(rng, PROVIDERS, unique),
+        "Specialty": _pick(rng, SPECIALTIES, unique),
+        "Patient Encounter Number": np.array(
+            [f"BM{n:08d}" for n in range(1, unique + 1)], dtype=object
+        ),
+        "Appt Time": time_labels[minutes],
+        "Visit Type": _pick(rng, list(APPOINTMENT_TYPES), unique),
+        "Appt Comments": _pick(rng, COMMENTS, unique),
+    }
+    visit_points = {name: float(points) for name, points in APPOINTMENT_TYPES.items()}
+    if upload_type == "retrospective":
+        check_in = minutes - rng.integers(0, 20, unique)
+        rooming = check_in + rng.integers(5, 40, unique)
+        tech_out = rooming + rng.integers(10, 30, unique)
+        check_out = tech_out + rng.integers(10, 60, unique)
+        cells.update({
+            "Department": locations,
+            "Rooming Tech": _pick(rng, TECHS, unique),
+            "Session": np.where(minutes < 12 * 60, "AM", "PM").astype(object),
+            "Check In": _pick(rng, CHECK_IN_STAFF, unique),
+            "Check In Time": XLSX_TIME_LABELS[check_in],
+            "Check Out Time": XLSX_TIME_LABELS[check_out],
+            "Visit Duration Min": (check_out - check_in).astype(float),
+            "Total Wait Duration": (rooming - check_in).astype(float),
+            "Tech Level": _pick(rng, TECH_LEVELS, unique),
+            "Rooming Time": XLSX_TIME_LABELS[rooming],
+            "Tech In": XLSX_TIME_LABELS[rooming],
+            "Tech Out": XLSX_TIME_LABELS[tech_out],
+            "Tech Duration": (tech_out - rooming).astype(float),
+            "Visit Points": np.array(
+                [visit_points[name] for name in cells["Visit Type"]], dtype=object
+            ),
+            "Primary Diagnosis": _pick(rng, DIAGNOSES, unique),
+        })
+        columns = RETROSPECTIVE_COLUMNS
+    else:
+        cells["Department/Organization"] = np.full(unique, "Benchmark Health System", dtype=object)
+        columns = PROSPECTIVE_COLUMNS
+
+    # Duplicates are exact copies of other rows, placed on the same day
+    source = rng.integers(0, unique, duplicates)
+    order = np.argsort(np.concatenate([date_index, date_index[source]]), kind="stable")
+    all_rows = np.concatenate([np.arange(unique), source])[order]
+    date_index = date_index[all_rows]
+    frame = pd.DataFrame({name: values[all_rows] for name, values in cells.items()})
+
+    day_names = np.array([d.strftime("%A") for d in dates], dtype=object)
+    week_numbers = np.array([float((d.day - 1) // 7 + 1) for d in dates], dtype=object)
+    if file_format == "csv":
+        date_cells = np.array([d.strftime("%m/%d/%Y") for d in dates], dtype=object)
+    else:
+        date_cells = np.array([datetime(d.year, d.month, d.day) for d in dates], dtype=object)
+    frame["Appt Date"] = date_cells[date_index]
+    frame["Day of Week"] = day_names[date_index]
+    frame["Week of Month"] = week_numbers[date_index]
+
+    dirty = _inject_dirty_cells(frame, rng, int(rows * dirty_rate), upload_type)
+
+    summary = {
+        "upload_type": upload_type,
+        "format": file_format,
+        "rows": rows,
+        "duplicates": duplicates,
+        "dirty_cells": dirty,
+        "seed": seed,
+    }
+    return frame[columns], summary
+
+
+def _inject_dirty_cells(
+    frame: pd.DataFrame, rng: np.random.Generator, count: int, upload_type: str
+) -> Dict[str, int]:
+    """Overwrite cells of random rows with values the pipeline has to clean or reject."""
+    per_kind = count // len(DIRTY_KINDS)
+    rows = rng.choice(len(frame), size=min(per_kind * len(DIRTY_KINDS), len(frame)), replace=False)
+    injected = {}
+    for number, kind in enumerate(DIRTY_KINDS):
+        target = rows[number * per_kind:(number + 1) * per_kind]
+        if kind == "blank_provider":
+            column, values = "Provider", ""
+        elif kind == "bad_date":
+            column, values = "Appt Date", "TBD"
+        elif kind == "bad_time":
+            column, values = "Appt Time", "25:99"
+        elif kind == "padded_location":
+            column = "Location"
+            values = [f"  {name.lower()} " for name in frame.loc[target, column]]
+        elif kind == "unknown_visit_type":
+            column, values = "Visit Type", "Unlisted Visit"
+        else:
+            column = "Visit Duration Min" if upload_type == "retrospective" else "Week of Month"
+            values = "n/a"
+        # Object columns take text next to numbers and dates
+        frame[column] = frame[column].astype(object)
+        frame.loc[target, column] = values
+        injected[kind] = len(target)
+    return injected
+
+
+def write_upload_file(frame: pd.DataFrame, path: str) -> None:
+    """Write generated cells as .csv or, with openpyxl's write-only mode, .xlsx."""
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(frame.columns))
+    for row in frame.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def generate_upload_file(
+    directory: str,
+    upload_type: str,
+    rows: int,
+    file_format: str = "csv",
+    duplicate_rate: float = 0.02,
+    dirty_rate: float = 0.01,
+    seed: int = 1,
+) -> Tuple[str, Dict]:
+    """Generate a file under directory, reusing one made earlier with the same parameters.
+
+    Returns its path and summary; the summary is kept next to the file as JSON.
+    """
+    name = f"{upload_type}_{rows}_d{duplicate_rate}_x{dirty_rate}_s{seed}.{file_format}"
+    path = os.path.join(directory, name)
+    summary_path = path + ".json"
+    if os.path.exists(path) and os.path.exists(summary_path):
+        with open(summary_path) as f:
+            return path, json.load(f)
+
+    os.makedirs(directory, exist_ok=True)
+    frame, summary = generate_upload_frame(
+        upload_type, rows, file_format, duplicate_rate, dirty_rate, seed
+    )
+    write_upload_file(frame, path)
+    summary["file_bytes"] = os.path.getsize(path)
+    with open(summary_path, "w") as f:
+        json.dump(summary, f)
+    return path, summary
+
+
+def edited_upload_file(path: str, share: float, seed: int = 1) -> str:
+    """Copy of a generated file with a share of its rows edited, made once next to it.
+
+    The edit appends to Appt Comments, so the rows keep their duplicate key
+    but no longer match their originals; for re-upload benchmarks.
+    """
+    root, extension = os.path.splitext(path)
+    edited_path = f"{root}_e{share}{extension}"
+    if os.path.exists(edited_path):
+        return edited_path
+
+    if extension == ".csv":
+        frame = pd.read_csv(path, dtype=object, keep_default_na=False)
+    else:
+        frame = pd.read_excel(path, dtype=object, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    edited = rng.choice(len(frame), int(len(frame) * share), replace=False)
+    column = frame.columns.get_loc("Appt Comments")
+    frame.iloc[edited, column] = frame.iloc[edited, column].astype(str) + " (edited)"
+    write_upload_file(frame, edited_path)
+    return edited_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--type", choices=["retrospective", "prospective"], required=True)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--out", default="benchmark-data", help="Output directory")
+    parser.add_argument("--duplicates", type=float, default=0.02, help="Share of duplicate rows")
+    parser.add_argument("--dirty", type=float, default=0.01, help="Share of rows with a dirty cell")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    path, summary = generate_upload_file(
+        args.out, args.type, args.rows, args.format, args.duplicates, args.dirty, args.seed
+    )
+    print(path)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
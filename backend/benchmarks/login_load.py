@@ -0,0 +1,201 @@
+"""Measure login throughput and its effect on report latency.
+
+Runs the report and dashboard load of benchmarks.report_latency twice:
+alone, then while --logins concurrent clients log in over and over as a
+benchmark user of the first organization created by
+benchmarks.seed_tenants. Password hashing runs off the event loop, so the
+logins should leave report latency where it was. Reports the p50/p95/p99
+of the report requests in both runs, logins per second, login latency and
+how many logins were turned away with 429 because the hashing pool was
+saturated (those clients wait Retry-After before trying again).
+
+Usage, from backend/:
+
+    python -m benchmarks.login_load [--requests 100] [--concurrency 16]
+        [--logins 8] [--seed 1] [--output results.json] [--max-slowdown 0.5]
+
+Exits with status 1 if the reports' p95 grew by more than --max-slowdown
+while logins ran.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import List, Tuple
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.auth_service import hash_password, password_hasher
+from app.services.report_cache import report_cache
+from benchmarks.report_latency import (
+    PERCENTILES,
+    Tenant,
+    build_requests,
+    load_tenants,
+    percentile,
+    run_load,
+    send_request,
+)
+from benchmarks.upload_pipeline import git_commit
+
+LOGIN_PASSWORD = "benchmark-login"
+
+# Pause of a client turned away with 429 (the Retry-After of the response is 1s)
+RETRY_AFTER_SECONDS = 1.0
+
+
+async def login_user(tenant: Tenant) -> str:
+    """Email of the organization's login benchmark user, created on first use."""
+    async with AsyncSessionLocal() as db:
+        slug = await db.scalar(select(Organization.slug).where(Organization.id == tenant.org_id))
+        email = f"login@{slug}.invalid"
+        if await db.scalar(select(User.id).where(User.email == email)) is None:
+            db.add(User(
+                organization_id=tenant.org_id,
+                email=email,
+                password_hash=await hash_password(LOGIN_PASSWORD),
+                full_name="Login Benchmark",
+                role="clinic_manager",
+            ))
+            await db.commit()
+    return email
+
+
+async def log_in_until(stop: asyncio.Event, email: str, clients: int) -> List[Tuple[float, int]]:
+    """Log in from concurrent clients until stop is set; (seconds, status) per attempt."""
+    attempts = []
+
+    async def client():
+        while not stop.is_set():
+            started = perf_counter()
+            status, _ = await send_request(
+                "/api/v1/auth/login", {}, json_body={"email": email, "password": LOGIN_PASSWORD}
+            )
+            attempts.append((perf_counter() - started, status))
+            if status == 429:
+                await asyncio.sleep(RETRY_AFTER_SECONDS)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return attempts
+
+
+def latency(seconds: List[float]) -> dict:
+    seconds = sorted(seconds)
+    if not seconds:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": round(percentile(seconds, p), 4) for p in PERCENTILES}
+
+
+async def run_phase(requests, concurrency: int, email: str, logins: int) -> dict:
+    """Send the report requests, with logins running alongside if logins > 0."""
+    stop = asyncio.Event()
+    login_task = asyncio.create_task(log_in_until(stop, email, logins))
+    started = perf_counter()
+    samples = await run_load(requests, concurrency)
+    elapsed = perf_counter() - started
+    stop.set()
+    attempts = await login_task
+
+    seconds = [sample[0] for endpoint in samples.values() for sample in endpoint]
+    phase = {
+        "requests": len(seconds),
+        "errors": sum(1 for endpoint in samples.values() for s in endpoint if s[2] != 200),
+        "seconds": round(elapsed, 2),
+        **latency(seconds),
+    }
+    if logins:
+        succeeded = [s for s, status in attempts if status == 200]
+        phase["logins"] = {
+            "clients": logins,
+            "attempts": len(attempts),
+            "succeeded": len(succeeded),
+            "rejected": sum(1 for _, status in attempts if status == 429),
+            "per_second": round(len(succeeded) / elapsed, 1),
+            **latency(succeeded),
+        }
+    return phase
+
+
+def describe(name: str, phase: dict) -> str:
+    line = (
+        f"{name}: {phase['requests']} report requests, p50 {phase['p50']:.3f}s, "
+        f"p95 {phase['p95']:.3f}s, p99 {phase['p99']:.3f}s"
+    )
+    logins = phase.get("logins")
+    if logins:
+        line += (
+            f"; {logins['succeeded']} logins ({logins['per_second']}/s, "
+            f"p95 {logins['p95'] or 0:.3f}s), {logins['rejected']} rejected with 429"
+        )
+    return line
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100, help="Report requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent report clients")
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent login clients")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per endpoint")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--max-slowdown", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    report_cache.enabled = False
+    tenants = await load_tenants()
+    if not tenants:
+        sys.exit("No benchmark organizations found; run python -m benchmarks.seed_tenants first.")
+    email = await login_user(tenants[0])
+
+    rng = random.Random(args.seed)
+    await run_load(build_requests(rng, tenants, args.warmup), args.concurrency)
+    alone = await run_phase(
+        build_requests(rng, tenants, args.requests), args.concurrency, email, 0
+    )
+    print(describe("alone", alone))
+    with_logins = await run_phase(
+        build_requests(rng, tenants, args.requests), args.concurrency, email, args.logins
+    )
+    print(describe("with logins", with_logins))
+    password_hasher.shutdown()
+    await engine.dispose()
+
+    slowdown = with_logins["p95"] / alone["p95"] - 1
+    print(f"report p95 {slowdown:+.0%} while logging in")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "benchmark": "login_load",
+                    "commit": git_commit(),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                    "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+                    "password_hash_queue_limit": settings.PASSWORD_HASH_QUEUE_LIMIT,
+                    "concurrency": args.concurrency,
+                    "alone": alone,
+                    "with_logins": with_logins,
+                    "slowdown_p95": round(slowdown, 3),
+                },
+                f,
+                indent=2,
+            )
+    return 0 if slowdown <= args.max_slowdown else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,438 @@
+"""Measure report and dashboard latency under concurrent load.
+
+Sends requests for the five reports and the dashboard endpoints to the API
+application in this process, through its ASGI interface (routing,
+authentication, database work and serialization, without HTTP), from
+--concurrency concurrent clients. Requests go to the organizations created
+by benchmarks.seed_tenants; each picks an organization, a location and a
+month with data at random. The report cache is disabled unless --cache is
+given, so by default every request does its database work.
+
+Reports per endpoint the p50/p95/p99 latency, the mean number of SQL
+statements per request, the rows scanned and buffers touched by one
+request (EXPLAIN ANALYZE of its statements, after the load) and whether
+p95 meets the PRD target: 1s for reports, 2s for the dashboard.
+
+Usage, from backend/:
+
+    python -m benchmarks.report_latency [--requests 200] [--concurrency 16]
+        [--cache] [--seed 1] [--output results.json] [--compare baseline.json]
+        [--max-regression 0.2]
+
+--output saves the results as JSON together with the git commit. --compare
+prints each endpoint's change against an earlier --output file and exits
+with status 1 if an endpoint's p95 grew by more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+from uuid import UUID
+
+from sqlalchemy import event, func, select, text
+
+from app.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models.daily_points_rollup import DailyPointsRollup
+from app.models.location import Location
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.auth_service import create_access_token
+from app.services.report_cache import report_cache
+from benchmarks.seed_tenants import TENANT_SLUG_PREFIX
+from benchmarks.upload_pipeline import git_commit
+
+# PRD performance requirements, seconds
+REPORT_TARGET = 1.0
+DASHBOARD_TARGET = 2.0
+
+PERCENTILES = [50, 95, 99]
+
+# Statements of the request running in the current task, when recording
+_statements: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "benchmark_statements", default=None
+)
+
+
+class Tenant(NamedTuple):
+    org_id: UUID
+    token: str
+    locations: List[str]
+    months: Dict[str, List[str]]  # YYYY-MM with data, by data type
+
+
+class Endpoint(NamedTuple):
+    name: str
+    path: str
+    target_seconds: float
+    params: Callable[[random.Random, Tenant], dict]
+
+
+def _months(rng: random.Random, tenant: Tenant, data_type: str, count: int = 1) -> List[str]:
+    return rng.sample(tenant.months[data_type], count)
+
+
+ENDPOINTS = [
+    Endpoint(
+        "tech-points-by-location",
+        "/api/v1/reports/tech-points-by-location",
+        REPORT_TARGET,
+        lambda rng, t: {
+            "location_name": rng.choice(t.locations),
+            "month": _months(rng, t, "retrospective")[0],
+            "period": rng.choice(["one_week", "four_weeks"]),
+        },
+    ),
+    Endpoint(
+        "monthly-tech-points-by-location",
+        "/api/v1/reports/monthly-tech-points-by-location",
+        REPORT_TARGET,
+        lambda rng, t: {
+            "location_name": rng.choice(t.locations),
+            "month": _months(rng, t, "retrospective")[0],
+        },
+    ),
+    Endpoint(
+        "scheduled-points-by-provider",
+        "/api/v1/reports/scheduled-points-by-provider",
+        REPORT_TARGET,
+        lambda rng, t: {
+            "location_name": rng.choice(t.locations),
+            "month": _months(rng, t, "prospective")[0],
+        },
+    ),
+    Endpoint(
+        "points-paid-tech-fte",
+        "/api/v1/reports/points-paid-tech-fte",
+        REPORT_TARGET,
+        lambda rng, t: dict(zip(("month1", "month2"), _months(rng, t, "retrospective", 2))),
+    ),
+    Endpoint(
+        "weekly-points-by-location",
+        "/api/v1/reports/weekly-points-by-location",
+        REPORT_TARGET,
+        lambda rng, t: {
+            "month": _months(rng, t, "prospective")[0],
+            "week": rng.randint(1, 4),
+        },
+    ),
+    Endpoint(
+        "dashboard-overview", "/api/v1/dashboard/overview", DASHBOARD_TARGET, lambda rng, t: {}
+    ),
+    Endpoint(
+        "dashboard-location-table",
+        "/api/v1/dashboard/location-table",
+        DASHBOARD_TARGET,
+        lambda rng, t: {},
+    ),
+    Endpoint(
+        "dashboard-summary", "/api/v1/dashboard/summary", DASHBOARD_TARGET, lambda rng, t: {}
+    ),
+]
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append((statement, parameters))
+
+
+async def load_tenants() -> List[Tenant]:
+    """The benchmark organizations, with a token for their admin and where they have data."""
+    async with AsyncSessionLocal() as db:
+        users = (
+            await db.execute(
+                select(User.organization_id, User.id, User.role)
+                .join(Organization, Organization.id == User.organization_id)
+                .where(Organization.slug.startswith(TENANT_SLUG_PREFIX))
+            )
+        ).all()
+        locations = defaultdict(list)
+        for org_id, name in await db.execute(
+            select(Location.organization_id, Location.name).where(
+                Location.organization_id.in_([user.organization_id for user in users])
+            )
+        ):
+            locations[org_id].append(name)
+        month = func.to_char(DailyPointsRollup.appointment_date, "YYYY-MM")
+        months = defaultdict(lambda: defaultdict(list))
+        for org_id, data_type, value in await db.execute(
+            select(DailyPointsRollup.organization_id, DailyPointsRollup.data_type, month)
+            .where(DailyPointsRollup.organization_id.in_([user.organization_id for user in users]))
+            .group_by(DailyPointsRollup.organization_id, DailyPointsRollup.data_type, month)
+        ):
+            months[org_id][data_type].append(value)
+
+    return [
+        Tenant(
+            org_id,
+            create_access_token(user_id, org_id, role),
+            sorted(locations[org_id]),
+            {data_type: sorted(values) for data_type, values in months[org_id].items()},
+        )
+        for org_id, user_id, role in users
+        if locations[org_id] and len(months[org_id]) == 2
+    ]
+
+
+async def send_request(
+    path: str, params: dict, token: Optional[str] = None, json_body: Optional[dict] = None
+) -> Tuple[int, int]:
+    """GET path from the application, or POST json_body to it.
+
+    Returns the status code and body size.
+    """
+    headers = [(b"host", b"benchmark")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    body = b""
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        headers += [(b"content-type", b"application/json"), (b"content-length", b"%d" % len(body))]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET" if json_body is None else "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    response = {"status": 0, "size": 0}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client stays connected until the response is complete
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["size"] += len(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Raised after the 500 response was sent, as the server would log it
+        response["status"] = response["status"] or 500
+    return response["status"], response["size"]
+
+
+def build_requests(
+    rng: random.Random, tenants: List[Tenant], count: int
+) -> List[Tuple[Endpoint, Tenant, dict]]:
+    """count requests per endpoint with random parameters, in random order."""
+    requests = []
+    for endpoint in ENDPOINTS:
+        for _ in range(count):
+            tenant = rng.choice(tenants)
+            requests.append((endpoint, tenant, endpoint.params(rng, tenant)))
+    rng.shuffle(requests)
+    return requests
+
+
+async def run_load(
+    requests: List[Tuple[Endpoint, Tenant, dict]], concurrency: int
+) -> Dict[str, List[Tuple[float, int, int]]]:
+    """Send requests from concurrent clients; (seconds, statements, status) per endpoint."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    results = defaultdict(list)
+
+    async def client():
+        while not queue.empty():
+            endpoint, tenant, params = queue.get_nowait()
+            statements = []
+            _statements.set(statements)
+            started = perf_counter()
+            status, _ = await send_request(endpoint.path, params, tenant.token)
+            results[endpoint.name].append((perf_counter() - started, len(statements), status))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results
+
+
+def rows_scanned(plan: dict) -> int:
+    """Rows read by the scan nodes of an EXPLAIN ANALYZE plan tree, including filtered ones."""
+    rows = 0
+    if "Scan" in plan["Node Type"]:
+        rows += (
+            plan.get("Actual Rows", 0)
+            + plan.get("Rows Removed by Filter", 0)
+            + plan.get("Rows Removed by Index Recheck", 0)
+        ) * plan.get("Actual Loops", 1)
+    for child in plan.get("Plans", []):
+        rows += rows_scanned(child)
+    return rows
+
+
+async def explain_request(endpoint: Endpoint, tenant: Tenant, params: dict) -> dict:
+    """Rows scanned and shared buffers touched by the SELECTs of one request."""
+    statements = []
+    _statements.set(statements)
+    await send_request(endpoint.path, params, tenant.token)
+    _statements.set(None)
+
+    rows = buffers = 0
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plan = plan[0]["Plan"]
+            rows += rows_scanned(plan)
+            buffers += plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+        await conn.rollback()
+    return {"rows_scanned": rows, "buffers": buffers}
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(endpoint: Endpoint, samples: List[Tuple[float, int, int]], plan: dict) -> dict:
+    seconds = sorted(sample[0] for sample in samples)
+    p95 = percentile(seconds, 95)
+    return {
+        "endpoint": endpoint.name,
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[2] != 200),
+        **{f"p{p}": round(percentile(seconds, p), 4) for p in PERCENTILES},
+        "mean": round(statistics.fmean(seconds), 4),
+        "max": round(seconds[-1], 4),
+        "queries": round(statistics.fmean(sample[1] for sample in samples), 2),
+        **plan,
+        "target_seconds": endpoint.target_seconds,
+        "within_target": p95 <= endpoint.target_seconds,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print each endpoint's change against the baseline; False if any p95 regressed too far."""
+    previous = {row["endpoint"]: row for row in baseline["endpoints"]}
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}:")
+    ok = True
+    for row in results["endpoints"]:
+        before = previous.get(row["endpoint"])
+        if before is None:
+            print(f"  {row['endpoint']}: not in baseline")
+            continue
+        changes = []
+        for key in [f"p{p}" for p in PERCENTILES] + ["queries", "rows_scanned"]:
+            old, new = before.get(key), row[key]
+            if old:
+                changes.append(f"{key} {(new - old) / old:+.0%}")
+        regressed = row["p95"] > before["p95"] * (1 + max_regression)
+        ok &= not regressed
+        print(f"  {'REGRESSED ' if regressed else ''}{row['endpoint']}: {', '.join(changes)}")
+    return ok
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per endpoint")
+    parser.add_argument("--cache", action="store_true", help="Leave the report cache enabled")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    report_cache.enabled = args.cache
+    tenants = await load_tenants()
+    if not tenants:
+        sys.exit("No benchmark organizations found; run python -m benchmarks.seed_tenants first.")
+    async with AsyncSessionLocal() as db:
+        server_version = await db.scalar(text("SHOW server_version"))
+        appointments = await db.scalar(
+            select(func.sum(DailyPointsRollup.appointment_count)).where(
+                DailyPointsRollup.organization_id.in_([tenant.org_id for tenant in tenants])
+            )
+        )
+
+    rng = random.Random(args.seed)
+    event.listen(engine.sync_engine, "before_cursor_execute", _record_statement)
+    await run_load(build_requests(rng, tenants, args.warmup), args.concurrency)
+    started = perf_counter()
+    samples = await run_load(build_requests(rng, tenants, args.requests), args.concurrency)
+    elapsed = perf_counter() - started
+
+    # One request per endpoint, explained on its own after the load
+    report_cache.enabled = False
+    rows = []
+    for endpoint in ENDPOINTS:
+        tenant = rng.choice(tenants)
+        plan = await explain_request(endpoint, tenant, endpoint.params(rng, tenant))
+        row = summarize(endpoint, samples[endpoint.name], plan)
+        rows.append(row)
+        status = "ERR " if row["errors"] else ("ok  " if row["within_target"] else "SLOW")
+        print(
+            f"{status} {row['endpoint']}: p50 {row['p50']:.3f}s, p95 {row['p95']:.3f}s, "
+            f"p99 {row['p99']:.3f}s; {row['queries']:g} queries, "
+            f"{row['rows_scanned']} rows scanned, {row['buffers']} buffers"
+        )
+    event.remove(engine.sync_engine, "before_cursor_execute", _record_statement)
+    await engine.dispose()
+
+    total_requests = args.requests * len(ENDPOINTS)
+    print(f"{total_requests} requests in {elapsed:.1f}s ({total_requests / elapsed:.0f}/s)")
+
+    results = {
+        "benchmark": "report_latency",
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "postgresql": server_version,
+        "organizations": len(tenants),
+        "appointments": int(appointments or 0),
+        "concurrency": args.concurrency,
+        "cache": args.cache,
+        "requests_per_second": round(total_requests / elapsed, 1),
+        "endpoints": rows,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    ok = True
+    if args.compare:
+        with open(args.compare) as f:
+            ok = compare(results, json.load(f), args.max_regression)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
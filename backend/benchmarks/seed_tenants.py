@@ -0,0 +1,299 @@
+"""Seed benchmark organizations with years of appointments, loaded with COPY.
+
+Creates --orgs organizations (slugs benchmark-tenant-001, ...), each with
+--locations locations, the seed appointment types, an admin user that
+cannot log in, and one completed upload per data type. Retrospective
+appointments cover every weekday of the last --years years up to
+yesterday, --per-day per location on average (locations differ in size);
+prospective appointments cover the current month, the three before it
+and the two after it. Rows go straight into each organization's appointments partition
+with COPY, then the rollup is built from them as an upload's would be and
+the tables are vacuumed and analyzed. Output is reproducible for a given
+--seed and day.
+
+Organizations that already exist are left as they are; --reset drops all
+benchmark organizations first.
+
+Usage, from backend/:
+
+    python -m benchmarks.seed_tenants [--orgs 10] [--locations 12] [--years 3]
+        [--per-day 40] [--seed 1] [--reset]
+
+Then run python -m benchmarks.report_latency.
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+from datetime import date, datetime, timezone
+from time import perf_counter
+from typing import List, Tuple
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, select, text
+
+from app.database import AsyncSessionLocal, engine
+from app.models.appointment_type import AppointmentType
+from app.models.location import Location
+from app.models.organization import Organization
+from app.models.upload import Upload
+from app.models.user import User
+from app.seed import APPOINTMENT_TYPES, LOCATIONS
+from app.services.partitions import appointment_partition_name, ensure_appointment_partition
+from app.services.rollup_service import add_upload_to_rollup
+from app.services.upload_service import dedup_key_column
+from benchmarks.generate_uploads import CHECK_IN_STAFF, PROVIDERS, SPECIALTIES, TECHS
+
+TENANT_SLUG_PREFIX = "benchmark-tenant-"
+
+PROVIDERS_PER_LOCATION = 6
+TECHS_PER_LOCATION = 8
+
+# Appointment slots: every 15 minutes from 7:30 to 16:45
+SLOT_MINUTES = np.arange(7 * 60 + 30, 17 * 60, 15)
+
+COPY_COLUMNS = [
+    "id", "organization_id", "upload_id", "data_type", "location_id", "location_name",
+    "provider", "specialty", "appointment_date", "day_of_week", "week_of_month",
+    "appointment_time", "session", "visit_type", "visit_points", "appointment_type_id",
+    "rooming_tech", "check_in_staff", "is_duplicate", "is_excluded_from_reporting",
+    "dedup_key", "source", "is_draft", "created_at", "updated_at",
+]
+
+
+def tenant_slug(number: int) -> str:
+    return f"{TENANT_SLUG_PREFIX}{number:03d}"
+
+
+def location_names(count: int) -> List[str]:
+    """The seed locations, numbered once they run out."""
+    names = []
+    for i in range(count):
+        rounds, index = divmod(i, len(LOCATIONS))
+        names.append(LOCATIONS[index] + (f" {rounds + 1}" if rounds else ""))
+    return names
+
+
+def seeded_dates(years: int, today: date) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """(retrospective, prospective) weekdays."""
+    first_month = (pd.Timestamp(today) - pd.DateOffset(months=3)).replace(day=1)
+    last_month_end = (pd.Timestamp(today) + pd.DateOffset(months=2)) + pd.offsets.MonthEnd(0)
+    retrospective = pd.bdate_range(
+        pd.Timestamp(today) - pd.DateOffset(years=years),
+        pd.Timestamp(today) - pd.Timedelta(days=1),
+    )
+    return retrospective, pd.bdate_range(first_month, last_month_end)
+
+
+def appointment_frame(
+    rng: np.random.Generator,
+    data_type: str,
+    days: pd.DatetimeIndex,
+    per_day: int,
+    location: Location,
+    providers: np.ndarray,
+    techs: np.ndarray,
+    type_names: np.ndarray,
+    type_points: np.ndarray,
+    type_ids: np.ndarray,
+) -> pd.DataFrame:
+    """One location's appointments over days, as normalized appointments columns."""
+    counts = rng.poisson(per_day, len(days))
+    dates = days.repeat(counts)
+    rows = len(dates)
+    minutes = rng.choice(SLOT_MINUTES, rows)
+    provider_index = rng.integers(0, len(providers), rows)
+    type_index = rng.integers(0, len(type_names), rows)
+
+    frame = pd.DataFrame({
+        "location_id": str(location.id),
+        "location_name": location.name,
+        "provider": providers[provider_index],
+        # One specialty per provider
+        "specialty": np.array(SPECIALTIES, dtype=object)[provider_index % len(SPECIALTIES)],
+        "appointment_date": dates.date,
+        "day_of_week": dates.day_name(),
+        "week_of_month": (dates.day - 1) // 7 + 1,
+        "appointment_time": pd.to_datetime(minutes, unit="m").time,
+        "session": np.where(minutes < 12 * 60, "AM", "PM"),
+        "visit_type": type_names[type_index],
+        "visit_points": type_points[type_index],
+        "appointment_type_id": type_ids[type_index],
+        "rooming_tech": None,
+        "check_in_staff": None,
+    })
+    if data_type == "retrospective":
+        frame["rooming_tech"] = techs[rng.integers(0, len(techs), rows)]
+        staff = np.array(CHECK_IN_STAFF, dtype=object)
+        frame["check_in_staff"] = staff[rng.integers(0, len(staff), rows)]
+    frame["dedup_key"] = dedup_key_column(frame, data_type)
+    return frame
+
+
+async def copy_frame(db, table: str, frame: pd.DataFrame) -> None:
+    """COPY a frame with COPY_COLUMNS into a table, as CSV."""
+    buffer = io.BytesIO()
+    frame[COPY_COLUMNS].to_csv(buffer, header=False, index=False, date_format="%Y-%m-%d")
+    buffer.seek(0)
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_to_table(
+        table, source=buffer, columns=COPY_COLUMNS, format="csv"
+    )
+
+
+async def seed_tenant(number: int, args, days: dict) -> int:
+    """Create one benchmark organization and its appointments; returns the row count."""
+    rng = np.random.default_rng([args.seed, number])
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        org = Organization(name=f"Benchmark Tenant {number}", slug=tenant_slug(number))
+        db.add(org)
+        await db.flush()
+        await ensure_appointment_partition(db, org.id)
+
+        user = User(
+            organization_id=org.id,
+            email=f"admin@{tenant_slug(number)}.invalid",
+            password_hash="!",  # cannot log in; report_latency mints tokens
+            full_name="Benchmark Admin",
+            role="clinic_admin",
+        )
+        locations = [
+            Location(
+                organization_id=org.id,
+                name=name,
+                manager_name=f"Manager {i % 4 + 1}",
+                num_employees=int(rng.integers(5, 40)),
+            )
+            for i, name in enumerate(location_names(args.locations))
+        ]
+        types = [
+            AppointmentType(organization_id=org.id, name=name, point_value=points)
+            for name, points in APPOINTMENT_TYPES.items()
+        ]
+        db.add(user)
+        db.add_all(locations + types)
+        await db.flush()
+
+        type_names = np.array([t.name for t in types], dtype=object)
+        type_points = np.array([t.point_value for t in types], dtype=object)
+        type_ids = np.array([str(t.id) for t in types], dtype=object)
+        table = appointment_partition_name(org.id)
+
+        rows = 0
+        for data_type, data_days in days.items():
+            upload = Upload(
+                organization_id=org.id,
+                uploaded_by=user.id,
+                upload_type=data_type,
+                filename=f"benchmark-{data_type}.csv",
+                status="completed",
+                progress_percent=100,
+            )
+            db.add(upload)
+            await db.flush()
+
+            upload_rows = 0
+            for location in locations:
+                # Locations range from a third to twice the average size
+                per_day = max(1, round(args.per_day * rng.uniform(0.3, 2.0)))
+                picks = rng.choice(len(PROVIDERS), PROVIDERS_PER_LOCATION, replace=False)
+                providers = np.array(PROVIDERS, dtype=object)[picks]
+                picks = rng.choice(len(TECHS), TECHS_PER_LOCATION, replace=False)
+                techs = np.array(TECHS, dtype=object)[picks]
+                frame = appointment_frame(
+                    rng, data_type, data_days, per_day, location, providers, techs,
+                    type_names, type_points, type_ids,
+                )
+                frame["id"] = [str(uuid4()) for _ in range(len(frame))]
+                frame["organization_id"] = str(org.id)
+                frame["upload_id"] = str(upload.id)
+                frame["data_type"] = data_type
+                frame["is_duplicate"] = False
+                frame["is_excluded_from_reporting"] = False
+                frame["source"] = "csv"
+                frame["is_draft"] = False
+                frame["created_at"] = now.isoformat()
+                frame["updated_at"] = now.isoformat()
+                await copy_frame(db, table, frame)
+                upload_rows += len(frame)
+
+            upload.row_count = upload.valid_row_count = upload_rows
+            await add_upload_to_rollup(db, org.id, upload.id)
+            rows += upload_rows
+        await db.commit()
+    return rows
+
+
+async def reset_tenants() -> None:
+    """Drop every benchmark organization and its appointments partition."""
+    async with AsyncSessionLocal() as db:
+        org_ids = (
+            await db.scalars(
+                select(Organization.id).where(Organization.slug.startswith(TENANT_SLUG_PREFIX))
+            )
+        ).all()
+        for org_id in org_ids:
+            await db.execute(text(f"DROP TABLE IF EXISTS {appointment_partition_name(org_id)}"))
+        await db.execute(delete(Organization).where(Organization.id.in_(org_ids)))
+        await db.commit()
+    print(f"dropped {len(org_ids)} benchmark organizations")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orgs", type=int, default=10)
+    parser.add_argument("--locations", type=int, default=12, help="Locations per organization")
+    parser.add_argument("--years", type=int, default=3, help="Years of retrospective data")
+    parser.add_argument(
+        "--per-day", type=int, default=40, help="Average appointments per location and weekday"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="Drop benchmark organizations first")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    if args.reset:
+        await reset_tenants()
+
+    retrospective, prospective = seeded_dates(args.years, date.today())
+    days = {"retrospective": retrospective, "prospective": prospective}
+    async with AsyncSessionLocal() as db:
+        existing = set(
+            (
+                await db.scalars(
+                    select(Organization.slug).where(
+                        Organization.slug.startswith(TENANT_SLUG_PREFIX)
+                    )
+                )
+            ).all()
+        )
+
+    total = 0
+    for number in range(1, args.orgs + 1):
+        if tenant_slug(number) in existing:
+            print(f"{tenant_slug(number)}: exists")
+            continue
+        started = perf_counter()
+        rows = await seed_tenant(number, args, days)
+        total += rows
+        print(f"{tenant_slug(number)}: {rows} appointments in {perf_counter() - started:.1f}s")
+
+    # Fresh statistics and visibility maps, for index-only scans of the new rows
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("appointments", "daily_points_rollup"):
+            await conn.execute(text(f"VACUUM ANALYZE {table}"))
+    await engine.dispose()
+    print(f"{total} appointments seeded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,200 @@
+"""Measure the per-row cost of building and encoding large JSON responses.
+
+Times two responses the way the API built them before FastJSONResponse and
+the way it builds them now, on an organization created by
+benchmarks.seed_tenants:
+
+- appointments: a --limit row page of GET /appointments, from the query to
+  the response body. Before: ORM instances, AppointmentResponse.model_validate
+  and FastAPI's validation and encoding of the response model. Now: Core
+  rows written by orjson.
+- report: the monthly tech points report of a location, built once; only
+  its encoding is timed, per TechDailyPoints entry. Before: FastAPI's
+  validation and encoding. Now: model_dump written by orjson.
+
+Reports the mean time per request and per row of each way, and the speedup.
+
+Usage, from backend/:
+
+    python -m benchmarks.serialization [--limit 1000] [--repeat 20]
+        [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.api.appointments import (
+    APPOINTMENT_LIST_COLUMNS,
+    APPOINTMENT_LIST_ORDER,
+    appointment_list_response,
+)
+from app.api.responses import model_response
+from app.database import AsyncSessionLocal, engine
+from app.models.appointment import Appointment
+from app.schemas.appointment import AppointmentListResponse, AppointmentResponse
+from app.schemas.report import MonthlyTechPointsResponse
+from app.services.pagination import fetch_page
+from app.services.report_cache import report_cache
+from app.services.report_service import get_monthly_tech_points_by_location
+from benchmarks.report_latency import load_tenants
+from benchmarks.upload_pipeline import git_commit
+
+
+async def fastapi_body(response_model: type, content: Any) -> bytes:
+    """The body FastAPI sends for content returned by a route with this response_model."""
+    field = create_model_field("Response", response_model, mode="serialization")
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+def listed_appointments(org_id: UUID, *columns):
+    return select(*columns).where(
+        Appointment.organization_id == org_id,
+        Appointment.is_draft == False,  # noqa: E712
+    )
+
+
+async def appointments_before(org_id: UUID, limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        appointments, next_cursor = await fetch_page(
+            db, listed_appointments(org_id, Appointment), APPOINTMENT_LIST_ORDER, None, limit
+        )
+    content = AppointmentListResponse(
+        appointments=[AppointmentResponse.model_validate(a) for a in appointments],
+        next_cursor=next_cursor,
+    )
+    return await fastapi_body(AppointmentListResponse, content)
+
+
+async def appointments_now(org_id: UUID, limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            listed_appointments(org_id, *APPOINTMENT_LIST_COLUMNS),
+            APPOINTMENT_LIST_ORDER,
+            None,
+            limit,
+            entities=False,
+        )
+    return appointment_list_response(rows, None, False, next_cursor).body
+
+
+async def report_before(report: BaseModel) -> bytes:
+    return await fastapi_body(type(report), report)
+
+
+async def report_now(report: BaseModel) -> bytes:
+    return model_response(report).body
+
+
+async def time_path(build: Callable[[], Awaitable[bytes]], repeat: int) -> Dict[str, float]:
+    """Mean seconds and body size of build, after one untimed run."""
+    body = await build()
+    seconds = []
+    for _ in range(repeat):
+        started = perf_counter()
+        await build()
+        seconds.append(perf_counter() - started)
+    return {"seconds": statistics.fmean(seconds), "bytes": len(body)}
+
+
+async def compare_paths(
+    name: str,
+    rows: int,
+    before: Callable[[], Awaitable[bytes]],
+    now: Callable[[], Awaitable[bytes]],
+    repeat: int,
+) -> dict:
+    timings = {"before": await time_path(before, repeat), "now": await time_path(now, repeat)}
+    result = {"response": name, "rows": rows}
+    for path, timing in timings.items():
+        result[path] = {
+            "ms_per_request": round(timing["seconds"] * 1000, 3),
+            "us_per_row": round(timing["seconds"] / rows * 1e6, 2),
+            "bytes": timing["bytes"],
+        }
+    result["speedup"] = round(timings["before"]["seconds"] / timings["now"]["seconds"], 2)
+    print(
+        f"{name} ({rows} rows): {result['before']['us_per_row']:.1f}us/row before, "
+        f"{result['now']['us_per_row']:.1f}us/row now, {result['speedup']:.1f}x"
+    )
+    return result
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000, help="Appointments per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per path")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    report_cache.enabled = False
+    tenants = await load_tenants()
+    if not tenants:
+        sys.exit("No benchmark organizations found; run python -m benchmarks.seed_tenants first.")
+    tenant = tenants[0]
+
+    page = json.loads(await appointments_now(tenant.org_id, args.limit))["appointments"]
+    async with AsyncSessionLocal() as db:
+        # The location and month with the most tech points entries
+        report: MonthlyTechPointsResponse = max(
+            [
+                await get_monthly_tech_points_by_location(db, tenant.org_id, location, month)
+                for location in tenant.locations
+                for month in tenant.months["retrospective"][-3:]
+            ],
+            key=lambda r: sum(len(tech.daily_points) for tech in r.techs),
+        )
+    entries = sum(len(tech.daily_points) for tech in report.techs)
+
+    responses = [
+        await compare_paths(
+            "appointments",
+            len(page),
+            lambda: appointments_before(tenant.org_id, args.limit),
+            lambda: appointments_now(tenant.org_id, args.limit),
+            args.repeat,
+        ),
+        await compare_paths(
+            "monthly-tech-points-by-location",
+            entries,
+            lambda: report_before(report),
+            lambda: report_now(report),
+            args.repeat,
+        ),
+    ]
+    await engine.dispose()
+
+    if args.output:
+        results = {
+            "benchmark": "serialization",
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "responses": responses,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
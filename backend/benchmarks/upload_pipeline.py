@@ -0,0 +1,291 @@
+"""Time the upload pipeline stage by stage on synthetic files.
+
+Files come from benchmarks.generate_uploads (cached under --data-dir) and
+are ingested with process_upload into a dedicated benchmark organization
+of a migrated PostgreSQL database (DATABASE_URL), then committed, as the
+upload endpoint does. The organization's appointments are truncated
+before every run so runs start from the same state. With --replace, each
+run first ingests a different file of the same size untimed, so the timed
+upload supersedes an active dataset as a monthly re-upload does; with
+--changed as well, that file is the timed one with only this share of
+rows edited, as in a daily refresh, and only those rows are rewritten.
+
+Reports seconds per stage (read, normalize, supersede, resolve, dedup,
+insert, rollup, commit) and in total, the median over --repeat runs, rows
+per second, and whether the case meets the PRD target for its size (15K
+rows in 10s, 60K rows in 30s). Also reports the event loop's p99 and
+maximum lag during the upload: what any other request served by the
+worker would have waited.
+
+Usage, from backend/:
+
+    python -m benchmarks.upload_pipeline [--rows 15000 60000]
+        [--type retrospective prospective] [--format csv xlsx] [--repeat 3]
+        [--replace [--changed 0.05]] [--output results.json] [--compare baseline.json]
+        [--max-regression 0.2]
+
+--output saves the results as JSON together with the git commit. --compare
+prints each case's change against an earlier --output file and exits with
+status 1 if a case's median total grew by more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, select, text
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.appointment_type import AppointmentType
+from app.models.daily_points_rollup import DailyPointsRollup
+from app.models.location import Location
+from app.models.organization import Organization
+from app.models.upload import Upload
+from app.models.user import User
+from app.seed import APPOINTMENT_TYPES, LOCATIONS
+from app.services.partitions import appointment_partition_name, ensure_appointment_partition
+from app.services.loop_monitor import EventLoopLagMonitor
+from app.services.upload_jobs import process_upload, upload_jobs
+from app.services.upload_service import StageTimer, compute_file_hash
+from benchmarks.generate_uploads import edited_upload_file, generate_upload_file
+
+BENCHMARK_ORG_SLUG = "benchmark-uploads"
+BENCHMARK_USER_EMAIL = "benchmark@uploads.invalid"
+
+STAGES = ["read", "normalize", "supersede", "resolve", "dedup", "insert", "rollup", "commit"]
+
+# PRD performance requirements: (max rows, seconds)
+TARGETS = [(15000, 10.0), (60000, 30.0)]
+
+
+def target_seconds(rows: int) -> Optional[float]:
+    """PRD time limit for an upload of this size, if it has one."""
+    for max_rows, seconds in TARGETS:
+        if rows <= max_rows:
+            return seconds
+    return None
+
+
+async def benchmark_organization() -> Tuple[UUID, UUID]:
+    """(organization id, user id) of the benchmark organization, created on first use."""
+    async with AsyncSessionLocal() as db:
+        org = await db.scalar(select(Organization).where(Organization.slug == BENCHMARK_ORG_SLUG))
+        if org is None:
+            org = Organization(name="Upload Benchmark", slug=BENCHMARK_ORG_SLUG)
+            db.add(org)
+            await db.flush()
+            db.add_all([Location(organization_id=org.id, name=name) for name in LOCATIONS])
+            db.add_all([
+                AppointmentType(organization_id=org.id, name=name, point_value=points)
+                for name, points in APPOINTMENT_TYPES.items()
+            ])
+            db.add(User(
+                organization_id=org.id,
+                email=BENCHMARK_USER_EMAIL,
+                password_hash="!",  # cannot log in
+                full_name="Upload Benchmark",
+                role="clinic_admin",
+            ))
+        await ensure_appointment_partition(db, org.id)
+        await db.commit()
+        user_id = await db.scalar(select(User.id).where(User.email == BENCHMARK_USER_EMAIL))
+        return org.id, user_id
+
+
+async def reset_organization(org_id: UUID) -> None:
+    """Remove the benchmark organization's uploads, appointments and rollup rows."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(f"TRUNCATE {appointment_partition_name(org_id)}"))
+        await db.execute(delete(DailyPointsRollup).where(DailyPointsRollup.organization_id == org_id))
+        await db.execute(delete(Upload).where(Upload.organization_id == org_id))
+        await db.commit()
+
+
+async def ingest(
+    org_id: UUID, user_id: UUID, upload_type: str, path: str
+) -> Tuple[Upload, Dict[str, float]]:
+    """Ingest a file and commit; returns the Upload, seconds per stage and in total, loop lag."""
+    with open(path, "rb") as f:
+        file_hash = compute_file_hash(f.read())
+
+    timer = StageTimer()
+    lag = EventLoopLagMonitor()
+    async with AsyncSessionLocal() as db:
+        lag.start()
+        started = perf_counter()
+        upload = await process_upload(
+            db, org_id, user_id, upload_type, os.path.basename(path), path, file_hash, timer=timer
+        )
+        with timer.stage("commit"):
+            await db.commit()
+        seconds = {stage: timer.seconds.get(stage, 0.0) for stage in STAGES}
+        seconds["total"] = perf_counter() - started
+        await lag.stop()
+    lag_stats = lag.stats()
+    seconds["loop_lag_p99_ms"] = lag_stats["p99_ms"] or 0.0
+    seconds["loop_lag_max_ms"] = lag_stats["max_ms"]
+
+    if upload.status != "completed":
+        sys.exit(f"{path}: upload failed: {upload.error_message}")
+    return upload, seconds
+
+
+async def run_case(
+    org_id: UUID, user_id: UUID, upload_type: str, file_format: str, rows: int, args
+) -> dict:
+    path, summary = generate_upload_file(
+        args.data_dir, upload_type, rows, file_format, args.duplicates, args.dirty, args.seed
+    )
+    if args.replace and args.changed is not None:
+        previous_path = edited_upload_file(path, args.changed, args.seed)
+    elif args.replace:
+        previous_path, _ = generate_upload_file(
+            args.data_dir, upload_type, rows, file_format, args.duplicates, args.dirty,
+            args.seed + 1,
+        )
+
+    runs = []
+    for _ in range(args.repeat):
+        await reset_organization(org_id)
+        if args.replace:
+            await ingest(org_id, user_id, upload_type, previous_path)
+        upload, seconds = await ingest(org_id, user_id, upload_type, path)
+        runs.append(seconds)
+
+    median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    target = target_seconds(rows)
+    return {
+        "case": f"{upload_type}-{file_format}-{rows}",
+        "upload_type": upload_type,
+        "format": file_format,
+        "rows": rows,
+        "file_bytes": summary["file_bytes"],
+        "duplicates_injected": summary["duplicates"],
+        "dirty_cells": summary["dirty_cells"],
+        "valid_rows": upload.valid_row_count,
+        "duplicate_count": upload.duplicate_count,
+        "unchanged_row_count": upload.unchanged_row_count,
+        "removed_row_count": upload.removed_row_count,
+        "file_reader": upload.file_reader,
+        "runs": [{key: round(value, 4) for key, value in run.items()} for run in runs],
+        "median": {key: round(value, 4) for key, value in median.items()},
+        "rows_per_second": round(rows / median["total"]),
+        "target_seconds": target,
+        "within_target": None if target is None else median["total"] <= target,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print each case's change against the baseline; False if any total regressed too far."""
+    previous = {case["case"]: case for case in baseline["cases"]}
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}:")
+    ok = True
+    for case in results["cases"]:
+        before = previous.get(case["case"])
+        if before is None:
+            print(f"  {case['case']}: not in baseline")
+            continue
+        changes = []
+        for key in ["total"] + STAGES:
+            old, new = before["median"].get(key), case["median"][key]
+            if old:
+                changes.append(f"{key} {(new - old) / old:+.0%}")
+        regressed = case["median"]["total"] > before["median"]["total"] * (1 + max_regression)
+        ok &= not regressed
+        print(f"  {'REGRESSED ' if regressed else ''}{case['case']}: {', '.join(changes)}")
+    return ok
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[15000, 60000])
+    parser.add_argument(
+        "--type", nargs="+", default=["retrospective", "prospective"],
+        choices=["retrospective", "prospective"],
+    )
+    parser.add_argument("--format", nargs="+", default=["csv"], choices=["csv", "xlsx"])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    parser.add_argument("--replace", action="store_true", help="Supersede an active dataset")
+    parser.add_argument(
+        "--changed", type=float, help="With --replace, share of rows that differ from it"
+    )
+    parser.add_argument("--duplicates", type=float, default=0.02, help="Share of duplicate rows")
+    parser.add_argument("--dirty", type=float, default=0.01, help="Share of rows with a dirty cell")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default="benchmark-data", help="Generated files")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL must point at PostgreSQL")
+
+    org_id, user_id = await benchmark_organization()
+    async with engine.connect() as conn:
+        server_version = await conn.scalar(text("SHOW server_version"))
+
+    cases = []
+    for upload_type in args.type:
+        for file_format in args.format:
+            for rows in args.rows:
+                case = await run_case(org_id, user_id, upload_type, file_format, rows, args)
+                cases.append(case)
+                stages = ", ".join(f"{stage} {case['median'][stage]:.2f}" for stage in STAGES)
+                target = case["target_seconds"]
+                status = "" if target is None else ("ok  " if case["within_target"] else "SLOW")
+                print(
+                    f"{status:4} {case['case']}: {case['median']['total']:.2f}s "
+                    f"({case['rows_per_second']} rows/s; {stages}; "
+                    f"loop lag p99 {case['median']['loop_lag_p99_ms']:.0f}ms, "
+                    f"max {case['median']['loop_lag_max_ms']:.0f}ms)"
+                )
+
+    await reset_organization(org_id)
+    await upload_jobs.shutdown()
+    await engine.dispose()
+
+    results = {
+        "benchmark": "upload_pipeline",
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "postgresql": server_version,
+        "upload_chunk_rows": settings.UPLOAD_CHUNK_ROWS,
+        "repeat": args.repeat,
+        "replace": args.replace,
+        "changed": args.changed,
+        "cases": cases,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    ok = True
+    if args.compare:
+        with open(args.compare) as f:
+            ok = compare(results, json.load(f), args.max_regression)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
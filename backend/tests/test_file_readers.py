@@ -0,0 +1,56 @@
+import importlib.util
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.config import settings
+from app.services.file_readers import read_csv_chunks, read_xlsx_streaming, select_reader
+
+HEADER = ["Patient Encounter Number", "Visit Points"]
+# A blank encounter number in the last rows only, after several whole chunks
+ROWS = [[1000 + i, 12 if i % 2 else 12.5] for i in range(11)] + [[None, 12]]
+
+
+def read_all(reader, path, chunksize: int) -> pd.DataFrame:
+    return pd.concat([chunk for chunk, _ in reader(str(path), chunksize)])
+
+
+def test_csv_chunks_do_not_depend_on_chunk_boundaries(tmp_path):
+    path = tmp_path / "appointments.csv"
+    lines = [",".join(HEADER)] + [",".join("" if v is None else str(v) for v in row) for row in ROWS]
+    path.write_text("\n".join(lines) + "\n")
+
+    chunked = read_all(read_csv_chunks, path, 5)
+    whole = read_all(read_csv_chunks, path, 100)
+
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert chunked["Patient Encounter Number"].iloc[0] == "1000"
+    assert chunked["Visit Points"].iloc[1] == "12"
+    assert pd.isna(chunked["Patient Encounter Number"].iloc[-1])
+
+
+def test_xlsx_chunks_do_not_depend_on_chunk_boundaries(tmp_path):
+    path = tmp_path / "appointments.xlsx"
+    workbook = Workbook()
+    workbook.active.append(HEADER)
+    for row in ROWS:
+        workbook.active.append(row)
+    workbook.save(path)
+
+    chunked = read_all(read_xlsx_streaming, path, 5)
+    whole = read_all(read_xlsx_streaming, path, 100)
+
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert str(chunked["Patient Encounter Number"].iloc[0]) == "1000"
+    assert str(chunked["Visit Points"].iloc[1]) == "12"
+    assert pd.isna(chunked["Patient Encounter Number"].iloc[-1])
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("python_calamine") is None, reason="python-calamine not installed"
+)
+def test_xls_has_a_reader_at_any_size():
+    over_cap = (settings.EXCEL_FAST_READER_MAX_MB + 1) * 1024 * 1024
+    assert select_reader("appointments.xls", over_cap).name == "calamine"
+    assert select_reader("appointments.xlsx", over_cap).name == "openpyxl-streaming"
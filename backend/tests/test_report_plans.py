@@ -0,0 +1,99 @@
+"""EXPLAIN the report queries against PostgreSQL (DATABASE_URL).
+
+Seeds a small benchmark organization, runs the checks of
+benchmarks.explain_reports for it and removes it again. Skipped when
+DATABASE_URL does not point at a reachable PostgreSQL database; it has to
+be migrated.
+"""
+
+import asyncio
+from argparse import Namespace
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import AsyncSessionLocal, engine
+from app.models.organization import Organization
+from app.services.partitions import appointment_partition_name
+from app.services.report_cache import report_cache
+from benchmarks.explain_reports import build_checks, explain_check
+from benchmarks.seed_tenants import location_names, seed_tenant, seeded_dates, tenant_slug
+
+if engine.dialect.name != "postgresql":
+    pytest.skip("DATABASE_URL must point at PostgreSQL", allow_module_level=True)
+
+TENANT_NUMBER = 999
+CHECK_NAMES = [check.name for check in build_checks(uuid4(), "", "2026-01")]
+# Checks that read appointments on purpose; every report reads only the rollup
+APPOINTMENT_CHECKS = {"appointment list by location", "rollup source aggregate"}
+
+
+async def database_reachable() -> bool:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except (OSError, SQLAlchemyError):
+        return False
+    finally:
+        await engine.dispose()
+
+
+async def remove_tenant() -> None:
+    async with AsyncSessionLocal() as db:
+        org_id = await db.scalar(
+            select(Organization.id).where(Organization.slug == tenant_slug(TENANT_NUMBER))
+        )
+        if org_id:
+            await db.execute(text(f"DROP TABLE IF EXISTS {appointment_partition_name(org_id)}"))
+            await db.execute(delete(Organization).where(Organization.id == org_id))
+            await db.commit()
+
+
+async def explain_reports() -> dict:
+    """{check name: explain_check result} for a freshly seeded organization."""
+    await remove_tenant()
+    yesterday = date.today() - timedelta(days=1)
+    retrospective, prospective = seeded_dates(1, date.today())
+    args = Namespace(seed=1, locations=2, per_day=4)
+    try:
+        await seed_tenant(
+            TENANT_NUMBER, args, {"retrospective": retrospective, "prospective": prospective}
+        )
+        async with AsyncSessionLocal() as db:
+            org_id = await db.scalar(
+                select(Organization.id).where(Organization.slug == tenant_slug(TENANT_NUMBER))
+            )
+        checks = build_checks(org_id, location_names(1)[0], yesterday.strftime("%Y-%m"))
+        return {check.name: await explain_check(check) for check in checks}
+    finally:
+        await remove_tenant()
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plans():
+    if not asyncio.run(database_reachable()):
+        pytest.skip("PostgreSQL at DATABASE_URL is not reachable")
+    enabled, report_cache.enabled = report_cache.enabled, False
+    try:
+        yield asyncio.run(explain_reports())
+    finally:
+        report_cache.enabled = enabled
+
+
+@pytest.mark.parametrize("name", CHECK_NAMES)
+def test_query_uses_its_index(plans, name):
+    result = plans[name]
+    assert result["statements"], f"{name} issued no queries"
+    assert result["ok"], result["problems"]
+
+
+@pytest.mark.parametrize("name", [name for name in CHECK_NAMES if name not in APPOINTMENT_CHECKS])
+def test_report_reads_rollup_not_appointments(plans, name):
+    relations = {scan["relation"] for scan in plans[name]["scans"]}
+    assert "appointments" not in relations
+    assert "daily_points_rollup" in relations
@@ -1,4 +1,4 @@
-import { useQuery } from '@tanstack/react-query';
+import { keepPreviousData, useQuery } from '@tanstack/react-query';
 import { dashboardApi, locationsApi } from '../services/api';
 
 export function useDashboardOverview(locations?: string, days?: number) {
@@ -17,6 +17,16 @@ export function useLocationTable(search?: string) {
   });
 }
 
+export function useDashboardSummary(days?: number, search?: string, locations?: string) {
+  return useQuery({
+    queryKey: ['dashboard', 'summary', days, search, locations],
+    queryFn: () => dashboardApi.getSummary(days, search, locations),
+    staleTime: 5 * 60 * 1000,
+    // Keep showing the previous numbers while a new search or range loads
+    placeholderData: keepPreviousData,
+  });
+}
+
 export function useLocations() {
   return useQuery({
     queryKey: ['locations'],
@@ -1,5 +1,6 @@
 import { useQuery } from '@tanstack/react-query';
 import { reportsApi } from '../services/api';
+import type { BatchReportName } from '../types';
 
 export function useTechPointsByLocation(
   locationName: string,
@@ -49,3 +50,17 @@ export function useWeeklyPointsByLocation(month: string, week: number) {
     staleTime: 5 * 60 * 1000,
   });
 }
+
+export function useReportBatch(
+  locations: string[],
+  months: string[],
+  reports?: BatchReportName[],
+  period?: 'one_week' | 'four_weeks'
+) {
+  return useQuery({
+    queryKey: ['reports', 'batch', locations, months, reports, period],
+    queryFn: () => reportsApi.getBatch(locations, months, reports, period),
+    enabled: locations.length > 0 && months.length > 0,
+    staleTime: 5 * 60 * 1000,
+  });
+}
@@ -4,15 +4,16 @@ import { Select } from '../components/ui/Select';
 import { TechPointsOverview } from '../components/charts/TechPointsOverview';
 import { LocationTable } from '../components/features/LocationTable';
 import { CardSkeleton } from '../components/ui/LoadingSpinner';
-import { useDashboardOverview, useLocationTable, useLocations } from '../hooks/useDashboard';
+import { useDashboardSummary, useLocations } from '../hooks/useDashboard';
 
 export default function Dashboard() {
   const [trendDays, setTrendDays] = useState(10);
   const [locationCount, setLocationCount] = useState(3);
   const [locationSearch, setLocationSearch] = useState('');
 
-  const { data: overview, isLoading: overviewLoading } = useDashboardOverview(undefined, trendDays);
-  const { data: locationTable, isLoading: locationTableLoading } = useLocationTable(locationSearch);
+  const { data: summary, isLoading: summaryLoading } = useDashboardSummary(trendDays, locationSearch);
+  const overview = summary?.overview;
+  const locationTable = summary?.location_table;
   const { data: allLocations } = useLocations();
 
   // Stats
@@ -46,7 +47,7 @@ export default function Dashboard() {
 
       {/* Stats Row */}
       <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-6">
-        {overviewLoading ? (
+        {summaryLoading ? (
           <>
             <CardSkeleton />
             <CardSkeleton />
@@ -121,7 +122,7 @@ export default function Dashboard() {
           </div>
         </div>
 
-        {overviewLoading ? (
+        {summaryLoading ? (
           <div className="h-48 sm:h-64 animate-pulse bg-gray-100 rounded-lg" />
         ) : (
           <TechPointsOverview
@@ -136,7 +137,7 @@ export default function Dashboard() {
         <h2 className="text-[16px] font-bold text-[#1E293B] mb-4">Organization Locations</h2>
         <LocationTable
           locations={locationTable?.locations || []}
-          isLoading={locationTableLoading}
+          isLoading={summaryLoading}
           searchValue={locationSearch}
           onSearchChange={setLocationSearch}
         />
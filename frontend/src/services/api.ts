@@ -9,15 +9,19 @@ import type {
   AppointmentCreate,
   Appointment,
   AppointmentsResponse,
+  CountMode,
   UploadResponse,
   UploadsResponse,
   DashboardOverview,
   LocationTableResponse,
+  DashboardSummary,
   TechPointsByLocationResponse,
   MonthlyTechPointsResponse,
   ScheduledPointsByProviderResponse,
   PointsPaidTechFTEResponse,
   WeeklyPointsByLocationResponse,
+  BatchReportName,
+  ReportBatchResponse,
 } from '../types';
 
 const api = axios.create({
@@ -89,6 +93,14 @@ export const dashboardApi = {
     const response = await api.get<LocationTableResponse>('/dashboard/location-table', { params });
     return response.data;
   },
+  getSummary: async (days?: number, search?: string, locations?: string): Promise<DashboardSummary> => {
+    const params: Record<string, string> = {};
+    if (locations) params.locations = locations;
+    if (days) params.days = String(days);
+    if (search) params.search = search;
+    const response = await api.get<DashboardSummary>('/dashboard/summary', { params });
+    return response.data;
+  },
 };
 
 // ========================
@@ -149,6 +161,8 @@ export const appointmentsApi = {
     include_excluded?: boolean;
     limit?: number;
     offset?: number;
+    cursor?: string;
+    count?: CountMode;
   }): Promise<AppointmentsResponse> => {
     const response = await api.get<AppointmentsResponse>('/appointments/', { params });
     return response.data;
@@ -164,8 +178,12 @@ export const appointmentsApi = {
     const response = await api.post<Appointment[]>('/appointments/draft', { appointments });
     return response.data;
   },
-  getDrafts: async (): Promise<AppointmentsResponse> => {
-    const response = await api.get<AppointmentsResponse>('/appointments/drafts');
+  getDrafts: async (params?: {
+    limit?: number;
+    cursor?: string;
+    count?: CountMode;
+  }): Promise<AppointmentsResponse> => {
+    const response = await api.get<AppointmentsResponse>('/appointments/drafts', { params });
     return response.data;
   },
 };
@@ -188,6 +206,9 @@ export const uploadApi = {
   getAll: async (params?: {
     upload_type?: string;
     is_active?: boolean;
+    limit?: number;
+    cursor?: string;
+    count?: CountMode;
   }): Promise<UploadsResponse> => {
     const response = await api.get<UploadsResponse>('/uploads/', { params });
     return response.data;
@@ -258,6 +279,21 @@ export const reportsApi = {
     );
     return response.data;
   },
+  getBatch: async (
+    locations: string[],
+    months: string[],
+    reports?: BatchReportName[],
+    period?: 'one_week' | 'four_weeks'
+  ): Promise<ReportBatchResponse> => {
+    const params: Record<string, string> = {
+      locations: locations.join(','),
+      months: months.join(','),
+    };
+    if (reports) params.reports = reports.join(',');
+    if (period) params.period = period;
+    const response = await api.get<ReportBatchResponse>('/reports/batch', { params });
+    return response.data;
+  },
 };
 
 // ========================
@@ -95,9 +95,13 @@ export interface Appointment {
 
 export interface AppointmentsResponse {
   appointments: Appointment[];
-  total: number;
+  total: number | null;
+  total_is_estimate: boolean;
+  next_cursor: string | null;
 }
 
+export type CountMode = 'exact' | 'estimated' | 'none';
+
 // ========================
 // Upload Types
 // ========================
@@ -112,7 +116,12 @@ export interface UploadResponse {
   row_count: number;
   valid_row_count: number;
   duplicate_count: number;
+  unchanged_row_count: number;
+  removed_row_count: number;
   status: string;
+  progress_percent: number;
+  file_reader: string | null;
+  read_duration_ms: number | null;
   error_message: string | null;
   is_active: boolean;
   uploaded_at: string;
@@ -121,7 +130,9 @@ export interface UploadResponse {
 
 export interface UploadsResponse {
   uploads: UploadResponse[];
-  total: number;
+  total: number | null;
+  total_is_estimate: boolean;
+  next_cursor: string | null;
 }
 
 // ========================
@@ -156,6 +167,11 @@ export interface LocationTableResponse {
   total: number;
 }
 
+export interface DashboardSummary {
+  overview: DashboardOverview;
+  location_table: LocationTableResponse;
+}
+
 // ========================
 // Report Types
 // ========================
@@ -259,6 +275,20 @@ export interface WeeklyPointsByLocationResponse {
   locations: WeeklyLocationEntry[];
 }
 
+export type BatchReportName =
+  | 'tech-points-by-location'
+  | 'monthly-tech-points-by-location'
+  | 'scheduled-points-by-provider';
+
+// Reports keyed by location name, then month (YYYY-MM)
+export interface ReportBatchResponse {
+  locations: string[];
+  months: string[];
+  tech_points_by_location: Record<string, Record<string, TechPointsByLocationResponse>>;
+  monthly_tech_points_by_location: Record<string, Record<string, MonthlyTechPointsResponse>>;
+  scheduled_points_by_provider: Record<string, Record<string, ScheduledPointsByProviderResponse>>;
+}
+
 // ========================
 // Data Entry Types (maps to Appointment creation)
 // ========================